@@ -0,0 +1,114 @@
+import argparse
+import getpass
+import os
+import sys
+from modules.key_generator import KeyGenerator
+from modules.digest_cache import DigestCache
+from modules.batch import BatchSigner, collect_files, common_root
+from modules.manifest import ManifestSigner
+from modules.signature_index import SignatureIndex
+
+
+def load_private_key(key_path, password=None):
+    """Load the signing key, prompting for a password if the PEM is encrypted"""
+    key_gen = KeyGenerator()
+    if password:
+        return key_gen.load_private_key(key_path, password)
+    try:
+        return key_gen.load_private_key(key_path)
+    except TypeError:
+        # Encrypted key: ask for the password like the GUI does
+        return key_gen.load_private_key(key_path, getpass.getpass("Mật khẩu khóa riêng: "))
+
+
+def print_result(result):
+    if result["ok"]:
+        print(f"OK    {result['path']} -> {result['signature_path']}")
+    else:
+        print(f"FAIL  {result['path']}: {result['error']}", file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ký hàng loạt tệp bằng khóa riêng")
+    parser.add_argument("paths", nargs="*", help="Tệp hoặc thư mục cần ký")
+    parser.add_argument("--manifest", help="Tệp danh sách đường dẫn (mỗi dòng một tệp)")
+    parser.add_argument("--key", required=True, help="Khóa riêng (PEM)")
+    parser.add_argument("--password", help="Mật khẩu khóa riêng")
+    parser.add_argument("--hash", default="SHA256", help="Thuật toán hash (SHA256, SHA384, SHA512, SHA3-256, SHA3-512, BLAKE2b, BLAKE2s)")
+    parser.add_argument("--format", choices=["binary", "json", "raw"], default="binary",
+                        help="Định dạng chữ ký: gói nhị phân tự mô tả, JSON/base64, hoặc chữ ký thô kèm .keyid")
+    parser.add_argument("--signed-manifest",
+                        help="Ghi một manifest (đường dẫn/kích thước/hash) và chỉ ký manifest này thay vì từng tệp")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Với --signed-manifest: chỉ hash lại các tệp thay đổi kích thước/mtime/ctime/inode từ lần ký --incremental trước")
+    parser.add_argument("--out-dir", help="Thư mục lưu chữ ký (mặc định: cạnh mỗi tệp)")
+    parser.add_argument("--hash-workers", type=int, help="Số luồng tính hash")
+    parser.add_argument("--sign-workers", type=int, help="Số tiến trình ký (0: ký trong tiến trình chính)")
+    parser.add_argument("--digest-cache", nargs="?", const=DigestCache.default_path(),
+                        help="Dùng bộ đệm hash để bỏ qua các tệp không thay đổi (tùy chọn: đường dẫn tệp bộ đệm)")
+    parser.add_argument("--index", nargs="?", const=SignatureIndex.default_path(),
+                        help="Ghi mỗi chữ ký vào chỉ mục chữ ký để tra cứu bằng provenance.py (tùy chọn: đường dẫn tệp chỉ mục)")
+    args = parser.parse_args(argv)
+
+    if not args.paths and not args.manifest:
+        parser.error("cần ít nhất một đường dẫn hoặc --manifest")
+    if args.incremental and not args.signed_manifest:
+        parser.error("--incremental cần --signed-manifest")
+
+    files = collect_files(args.paths, args.manifest, extension_filter=(".sig", ".sig.keyid"))
+    root = common_root(args.paths)
+
+    private_key = load_private_key(args.key, args.password)
+    digest_cache = DigestCache(args.digest_cache) if args.digest_cache else None
+
+    if args.signed_manifest:
+        manifest_root = root or os.path.dirname(os.path.abspath(args.signed_manifest))
+        signer = ManifestSigner(
+            private_key, args.hash, workers=args.hash_workers, digest_cache=digest_cache,
+            signature_index=SignatureIndex(args.index) if args.index else None
+        )
+        results, summary = signer.sign_files(
+            [os.path.abspath(p) for p in files], manifest_root, args.signed_manifest,
+            on_result=lambda r: None if r["ok"] else print_result(r),
+            incremental=args.incremental
+        )
+        if not summary["signed"]:
+            print(
+                f"\nKhông ký manifest: {summary['failed']}/{summary['files']} tệp lỗi "
+                f"(manifest thiếu tệp sẽ không phản ánh đúng thư mục)", file=sys.stderr
+            )
+            return 1
+        print(
+            f"\nĐã ghi manifest {summary['manifest']} ({summary['succeeded']}/{summary['files']} tệp, "
+            f"{summary['failed']} lỗi; hash lại {summary['hashed']}, dùng lại {summary['reused']}, "
+            f"đã xóa {summary['removed']}) và chữ ký {summary['signature']} trong {summary['seconds']:.2f} giây - "
+            f"{summary['files_per_second']:.1f} tệp/giây, {summary['mb_per_second']:.1f} MB/giây"
+        )
+        return 0 if summary["failed"] == 0 else 1
+
+    signer = BatchSigner(
+        private_key,
+        hash_algorithm=args.hash,
+        hash_workers=args.hash_workers,
+        sign_workers=args.sign_workers,
+        signature_format=args.format,
+        digest_cache=digest_cache,
+        signature_index=SignatureIndex(args.index) if args.index else None
+    )
+    results, summary = signer.sign_files(
+        [os.path.abspath(p) for p in files],
+        out_dir=args.out_dir,
+        root=root,
+        on_result=print_result
+    )
+
+    print(
+        f"\nĐã ký {summary['succeeded']}/{summary['files']} tệp "
+        f"({summary['failed']} lỗi) trong {summary['seconds']:.2f} giây - "
+        f"{summary['files_per_second']:.1f} tệp/giây, {summary['mb_per_second']:.1f} MB/giây"
+    )
+    return 0 if summary["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
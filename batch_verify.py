@@ -0,0 +1,95 @@
+import argparse
+import os
+import sys
+from modules.key_generator import KeyGenerator
+from modules.digest_cache import DigestCache
+from modules.keyring import Keyring
+from modules.batch import BatchVerifier, collect_files, common_root, write_report
+from modules.manifest import ManifestVerifier
+
+
+def print_result(result):
+    if result["ok"]:
+        print(f"VALID    {result['path']}")
+    else:
+        detail = f": {result['error']}" if result["error"] else ""
+        print(f"{result['status'].upper():<8} {result['path']}{detail}", file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Xác thực hàng loạt chữ ký bằng khóa công khai")
+    parser.add_argument("paths", nargs="*", help="Tệp hoặc thư mục cần xác thực")
+    parser.add_argument("--manifest", help="Tệp danh sách đường dẫn (mỗi dòng một tệp)")
+    parser.add_argument("--key", help="Khóa công khai (PEM) cho chữ ký không có mã khóa")
+    parser.add_argument("--key-dir", help="Thư mục khóa công khai; chọn khóa theo mã khóa (.keyid) của chữ ký")
+    parser.add_argument("--hash", default="SHA256", help="Thuật toán hash cho chữ ký thô (SHA256, SHA384, SHA512, SHA3-256, SHA3-512, BLAKE2b, BLAKE2s); gói chữ ký tự ghi thuật toán")
+    parser.add_argument("--signed-manifest",
+                        help="Xác thực manifest đã ký (một chữ ký) rồi kiểm tra hash các tệp trong đó")
+    parser.add_argument("--sig-dir", help="Thư mục chứa chữ ký (mặc định: cạnh mỗi tệp)")
+    parser.add_argument("--workers", type=int, help="Số tiến trình xác thực (0: dùng luồng trong tiến trình chính)")
+    parser.add_argument("--report", help="Ghi báo cáo kết quả (.json hoặc .csv)")
+    parser.add_argument("--digest-cache", nargs="?", const=DigestCache.default_path(),
+                        help="Dùng bộ đệm hash để bỏ qua các tệp không thay đổi (tùy chọn: đường dẫn tệp bộ đệm)")
+    args = parser.parse_args(argv)
+
+    if not args.paths and not args.manifest and not args.signed_manifest:
+        parser.error("cần ít nhất một đường dẫn, --manifest hoặc --signed-manifest")
+    if not args.key and not args.key_dir:
+        parser.error("cần --key hoặc --key-dir")
+
+    keyring = None
+    if args.key_dir:
+        keyring = Keyring()
+        fingerprints = keyring.load_public_key_directory(args.key_dir)
+        print(f"Đã nạp {len(fingerprints)} khóa công khai từ {args.key_dir}", file=sys.stderr)
+
+    public_key = KeyGenerator().load_public_key(args.key) if args.key else None
+    digest_cache = DigestCache(args.digest_cache) if args.digest_cache else None
+
+    if args.signed_manifest:
+        verifier = ManifestVerifier(public_key, workers=args.workers, digest_cache=digest_cache, keyring=keyring)
+        results, summary = verifier.verify(
+            args.signed_manifest, root=args.paths[0] if args.paths else None, on_result=print_result
+        )
+        if args.report:
+            write_report(results, summary, args.report)
+        if not summary["manifest_valid"]:
+            print(f"Manifest không hợp lệ: {summary['manifest_error']}", file=sys.stderr)
+            return 1
+        print(
+            f"\nChữ ký manifest hợp lệ. Hợp lệ {summary['valid']}/{summary['files']} tệp "
+            f"(không hợp lệ: {summary['invalid']}, thiếu tệp: {summary['missing_file']}, "
+            f"lỗi: {summary['error']}) trong {summary['seconds']:.2f} giây - "
+            f"{summary['files_per_second']:.1f} tệp/giây, {summary['mb_per_second']:.1f} MB/giây"
+        )
+        return 0 if summary["failed"] == 0 else 1
+
+    files = collect_files(args.paths, args.manifest, extension_filter=(".sig", ".sig.keyid"))
+    verifier = BatchVerifier(
+        public_key,
+        hash_algorithm=args.hash,
+        keyring=keyring,
+        workers=args.workers,
+        digest_cache=digest_cache
+    )
+    results, summary = verifier.verify_files(
+        [os.path.abspath(p) for p in files],
+        sig_dir=args.sig_dir,
+        root=common_root(args.paths),
+        on_result=print_result
+    )
+
+    if args.report:
+        write_report(results, summary, args.report)
+
+    print(
+        f"\nHợp lệ {summary['valid']}/{summary['files']} tệp "
+        f"(không hợp lệ: {summary['invalid']}, thiếu chữ ký: {summary['missing_signature']}, "
+        f"lỗi: {summary['error']}) trong {summary['seconds']:.2f} giây - "
+        f"{summary['files_per_second']:.1f} tệp/giây, {summary['mb_per_second']:.1f} MB/giây"
+    )
+    return 0 if summary["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
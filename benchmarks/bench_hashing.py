@@ -0,0 +1,81 @@
+"""
+Compare file hashing throughput of the old 8 KiB read loop with modules.hashing
+
+    python -m benchmarks.bench_hashing --sizes 1M 64M 1G --algorithm sha256
+"""
+import argparse
+import hashlib
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules import hashing
+
+
+def parse_size(text):
+    """Parse sizes such as 512K, 64M or 1G into bytes"""
+    units = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+    text = text.upper()
+    if text[-1] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(text)
+
+
+def baseline_8k_loop(file_path, algorithm):
+    """The hashing loop used before modules.hashing existed"""
+    hasher = hashlib.new(algorithm)
+    with open(file_path, 'rb') as f:
+        chunk = f.read(8192)
+        while chunk:
+            hasher.update(chunk)
+            chunk = f.read(8192)
+    return hasher.digest()
+
+
+def best_time(func, repeat):
+    """Best wall-clock time over repeat runs (page cache warmed by the first)"""
+    func()
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", nargs="+", default=["1M", "64M", "512M"])
+    parser.add_argument("--algorithm", default="sha256")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    strategies = [
+        ("8 KiB read loop (before)", lambda p: baseline_8k_loop(p, args.algorithm)),
+        ("hashing.hash_file (auto)", lambda p: hashing.hash_file(p, args.algorithm)),
+        ("readinto 256 KiB", lambda p: hashing.hash_file(p, args.algorithm, buffer_size=256 * 1024)),
+        ("readinto 4 MiB", lambda p: hashing.hash_file(p, args.algorithm, buffer_size=4 * 1024 * 1024)),
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for size_text in args.sizes:
+            size = parse_size(size_text)
+            file_path = os.path.join(tmp_dir, f"data_{size_text}")
+            with open(file_path, 'wb') as f:
+                remaining = size
+                while remaining:
+                    block = os.urandom(min(remaining, 16 * 1024 * 1024))
+                    f.write(block)
+                    remaining -= len(block)
+
+            print(f"\n{args.algorithm} over {size_text} ({size} bytes)")
+            for name, func in strategies:
+                seconds = best_time(lambda: func(file_path), args.repeat)
+                print(f"  {name:<28} {size / seconds / 1e9:6.3f} GB/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Small timing harness shared by the benchmark suites
+
+Every measurement runs warmup iterations first, then times each repetition
+with time.perf_counter_ns and reports summary statistics in nanoseconds.
+"""
+import json
+import platform
+import statistics
+import sys
+import time
+
+
+def summarize_ns(samples, work_per_sample=None):
+    """
+    Summary statistics for a list of per-repetition durations
+    :param samples: Durations in nanoseconds
+    :param work_per_sample: Optional (amount, unit) processed per repetition, e.g. (1, 'ops') or (size, 'bytes')
+    :return: Dict of statistics
+    """
+    ordered = sorted(samples)
+    result = {
+        "repeat": len(ordered),
+        "min_ns": ordered[0],
+        "max_ns": ordered[-1],
+        "mean_ns": statistics.fmean(ordered),
+        "median_ns": statistics.median(ordered),
+        "stdev_ns": statistics.stdev(ordered) if len(ordered) > 1 else 0.0,
+        "p95_ns": ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))]
+    }
+
+    if work_per_sample:
+        amount, unit = work_per_sample
+        median_seconds = result["median_ns"] / 1e9
+        result[f"{unit}_per_second"] = amount / median_seconds if median_seconds else 0.0
+    return result
+
+
+def measure(func, repeat=10, warmup=2, number=1, work_per_sample=None):
+    """
+    Time func()
+    :param func: Callable without arguments
+    :param repeat: Number of timed repetitions
+    :param warmup: Untimed calls made first (caches, lazy initialisation, page cache)
+    :param number: Calls per repetition (for very fast operations)
+    :param work_per_sample: (amount, unit) done by a single call
+    :return: Dict of statistics (times are per single call, averaged over `number` calls)
+    """
+    for _ in range(warmup):
+        func()
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        for _ in range(number):
+            func()
+        samples.append((time.perf_counter_ns() - start) / number)
+
+    result = summarize_ns(samples, work_per_sample)
+    result["number"] = number
+    return result
+
+
+def environment():
+    """Describe the machine so results from different hosts are not confused"""
+    try:
+        import cryptography
+        cryptography_version = cryptography.__version__
+    except ImportError:
+        cryptography_version = None
+
+    return {
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cryptography": cryptography_version
+    }
+
+
+def write_results(path, results):
+    """Write benchmark results as JSON"""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+
+
+def load_results(path):
+    """Read benchmark results written by write_results()"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def compare(baseline, current):
+    """
+    Compare two result sets by median time
+    :return: List of (name, baseline_median_ns, current_median_ns, speedup) for benchmarks in both
+    """
+    rows = []
+    for name, stats in current["benchmarks"].items():
+        old = baseline.get("benchmarks", {}).get(name)
+        if not old:
+            continue
+        speedup = old["median_ns"] / stats["median_ns"] if stats["median_ns"] else float('inf')
+        rows.append((name, old["median_ns"], stats["median_ns"], speedup))
+    return rows
@@ -0,0 +1,205 @@
+"""
+Benchmark suite for key generation, signing/verification, file hashing, batch throughput
+and cold-start import time
+
+    python -m benchmarks.run                          # all suites
+    python -m benchmarks.run --suite sign --quick     # one suite, fewer repetitions
+    python -m benchmarks.run --output results.json    # save for later comparison
+    python -m benchmarks.run --compare results.json   # diff against a previous run
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.harness import measure, summarize_ns, environment, write_results, load_results, compare
+from modules.key_generator import KeyGenerator
+from modules.signature import DigitalSignature
+from modules import hashing, merkle
+
+KEYGEN_CASES = [
+    ("RSA", 2048), ("RSA", 3072), ("RSA", 4096),
+    ("DSA", 2048),
+    ("ECDSA P-256", None), ("ECDSA P-384", None), ("Ed25519", None), ("Ed448", None)
+]
+SIGN_ALGORITHMS = [("RSA", 2048), ("DSA", 2048), ("ECDSA P-256", None), ("Ed25519", None)]
+MESSAGE_SIZES = [64, 4 * 1024, 1024 * 1024]
+HASH_ALGORITHMS = ["sha256", "sha384", "sha512", "sha3-256", "sha3-512", "blake2b", "blake2s"]
+
+
+def generate(algorithm, key_size):
+    return KeyGenerator().generate_keys(algorithm, key_size or 0)
+
+
+def label(algorithm, key_size):
+    return f"{algorithm}-{key_size}" if key_size else algorithm
+
+
+def keygen_suite(results, quick):
+    """Key pair generation time per algorithm and size"""
+    for algorithm, key_size in KEYGEN_CASES:
+        if quick and key_size and key_size > 2048:
+            continue
+        slow = algorithm in ("RSA", "DSA")
+        repeat = (2 if quick else 5) if slow else (20 if quick else 100)
+        results[f"keygen/{label(algorithm, key_size)}"] = measure(
+            lambda: generate(algorithm, key_size),
+            repeat=repeat, warmup=0 if slow else 5, work_per_sample=(1, "ops")
+        )
+
+
+def sign_suite(results, quick):
+    """sign_message/verify_signature operations per second for several message sizes"""
+    tool = DigitalSignature()
+    for algorithm, key_size in SIGN_ALGORITHMS:
+        private_key, public_key = generate(algorithm, key_size)
+        for size in MESSAGE_SIZES:
+            message = os.urandom(size)
+            signature = tool.sign_message(message, private_key)
+            number = 5 if size >= 1024 * 1024 else 50
+            repeat = 5 if quick else 20
+            name = label(algorithm, key_size)
+            results[f"sign/{name}/{size}B"] = measure(
+                lambda: tool.sign_message(message, private_key),
+                repeat=repeat, number=number, work_per_sample=(1, "ops")
+            )
+            results[f"verify/{name}/{size}B"] = measure(
+                lambda: tool.verify_signature(message, signature, public_key),
+                repeat=repeat, number=number, work_per_sample=(1, "ops")
+            )
+
+
+def write_random_file(path, size):
+    with open(path, 'wb') as f:
+        remaining = size
+        while remaining:
+            block = os.urandom(min(remaining, 16 * 1024 * 1024))
+            f.write(block)
+            remaining -= len(block)
+
+
+def hashing_suite(results, quick, tmp_dir):
+    """File hashing throughput per hash algorithm (warm page cache)"""
+    size = (32 if quick else 256) * 1024 * 1024
+    path = os.path.join(tmp_dir, "hash.bin")
+    write_random_file(path, size)
+    for algorithm in HASH_ALGORITHMS:
+        results[f"hash/{algorithm}/{size // (1024 * 1024)}MiB"] = measure(
+            lambda: hashing.hash_file(path, algorithm),
+            repeat=3 if quick else 5, warmup=1, work_per_sample=(size, "bytes")
+        )
+
+    # One read pass feeding SHA-256 and SHA-512 (vs. reading the file once per digest)
+    results[f"hash/multi-sha256+sha512/{size // (1024 * 1024)}MiB"] = measure(
+        lambda: hashing.hash_file_multi(path, ["sha256", "sha512"]),
+        repeat=3 if quick else 5, warmup=1, work_per_sample=(size, "bytes")
+    )
+
+    # Chunked Merkle hashing spreads the chunks over all cores
+    chunks = range(merkle.chunk_count(size, merkle.DEFAULT_CHUNK_SIZE))
+    results[f"hash/merkle-sha256/{size // (1024 * 1024)}MiB"] = measure(
+        lambda: merkle.merkle_root(list(merkle.ChunkHasher(path).hash_chunks(chunks).values())),
+        repeat=3 if quick else 5, warmup=1, work_per_sample=(size, "bytes")
+    )
+
+
+def batch_suite(results, quick, tmp_dir):
+    """BatchSigner/BatchVerifier throughput over a directory of small files"""
+    from modules.batch import BatchSigner, BatchVerifier
+
+    count = 100 if quick else 500
+    tree = os.path.join(tmp_dir, "batch")
+    os.makedirs(tree, exist_ok=True)
+    files = []
+    for i in range(count):
+        path = os.path.join(tree, f"file_{i:05d}.bin")
+        write_random_file(path, 64 * 1024)
+        files.append(path)
+
+    private_key, public_key = generate("RSA", 2048)
+    signer = BatchSigner(private_key)
+    verifier = BatchVerifier(public_key)
+    total_bytes = count * 64 * 1024
+
+    results[f"batch/sign/{count}x64KiB"] = measure(
+        lambda: signer.sign_files(files), repeat=3, warmup=1, work_per_sample=(count, "files")
+    )
+    results[f"batch/verify/{count}x64KiB"] = measure(
+        lambda: verifier.verify_files(files), repeat=3, warmup=1, work_per_sample=(count, "files")
+    )
+    for name in (f"batch/sign/{count}x64KiB", f"batch/verify/{count}x64KiB"):
+        results[name]["bytes_per_second"] = total_bytes / (results[name]["median_ns"] / 1e9)
+
+
+def startup_suite(results, quick):
+    """Cold import time of each entry point (a fresh interpreter per sample; budgets: benchmarks.startup)"""
+    from benchmarks.startup import BUDGETS, measure_startup
+
+    for module, _, _ in BUDGETS:
+        samples, _ = measure_startup(module, repeat=3 if quick else 9)
+        results[f"startup/{module}"] = summarize_ns(samples)
+
+
+def format_rate(stats):
+    for unit in ("files", "bytes", "ops"):
+        rate = stats.get(f"{unit}_per_second")
+        if rate is None:
+            continue
+        if unit == "bytes":
+            return f"{rate / 1e9:8.3f} GB/s"
+        return f"{rate:10.1f} {unit}/s"
+    return ""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--suite", action="append", choices=["keygen", "sign", "hash", "batch", "startup"],
+                        help="Suite to run (repeatable, default: all)")
+    parser.add_argument("--quick", action="store_true", help="Fewer sizes and repetitions")
+    parser.add_argument("--output", help="Write results to this JSON file")
+    parser.add_argument("--compare", help="Baseline JSON file to compare against")
+    args = parser.parse_args()
+
+    suites = args.suite or ["keygen", "sign", "hash", "batch", "startup"]
+    benchmarks = {}
+    start = time.time()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for suite in suites:
+            print(f"Running {suite}...", file=sys.stderr)
+            if suite == "keygen":
+                keygen_suite(benchmarks, args.quick)
+            elif suite == "sign":
+                sign_suite(benchmarks, args.quick)
+            elif suite == "hash":
+                hashing_suite(benchmarks, args.quick, tmp_dir)
+            elif suite == "batch":
+                batch_suite(benchmarks, args.quick, tmp_dir)
+            elif suite == "startup":
+                startup_suite(benchmarks, args.quick)
+
+    results = {
+        "environment": environment(),
+        "timestamp": start,
+        "quick": args.quick,
+        "benchmarks": benchmarks
+    }
+
+    for name, stats in benchmarks.items():
+        print(f"{name:<40} median {stats['median_ns'] / 1e6:10.3f} ms  "
+              f"p95 {stats['p95_ns'] / 1e6:10.3f} ms  {format_rate(stats)}")
+
+    if args.output:
+        write_results(args.output, results)
+
+    if args.compare:
+        print(f"\nCompared with {args.compare} (speedup > 1 is faster):")
+        for name, old_ns, new_ns, speedup in compare(load_results(args.compare), results):
+            print(f"{name:<40} {old_ns / 1e6:10.3f} ms -> {new_ns / 1e6:10.3f} ms  x{speedup:.2f}")
+
+
+if __name__ == "__main__":
+    main()
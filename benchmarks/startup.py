@@ -0,0 +1,115 @@
+"""
+Cold-start import budget
+
+Each entry point is imported in a fresh interpreter with -X importtime; the
+median cumulative import time is compared with its budget, and modules an
+entry point must not pull in (tkinter for headless tools, cryptography
+before it is needed) are reported. Exits with status 1 on any violation, so
+it can guard against start-up regressions in CI:
+
+    python -m benchmarks.startup                 # check all budgets
+    python -m benchmarks.startup --repeat 9      # more runs, steadier medians
+    python -m benchmarks.startup --scale 2       # slower machine: double every budget
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# (module, budget in milliseconds, modules that must not be imported)
+BUDGETS = [
+    ("main", 15, ("tkinter", "cryptography", "gui")),
+    ("gui.app", 80, ("cryptography", "gui.key_tab", "gui.sign_tab", "gui.verify_tab")),
+    ("modules.daemon", 60, ("tkinter", "cryptography")),
+    ("modules.keyring", 40, ("tkinter", "cryptography")),
+    ("modules.hashing", 25, ("tkinter", "cryptography")),
+    ("modules.signature", 120, ("tkinter",)),
+    ("batch_sign", 200, ("tkinter",)),
+    ("batch_verify", 200, ("tkinter",)),
+    ("provenance", 40, ("tkinter", "cryptography")),
+]
+
+
+def import_profile(module):
+    """
+    Import a module in a fresh interpreter
+    :return: Tuple of (cumulative import time in microseconds, set of imported module names)
+    """
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    total_us = 0
+    imported = set()
+    for line in completed.stderr.splitlines():
+        # "import time:      self [us] |  cumulative | imported package"
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not cumulative.strip().isdigit():
+            continue  # header line
+        name = name.strip()
+        imported.add(name)
+        if name == module:
+            total_us = int(cumulative)
+    return total_us, imported
+
+
+def measure_startup(module, repeat=5):
+    """
+    Median cold import time of a module
+    :return: Tuple of (list of samples in nanoseconds, set of imported module names)
+    """
+    samples = []
+    imported = set()
+    for _ in range(repeat):
+        total_us, imported = import_profile(module)
+        samples.append(total_us * 1000)
+    return samples, imported
+
+
+def forbidden_imports(imported, forbidden):
+    """Imported modules that are, or live under, one of the forbidden packages"""
+    return sorted(
+        name for name in imported
+        if any(name == package or name.startswith(package + ".") for package in forbidden)
+    )
+
+
+def check_budgets(repeat=5, scale=1.0):
+    """
+    :return: List of (module, median ms, budget ms, forbidden modules imported)
+    """
+    rows = []
+    for module, budget_ms, forbidden in BUDGETS:
+        samples, imported = measure_startup(module, repeat)
+        rows.append((module, statistics.median(samples) / 1e6, budget_ms * scale,
+                     forbidden_imports(imported, forbidden)))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per entry point")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply every budget (slow machines)")
+    args = parser.parse_args()
+
+    failed = False
+    for module, median_ms, budget_ms, forbidden in check_budgets(args.repeat, args.scale):
+        status = "OK"
+        if median_ms > budget_ms:
+            status = "SLOW"
+        if forbidden:
+            status = "IMPORTS"
+        failed = failed or status != "OK"
+        print(f"{status:<8} {module:<20} {median_ms:8.1f} ms  (budget {budget_ms:.0f} ms)")
+        if forbidden:
+            print(f"         imports {', '.join(forbidden[:5])}{' ...' if len(forbidden) > 5 else ''}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,17 @@
+import importlib
 import tkinter as tk
 from tkinter import ttk
-from gui.key_tab import KeyTab
-from gui.sign_tab import SignTab
-from gui.verify_tab import VerifyTab
+from gui.task_runner import TaskRunner
+from modules.keyring import Keyring
+
+# Tabs in notebook order: (name, title, module, class).
+# A tab's module (and the cryptography code it needs) is imported and the
+# tab built only when it is first selected, so the window opens without them.
+TABS = [
+    ("key_tab", "Quản lý khóa", "gui.key_tab", "KeyTab"),
+    ("sign_tab", "Ký số", "gui.sign_tab", "SignTab"),
+    ("verify_tab", "Xác thực chữ ký", "gui.verify_tab", "VerifyTab"),
+]
 
 class DigitalSignatureApp:
     def __init__(self, root):
@@ -22,26 +31,67 @@ class DigitalSignatureApp:
         self.shared_state = {
             "private_key": None,
             "public_key": None,
-            "current_signature": None
+            "current_signature": None,
+            "keyring": Keyring()  # parsed keys reused across loads
         }
         
-        # Initialize tabs
-        self.key_tab = KeyTab(self.notebook, self.shared_state)
-        self.sign_tab = SignTab(self.notebook, self.shared_state)
-        self.verify_tab = VerifyTab(self.notebook, self.shared_state)
+        # Background worker for crypto operations (keeps the UI responsive)
+        self.task_runner = TaskRunner(root, on_status=self.update_status, on_busy=self.set_busy)
+        self.shared_state["task_runner"] = self.task_runner
         
-        # Add tabs to notebook
-        self.notebook.add(self.key_tab.frame, text="Quản lý khóa")
-        self.notebook.add(self.sign_tab.frame, text="Ký số")
-        self.notebook.add(self.verify_tab.frame, text="Xác thực chữ ký")
+        # Placeholder frames; each tab is built into its frame on first selection
+        self.tabs = {}
+        self.tab_frames = []
+        for name, title, _, _ in TABS:
+            frame = ttk.Frame(self.notebook)
+            self.notebook.add(frame, text=title)
+            self.tab_frames.append(frame)
+        self.notebook.bind("<<NotebookTabChanged>>", self.on_tab_changed)
         
         # Set up menu
         self.create_menu()
         
-        # Status bar
+        # Status bar with a cancel button for the running operation
+        status_frame = ttk.Frame(root)
+        status_frame.pack(side=tk.BOTTOM, fill=tk.X)
         self.status_var = tk.StringVar(value="Sẵn sàng")
-        self.status_bar = ttk.Label(root, textvariable=self.status_var, relief=tk.SUNKEN, anchor=tk.W)
-        self.status_bar.pack(side=tk.BOTTOM, fill=tk.X)
+        self.status_bar = ttk.Label(status_frame, textvariable=self.status_var, relief=tk.SUNKEN, anchor=tk.W)
+        self.status_bar.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self.cancel_button = ttk.Button(status_frame, text="Hủy", command=self.task_runner.cancel, state=tk.DISABLED)
+        self.cancel_button.pack(side=tk.RIGHT)
+        
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+    
+    def get_tab(self, index):
+        """
+        Return a tab object, building it on first use
+        :param index: Position in TABS
+        """
+        name, _, module_name, class_name = TABS[index]
+        tab = self.tabs.get(name)
+        if tab is None:
+            self.root.config(cursor="watch")
+            self.root.update_idletasks()
+            try:
+                tab_class = getattr(importlib.import_module(module_name), class_name)
+                tab = tab_class(self.tab_frames[index], self.shared_state)
+                tab.frame.pack(fill='both', expand=True)
+            finally:
+                self.root.config(cursor="")
+            self.tabs[name] = tab
+        return tab
+    
+    def select_tab(self, index):
+        """Switch to a tab and return it"""
+        self.notebook.select(index)
+        return self.get_tab(index)
+    
+    def on_tab_changed(self, event):
+        """Build the selected tab the first time it is shown"""
+        index = self.notebook.index(self.notebook.select())
+        if TABS[index][0] not in self.tabs:
+            # After pending redraws, so the window (or tab header) appears before the import
+            self.root.after_idle(self.get_tab, index)
     
     def create_menu(self):
         """Create main menu"""
@@ -49,15 +99,15 @@ class DigitalSignatureApp:
         
         # File menu
         file_menu = tk.Menu(menubar, tearoff=0)
-        file_menu.add_command(label="Tạo cặp khóa mới", command=self.key_tab.generate_keys)
+        file_menu.add_command(label="Tạo cặp khóa mới", command=lambda: self.select_tab(0).generate_keys())
         file_menu.add_separator()
-        file_menu.add_command(label="Thoát", command=self.root.quit)
+        file_menu.add_command(label="Thoát", command=self.on_close)
         menubar.add_cascade(label="Tệp", menu=file_menu)
         
         # Tools menu
         tools_menu = tk.Menu(menubar, tearoff=0)
-        tools_menu.add_command(label="Ký văn bản/tệp", command=lambda: self.notebook.select(1))  # Select sign tab
-        tools_menu.add_command(label="Xác thực chữ ký", command=lambda: self.notebook.select(2))  # Select verify tab
+        tools_menu.add_command(label="Ký văn bản/tệp", command=lambda: self.select_tab(1))  # Select sign tab
+        tools_menu.add_command(label="Xác thực chữ ký", command=lambda: self.select_tab(2))  # Select verify tab
         menubar.add_cascade(label="Công cụ", menu=tools_menu)
         
         # Help menu
@@ -82,14 +132,15 @@ class DigitalSignatureApp:
         HƯỚNG DẪN SỬ DỤNG ỨNG DỤNG CHỮ KÝ SỐ
         
         1. Tab Quản lý khóa
-           - Tạo cặp khóa RSA hoặc DSA với kích thước tùy chọn
+           - Tạo cặp khóa RSA hoặc DSA với kích thước tùy chọn,
+             hoặc ECDSA (P-256/P-384), Ed25519, Ed448 (sinh khóa và ký nhanh, chữ ký nhỏ)
            - Lưu khóa riêng và khóa công khai vào tệp
            - Có thể bảo vệ khóa riêng bằng mật khẩu
            - Tải khóa từ tệp đã lưu
         
         2. Tab Ký số
            - Ký văn bản hoặc tệp sử dụng khóa riêng
-           - Chọn thuật toán hash (SHA256, SHA384, SHA512)
+           - Chọn thuật toán hash (SHA-2, SHA3 hoặc BLAKE2)
            - Lưu chữ ký vào tệp
         
         3. Tab Xác thực chữ ký
@@ -119,3 +170,15 @@ class DigitalSignatureApp:
     def update_status(self, message):
         """Update status bar message"""
         self.status_var.set(message)
+    
+    def set_busy(self, busy):
+        """Enable the cancel button while a background operation runs"""
+        self.cancel_button.config(state=tk.NORMAL if busy else tk.DISABLED)
+    
+    def on_close(self):
+        """Stop background work and close the window"""
+        self.task_runner.shutdown()
+        # Tabs never opened have nothing to stop
+        if "key_tab" in self.tabs:
+            self.tabs["key_tab"].shutdown()
+        self.root.destroy()
@@ -2,14 +2,24 @@ import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, simpledialog
 import os
 from modules.key_generator import KeyGenerator
+from modules.key_pool import KeyPool
+from modules import algorithms
+
+# Key sizes offered per algorithm; only these are ever pre-generated
+KEY_SIZES = {
+    "RSA": ("1024", "2048", "3072", "4096"),
+    "DSA": ("1024", "2048", "3072", "4096"),
+}
 
 class KeyTab:
     def __init__(self, notebook, shared_state):
         self.frame = ttk.Frame(notebook)
         self.shared_state = shared_state
         
-        # Initialize key generator
-        self.key_gen = KeyGenerator()
+        # Key generator; the pool of pre-generated keys (worker processes) is only
+        # started once the user picks an RSA/DSA key size from the list
+        self.key_pool = None
+        self.key_gen = KeyGenerator(keyring=shared_state.get("keyring"))
         
         # Variables
         self.private_key_path = tk.StringVar()
@@ -31,14 +41,31 @@ class KeyTab:
         self.algo_var = tk.StringVar(value="RSA")
         ttk.Radiobutton(algo_frame, text="RSA", variable=self.algo_var, value="RSA").pack(side='left', padx=5)
         ttk.Radiobutton(algo_frame, text="DSA", variable=self.algo_var, value="DSA").pack(side='left', padx=5)
+        for algorithm in ("ECDSA P-256", "ECDSA P-384", "Ed25519", "Ed448"):
+            ttk.Radiobutton(algo_frame, text=algorithm, variable=self.algo_var, value=algorithm).pack(side='left', padx=5)
         
         # Key size selection
         size_frame = ttk.Frame(gen_frame)
         size_frame.pack(fill='x', padx=5, pady=5)
         ttk.Label(size_frame, text="Kích thước khóa:").pack(side='left', padx=5)
         self.key_size = tk.StringVar(value="2048")
-        key_sizes = ["1024", "2048", "3072", "4096"]
-        ttk.Combobox(size_frame, textvariable=self.key_size, values=key_sizes, width=10).pack(side='left', padx=5)
+        self.key_size_box = ttk.Combobox(size_frame, textvariable=self.key_size, values=KEY_SIZES["RSA"], width=10)
+        self.key_size_box.pack(side='left', padx=5)
+        ttk.Label(size_frame, text="(chỉ áp dụng cho RSA và DSA)").pack(side='left', padx=5)
+        
+        # Keep keys ready in the background for a size picked from the list
+        # (not on every keystroke, where "2", "20", "204" would be queued)
+        self.algo_var.trace_add('write', self.on_algorithm_changed)
+        self.key_size_box.bind('<<ComboboxSelected>>', self.prefill_key_pool)
+        
+        # DSA domain parameters (reusing p/q/g makes DSA key generation near-instant)
+        params_frame = ttk.Frame(gen_frame)
+        params_frame.pack(fill='x', padx=5, pady=5)
+        self.reuse_dsa_params = tk.BooleanVar(value=False)
+        ttk.Checkbutton(params_frame, text="Dùng lại tham số DSA", variable=self.reuse_dsa_params,
+                        command=self.toggle_dsa_parameters).pack(side='left', padx=5)
+        ttk.Button(params_frame, text="Lưu tham số DSA", command=self.save_dsa_parameters).pack(side='left', padx=5)
+        ttk.Button(params_frame, text="Tải tham số DSA", command=self.load_dsa_parameters).pack(side='left', padx=5)
         
         # Generate button
         btn_frame = ttk.Frame(gen_frame)
@@ -83,33 +110,123 @@ class KeyTab:
         self.pub_key_status = ttk.Label(load_pub_frame, text="Chưa tải")
         self.pub_key_status.pack(side='left', padx=5)
     
+    def uses_key_size(self):
+        """Whether the selected algorithm takes a key size (elliptic curves have a fixed size)"""
+        return self.algo_var.get() in ("RSA", "DSA")
+    
+    def on_algorithm_changed(self, *args):
+        """Enable the key size only where it applies"""
+        self.key_size_box.config(state='normal' if self.uses_key_size() else 'disabled')
+    
+    def prefill_key_pool(self, *args):
+        """Pre-generate key pairs for the selected algorithm and size (starts the pool on first use)"""
+        algorithm = self.algo_var.get()
+        key_size = self.key_size.get()
+        if key_size not in KEY_SIZES.get(algorithm, ()):
+            return  # elliptic-curve keys are generated instantly; typed sizes are not pre-generated
+        if self.key_pool is None:
+            self.key_pool = KeyPool(depth=2)
+        self.key_pool.prefill(algorithm, int(key_size))
+    
+    def shutdown(self):
+        """Stop the key pool generator processes, if they were started"""
+        if self.key_pool is not None:
+            self.key_pool.shutdown()
+    
     def generate_keys(self):
-        """Generate a new key pair"""
+        """Generate a new key pair on the background worker"""
         try:
             algorithm = self.algo_var.get()
+            key_size = int(self.key_size.get()) if self.uses_key_size() else None
+            description = f"{algorithm} {key_size} bits" if key_size else algorithm
+            
+            # Generate into a separate KeyGenerator: a cancelled or discarded result must not
+            # replace the keys that save_private_key/save_public_key write
+            worker_gen = KeyGenerator(
+                key_pool=self.key_pool,
+                reuse_dsa_parameters=self.key_gen.reuse_dsa_parameters,
+                keyring=self.key_gen.keyring
+            )
+            worker_gen.dsa_parameters = self.key_gen.dsa_parameters  # shared domain parameter cache
+            
+            started = self.shared_state["task_runner"].run(
+                f"Đang sinh khóa {description}",
+                lambda progress, cancel_event: worker_gen.generate_keys(algorithm, key_size),
+                on_done=lambda keys: self.on_keys_generated(description, *keys),
+                on_error=lambda e: messagebox.showerror("Lỗi", f"Không thể sinh khóa: {str(e)}")
+            )
+            if not started:
+                messagebox.showwarning("Đang xử lý", "Một thao tác khác đang chạy. Vui lòng đợi hoặc hủy.")
+            
+        except Exception as e:
+            messagebox.showerror("Lỗi", f"Không thể sinh khóa: {str(e)}")
+    
+    def on_keys_generated(self, description, private_key, public_key):
+        """Publish a freshly generated key pair to the other tabs"""
+        # Only now does the pair become the one the save buttons write
+        self.key_gen.set_keys(private_key, public_key)
+        
+        # Update shared state
+        self.shared_state["private_key"] = private_key
+        self.shared_state["public_key"] = public_key
+        
+        # Update status labels
+        self.priv_key_status.config(text="Đã tạo")
+        self.pub_key_status.config(text="Đã tạo")
+        
+        # Display key information
+        self.private_key_path.set("Khóa riêng đã tạo")
+        self.public_key_path.set("Khóa công khai đã tạo")
+        
+        messagebox.showinfo("Thành công", f"Đã sinh cặp khóa {description}")
+    
+    def toggle_dsa_parameters(self):
+        """Enable or disable reuse of cached DSA parameters"""
+        self.key_gen.reuse_dsa_parameters = self.reuse_dsa_params.get()
+    
+    def save_dsa_parameters(self):
+        """Save the DSA parameters for the selected key size"""
+        try:
             key_size = int(self.key_size.get())
+            private_key = self.shared_state["private_key"]
+            if key_size not in self.key_gen.dsa_parameters:
+                if private_key is None or algorithms.resolve(private_key).name != 'DSA':
+                    messagebox.showerror("Lỗi", "Chưa có tham số DSA. Vui lòng sinh khóa DSA trước.")
+                    return
+                key_size = private_key.key_size
+                self.key_gen.dsa_parameters[key_size] = private_key.parameters()
             
-            if algorithm == "RSA":
-                private_key, public_key = self.key_gen.generate_rsa_keys(key_size=key_size)
-                messagebox.showinfo("Thành công", f"Đã sinh cặp khóa RSA {key_size} bits")
-            else:  # DSA
-                private_key, public_key = self.key_gen.generate_dsa_keys(key_size=key_size)
-                messagebox.showinfo("Thành công", f"Đã sinh cặp khóa DSA {key_size} bits")
+            filename = filedialog.asksaveasfilename(
+                defaultextension=".pem",
+                filetypes=[("PEM files", "*.pem"), ("All files", "*.*")]
+            )
+            if not filename:
+                return
             
-            # Update shared state
-            self.shared_state["private_key"] = private_key
-            self.shared_state["public_key"] = public_key
+            self.key_gen.save_dsa_parameters(filename, key_size)
+            messagebox.showinfo("Thành công", f"Đã lưu tham số DSA {key_size} bits vào {filename}")
             
-            # Update status labels
-            self.priv_key_status.config(text="Đã tạo")
-            self.pub_key_status.config(text="Đã tạo")
+        except Exception as e:
+            messagebox.showerror("Lỗi", f"Không thể lưu tham số DSA: {str(e)}")
+    
+    def load_dsa_parameters(self):
+        """Load DSA parameters and use them for new DSA keys"""
+        try:
+            filename = filedialog.askopenfilename(
+                filetypes=[("PEM files", "*.pem"), ("All files", "*.*")]
+            )
+            if not filename:
+                return
             
-            # Display key information
-            self.private_key_path.set("Khóa riêng đã tạo")
-            self.public_key_path.set("Khóa công khai đã tạo")
+            parameters = self.key_gen.load_dsa_parameters(filename)
+            key_size = parameters.parameter_numbers().p.bit_length()
+            self.reuse_dsa_params.set(True)
+            self.algo_var.set("DSA")
+            self.key_size.set(str(key_size))
+            messagebox.showinfo("Thành công", f"Đã tải tham số DSA {key_size} bits từ {filename}")
             
         except Exception as e:
-            messagebox.showerror("Lỗi", f"Không thể sinh khóa: {str(e)}")
+            messagebox.showerror("Lỗi", f"Không thể tải tham số DSA: {str(e)}")
     
     def save_private_key(self):
         """Save private key to file"""
@@ -2,6 +2,8 @@ import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import os
 from modules.signature import DigitalSignature  # Import the DigitalSignature class
+from modules.digest_cache import DigestCache
+from modules.signature_index import SignatureIndex
 
 class SignTab:
     def __init__(self, notebook, shared_state):
@@ -10,6 +12,9 @@ class SignTab:
         
         # Initialize DigitalSignature
         self.signature_tool = DigitalSignature()
+        # Both open files under ~/.digital_signature, so they are only created once opted in
+        self.digest_cache = None
+        self.signature_index = None
         
         # Build UI
         self.build_ui()
@@ -33,14 +38,43 @@ class SignTab:
         hash_frame.pack(fill='x', padx=5, pady=5)
         ttk.Label(hash_frame, text="Thuật toán hash:").pack(side='left', padx=5)
         self.hash_algo = tk.StringVar(value="SHA256")
-        hash_algos = ["SHA256", "SHA384", "SHA512"]
+        hash_algos = list(self.signature_tool.hash_algorithms)
         ttk.Combobox(hash_frame, textvariable=self.hash_algo, values=hash_algos, width=10).pack(side='left', padx=5)
         
+        # Opt-in digest cache (skips re-hashing files whose size/mtime/ctime/inode did not change)
+        self.use_digest_cache = tk.BooleanVar(value=False)
+        ttk.Checkbutton(sign_frame, text="Dùng bộ đệm hash (nhanh hơn khi ký lại tệp không đổi)",
+                        variable=self.use_digest_cache, command=self.toggle_digest_cache).pack(anchor='w', padx=10)
+        
+        # Opt-in provenance index (see provenance.py)
+        self.use_signature_index = tk.BooleanVar(value=False)
+        ttk.Checkbutton(sign_frame, text="Ghi chữ ký đã lưu vào chỉ mục (tra cứu bằng provenance)",
+                        variable=self.use_signature_index, command=self.toggle_signature_index).pack(anchor='w', padx=10)
+        
         # Sign button
         btn_frame = ttk.Frame(sign_frame)
         btn_frame.pack(fill='x', padx=5, pady=5)
         ttk.Button(btn_frame, text="Ký", command=self.sign_file).pack(side='left', padx=5)
     
+    def toggle_digest_cache(self):
+        """Enable or disable the digest cache for signing"""
+        if self.use_digest_cache.get() and self.digest_cache is None:
+            try:
+                self.digest_cache = DigestCache()
+            except Exception as e:
+                self.use_digest_cache.set(False)
+                messagebox.showerror("Lỗi", f"Không thể mở bộ đệm hash: {str(e)}")
+        self.signature_tool.digest_cache = self.digest_cache if self.use_digest_cache.get() else None
+    
+    def toggle_signature_index(self):
+        """Open the signature index the first time it is enabled"""
+        if self.use_signature_index.get() and self.signature_index is None:
+            try:
+                self.signature_index = SignatureIndex()
+            except Exception as e:
+                self.use_signature_index.set(False)
+                messagebox.showerror("Lỗi", f"Không thể mở chỉ mục chữ ký: {str(e)}")
+    
     def select_file(self):
         """Select a file to sign"""
         filename = filedialog.askopenfilename(
@@ -50,7 +84,7 @@ class SignTab:
             self.file_path.set(filename)
     
     def sign_file(self):
-        """Sign the selected file and display time taken"""
+        """Sign the selected file on the background worker"""
         try:
             file_path = self.file_path.get()
             if not file_path or not os.path.exists(file_path):
@@ -63,18 +97,41 @@ class SignTab:
                 return
             
             hash_algo = self.hash_algo.get()
-            signature = self.signature_tool.sign_file(file_path, private_key, hash_algo)
-            
-            # Save signature
+            started = self.shared_state["task_runner"].run(
+                "Đang ký tệp",
+                lambda progress, cancel_event: self.signature_tool.sign_file_envelope(
+                    file_path, private_key, hash_algo, progress=progress, cancel_event=cancel_event
+                ),
+                on_done=lambda envelope: self.on_signed(file_path, envelope),
+                on_error=lambda e: messagebox.showerror("Lỗi", f"Không thể ký tệp: {str(e)}"),
+                total_bytes=os.path.getsize(file_path)
+            )
+            if not started:
+                messagebox.showwarning("Đang xử lý", "Một thao tác khác đang chạy. Vui lòng đợi hoặc hủy.")
+        
+        except Exception as e:
+            messagebox.showerror("Lỗi", f"Không thể ký tệp: {str(e)}")
+    
+    def on_signed(self, file_path, envelope):
+        """Save the signature envelope once the background signing has finished"""
+        try:
             save_path = filedialog.asksaveasfilename(
                 defaultextension=".sig",
-                filetypes=[("Signature files", "*.sig"), ("All files", "*.*")]
+                filetypes=[("Signature files", "*.sig"), ("JSON signature", "*.json"), ("All files", "*.*")]
             )
             if save_path:
-                with open(save_path, "wb") as f:
-                    f.write(signature)
-                self.shared_state["current_signature"] = signature
+                # The envelope records hash, key and file size so verifiers need no extra input
+                signature_format = 'json' if save_path.lower().endswith('.json') else 'binary'
+                self.signature_tool.save_signature(envelope, save_path, signature_format=signature_format)
+                self.shared_state["current_signature"] = envelope.signature
+                if self.use_signature_index.get() and self.signature_index is not None:
+                    # Only signatures that were actually saved are indexed
+                    try:
+                        self.signature_index.record(file_path, envelope, save_path)
+                    except Exception as e:
+                        messagebox.showwarning("Cảnh báo", f"Đã lưu chữ ký vào {save_path} nhưng không ghi được chỉ mục: {str(e)}")
+                        return
                 messagebox.showinfo("Thành công", f"Đã ký tệp và lưu chữ ký vào {save_path}")
         
         except Exception as e:
-            messagebox.showerror("Lỗi", f"Không thể ký tệp: {str(e)}")
\ No newline at end of file
+            messagebox.showerror("Lỗi", f"Không thể lưu chữ ký: {str(e)}")
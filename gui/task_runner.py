@@ -0,0 +1,129 @@
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+from modules.hashing import OperationCancelled
+
+# How often the Tk main loop polls the running task (milliseconds)
+POLL_INTERVAL_MS = 100
+
+
+def format_duration(seconds):
+    """Format seconds as mm:ss (or hh:mm:ss)"""
+    seconds = int(seconds)
+    hours, remainder = divmod(seconds, 3600)
+    minutes, seconds = divmod(remainder, 60)
+    if hours:
+        return f"{hours:d}:{minutes:02d}:{seconds:02d}"
+    return f"{minutes:02d}:{seconds:02d}"
+
+
+def format_progress(label, done_bytes, total_bytes, elapsed):
+    """Build the status bar text with percentage, throughput and ETA"""
+    if not total_bytes or elapsed <= 0:
+        return f"{label}... {format_duration(elapsed)}"
+
+    rate = done_bytes / elapsed
+    percent = 100.0 * done_bytes / total_bytes
+    message = f"{label}: {percent:.1f}% - {rate / (1024 * 1024):.1f} MB/giây"
+    if rate > 0 and done_bytes < total_bytes:
+        message += f" - còn lại {format_duration((total_bytes - done_bytes) / rate)}"
+    return message
+
+
+class TaskRunner:
+    def __init__(self, root, on_status=None, on_busy=None):
+        """
+        Run blocking crypto operations on a worker thread and report back on the Tk main loop
+        :param root: Tk root window (used for root.after polling)
+        :param on_status: Callable receiving status bar messages
+        :param on_busy: Callable receiving True when a task starts and False when it ends
+        """
+        self.root = root
+        self.on_status = on_status
+        self.on_busy = on_busy
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.future = None
+        self.cancel_event = None
+        self.done_bytes = 0
+
+    @property
+    def busy(self):
+        return self.future is not None
+
+    def run(self, label, func, on_done, on_error=None, total_bytes=None):
+        """
+        Start a task
+        :param label: Text shown in the status bar while running
+        :param func: Callable(progress, cancel_event) executed on the worker thread
+        :param on_done: Called on the main loop with the result
+        :param on_error: Called on the main loop with the exception (not called on cancel)
+        :param total_bytes: Expected number of bytes processed, enables percentage and ETA
+        :return: False if another task is already running
+        """
+        if self.busy:
+            return False
+
+        self.cancel_event = threading.Event()
+        self.done_bytes = 0
+        start_time = time.perf_counter()
+
+        def progress(done_bytes):
+            # Called from the worker thread; the main loop only reads it
+            self.done_bytes = done_bytes
+
+        self.future = self.executor.submit(func, progress, self.cancel_event)
+        self._set_busy(True)
+        self.root.after(POLL_INTERVAL_MS, self._poll, label, start_time, total_bytes, on_done, on_error)
+        return True
+
+    def cancel(self):
+        """Request cancellation of the running task"""
+        if self.cancel_event is not None:
+            self.cancel_event.set()
+
+    def _poll(self, label, start_time, total_bytes, on_done, on_error):
+        """Check the running task from the Tk main loop"""
+        elapsed = time.perf_counter() - start_time
+
+        if not self.future.done():
+            self._set_status(format_progress(label, self.done_bytes, total_bytes, elapsed))
+            self.root.after(POLL_INTERVAL_MS, self._poll, label, start_time, total_bytes, on_done, on_error)
+            return
+
+        future = self.future
+        cancelled = self.cancel_event.is_set()
+        self.future = None
+        self.cancel_event = None
+        self._set_busy(False)
+
+        try:
+            result = future.result()
+        except OperationCancelled:
+            self._set_status(f"{label}: đã hủy")
+            return
+        except Exception as e:
+            self._set_status(f"{label}: lỗi")
+            if on_error and not cancelled:
+                on_error(e)
+            return
+
+        if cancelled:
+            # The operation could not be interrupted; discard its result
+            self._set_status(f"{label}: đã hủy")
+            return
+
+        self._set_status(f"{label}: hoàn tất trong {elapsed:.2f} giây")
+        on_done(result)
+
+    def _set_status(self, message):
+        if self.on_status:
+            self.on_status(message)
+
+    def _set_busy(self, busy):
+        if self.on_busy:
+            self.on_busy(busy)
+
+    def shutdown(self):
+        """Cancel the running task and stop the worker thread"""
+        self.cancel()
+        self.executor.shutdown(wait=False)
@@ -3,14 +3,17 @@ import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import os
 from modules.signature import DigitalSignature  # Import the DigitalSignature class
+from modules.digest_cache import DigestCache
 
 class VerifyTab:
     def __init__(self, notebook, shared_state):
         self.frame = ttk.Frame(notebook)
         self.shared_state = shared_state
         
-        # Initialize DigitalSignature
+        # Initialize DigitalSignature; the digest cache trusts file metadata, so
+        # verification only uses it when the user opts in
         self.signature_tool = DigitalSignature()
+        self.digest_cache = None
         
         # Build UI
         self.build_ui()
@@ -37,19 +40,38 @@ class VerifyTab:
         ttk.Entry(sig_frame, textvariable=self.signature_path, width=50).pack(side='left', padx=5, fill='x', expand=True)
         ttk.Button(sig_frame, text="Chọn", command=self.select_signature).pack(side='left', padx=5)
 
+        # Directory of known public keys, selected by the signature's key ID
+        key_dir_frame = ttk.Frame(verify_frame)
+        key_dir_frame.pack(fill='x', padx=5, pady=5)
+        ttk.Label(key_dir_frame, text="Thư mục khóa công khai:").pack(side='left', padx=5)
+        self.key_dir_status = tk.StringVar(value="Chưa nạp")
+        ttk.Label(key_dir_frame, textvariable=self.key_dir_status).pack(side='left', padx=5)
+        ttk.Button(key_dir_frame, text="Chọn", command=self.select_key_directory).pack(side='left', padx=5)
+
         # Hash algorithm selection
         hash_frame = ttk.Frame(verify_frame)
         hash_frame.pack(fill='x', padx=5, pady=5)
         ttk.Label(hash_frame, text="Thuật toán hash:").pack(side='left', padx=5)
         self.hash_algo = tk.StringVar(value="SHA256")
-        hash_algos = ["SHA256", "SHA384", "SHA512"]
+        hash_algos = list(self.signature_tool.hash_algorithms)
         ttk.Combobox(hash_frame, textvariable=self.hash_algo, values=hash_algos, width=10).pack(side='left', padx=5)
 
+        # Opt-in digest cache (skips re-hashing files whose size/mtime/ctime/inode did not change)
+        self.use_digest_cache = tk.BooleanVar(value=False)
+        ttk.Checkbutton(verify_frame, text="Dùng bộ đệm hash (nhanh hơn; chỉ dùng với tệp đáng tin cậy)",
+                        variable=self.use_digest_cache, command=self.toggle_digest_cache).pack(anchor='w', padx=10)
+
         # Verify button
         btn_frame = ttk.Frame(verify_frame)
         btn_frame.pack(fill='x', padx=5, pady=5)
         ttk.Button(btn_frame, text="Xác thực", command=self.verify_signature).pack(side='left', padx=5)
     
+    def toggle_digest_cache(self):
+        """Enable or disable the digest cache for verification"""
+        if self.use_digest_cache.get() and self.digest_cache is None:
+            self.digest_cache = DigestCache()
+        self.signature_tool.digest_cache = self.digest_cache if self.use_digest_cache.get() else None
+    
     def select_file(self):
         """Select a file to verify"""
         filename = filedialog.askopenfilename(
@@ -61,13 +83,24 @@ class VerifyTab:
     def select_signature(self):
         """Select a signature file"""
         filename = filedialog.askopenfilename(
-            filetypes=[("Signature files", "*.sig"), ("All files", "*.*")]
+            filetypes=[("Signature files", "*.sig"), ("JSON signature", "*.json"), ("All files", "*.*")]
         )
         if filename:
             self.signature_path.set(filename)
     
+    def select_key_directory(self):
+        """Load every public key in a directory into the shared keyring"""
+        directory = filedialog.askdirectory()
+        if not directory:
+            return
+        try:
+            fingerprints = self.shared_state["keyring"].load_public_key_directory(directory)
+            self.key_dir_status.set(f"{len(fingerprints)} khóa từ {directory}")
+        except Exception as e:
+            messagebox.showerror("Lỗi", f"Không thể nạp thư mục khóa: {str(e)}")
+    
     def verify_signature(self):
-        """Verify the signature of the selected file and display time taken"""
+        """Verify the signature of the selected file on the background worker"""
         try:
             file_path = self.file_path.get()
             signature_path = self.signature_path.get()
@@ -80,20 +113,69 @@ class VerifyTab:
                 messagebox.showerror("Lỗi", "Chữ ký không tồn tại.")
                 return
             
+            keyring = self.shared_state["keyring"]
             public_key = self.shared_state.get("public_key")
-            if not public_key:
+            
+            merkle_signature = self.signature_tool.load_merkle_signature(signature_path)
+            if merkle_signature is not None:
+                # Chunked signature: the tree names its hash and key, chunks are re-hashed in parallel
+                self.hash_algo.set(merkle_signature.envelope.hash_algorithm)
+                self.run_verification(
+                    file_path,
+                    lambda progress, cancel_event: self.signature_tool.verify_file_chunked(
+                        file_path, merkle_signature, public_key, keyring,
+                        progress=progress, cancel_event=cancel_event
+                    )
+                )
+                return
+            
+            envelope = self.signature_tool.load_envelope(signature_path)
+            if envelope is not None:
+                # The envelope names its hash and key: no need to pick them
+                self.hash_algo.set(envelope.hash_algorithm)
+                self.run_verification(
+                    file_path,
+                    lambda progress, cancel_event: self.signature_tool.verify_envelope(
+                        file_path, envelope, public_key, keyring,
+                        progress=progress, cancel_event=cancel_event
+                    )
+                )
+                return
+            
+            key_id = self.signature_tool.load_key_id(signature_path)
+            if not public_key and (not key_id or keyring.find_public_key(key_id) is None):
                 messagebox.showerror("Lỗi", "Chưa có khóa công khai. Vui lòng tải hoặc tạo khóa trước.")
                 return
             
-            with open(signature_path, "rb") as f:
-                signature = f.read()
+            signature = self.signature_tool.load_signature(signature_path)
             
             hash_algo = self.hash_algo.get()  # Get the selected hash algorithm
-            is_valid = self.signature_tool.verify_file_signature(file_path, signature, public_key, hash_algorithm=hash_algo)
-            if is_valid:
-                messagebox.showinfo("Thành công", "Chữ ký hợp lệ.")
-            else:
-                messagebox.showerror("Lỗi", "Chữ ký không hợp lệ.")
+            self.run_verification(
+                file_path,
+                lambda progress, cancel_event: self.signature_tool.verify_file_signature(
+                    file_path, signature, public_key, hash_algorithm=hash_algo,
+                    progress=progress, cancel_event=cancel_event, keyring=keyring, key_id=key_id
+                )
+            )
         
         except Exception as e:
-            messagebox.showerror("Lỗi", f"Không thể xác thực chữ ký: {str(e)}")
\ No newline at end of file
+            messagebox.showerror("Lỗi", f"Không thể xác thực chữ ký: {str(e)}")
+    
+    def run_verification(self, file_path, func):
+        """Run a verification on the background worker"""
+        started = self.shared_state["task_runner"].run(
+            "Đang xác thực chữ ký",
+            func,
+            on_done=self.on_verified,
+            on_error=lambda e: messagebox.showerror("Lỗi", f"Không thể xác thực chữ ký: {str(e)}"),
+            total_bytes=os.path.getsize(file_path)
+        )
+        if not started:
+            messagebox.showwarning("Đang xử lý", "Một thao tác khác đang chạy. Vui lòng đợi hoặc hủy.")
+    
+    def on_verified(self, is_valid):
+        """Show the verification result once the background work has finished"""
+        if is_valid:
+            messagebox.showinfo("Thành công", "Chữ ký hợp lệ.")
+        else:
+            messagebox.showerror("Lỗi", "Chữ ký không hợp lệ.")
\ No newline at end of file
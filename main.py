@@ -1,10 +1,51 @@
-import tkinter as tk
-from gui.app import DigitalSignatureApp
+import sys
+
+# Headless subcommands: dispatched without importing tkinter or the GUI
+COMMANDS = {
+    "sign": "batch_sign",
+    "verify": "batch_verify",
+    "daemon": "signing_daemon",
+    "provenance": "provenance",
+}
+
+USAGE = """Cách dùng:
+  python main.py                 Mở giao diện đồ họa
+  python main.py sign ...        Ký hàng loạt tệp (xem: python main.py sign --help)
+  python main.py verify ...      Xác thực hàng loạt chữ ký
+  python main.py daemon ...      Máy chủ ký giữ khóa trong bộ nhớ
+  python main.py provenance ...  Tra cứu chỉ mục chữ ký"""
+
+
+def run_command(command, argv):
+    """Run a command-line tool by name, importing only that tool"""
+    import importlib
+
+    module = importlib.import_module(COMMANDS[command])
+    return module.main(argv)
+
+
+def run_gui():
+    # tkinter and the tabs are only imported when the window is actually opened
+    import tkinter as tk
+    from gui.app import DigitalSignatureApp
 
-def main():
     root = tk.Tk()
     app = DigitalSignatureApp(root)
     root.mainloop()
+    return 0
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] in COMMANDS:
+        return run_command(argv[0], argv[1:])
+    if argv and argv[0] in ("-h", "--help"):
+        print(USAGE)
+        return 0
+    if argv:
+        print(USAGE, file=sys.stderr)
+        return 2
+    return run_gui()
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
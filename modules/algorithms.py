@@ -0,0 +1,195 @@
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import padding, utils, rsa, dsa, ec, ed25519, ed448
+
+
+class SignatureScheme:
+    """
+    Signing/verification strategy for one family of keys
+    Subclasses set the key types they handle and implement the four operations.
+    Per-hash objects (padding, Prehashed, ...) are built once and reused.
+    """
+    name = None
+    padding_name = ''  # recorded in signature envelopes
+    private_key_types = ()
+    public_key_types = ()
+
+    def __init__(self):
+        self._hash_params = {}
+
+    def params(self, hash_algo):
+        """Return the cached (message_params, digest_params) for a hash algorithm"""
+        params = self._hash_params.get(hash_algo.name)
+        if params is None:
+            params = self._hash_params[hash_algo.name] = self.build_params(hash_algo)
+        return params
+
+    def build_params(self, hash_algo):
+        """Build the (message_params, digest_params) objects for a hash algorithm"""
+        raise NotImplementedError
+
+    def padding_for(self, hash_algo):
+        """Padding description recorded in signature envelopes"""
+        return self.padding_name
+
+    def sign_message(self, private_key, message, hash_algo):
+        raise NotImplementedError
+
+    def verify_message(self, public_key, signature, message, hash_algo):
+        """Raise InvalidSignature on mismatch"""
+        raise NotImplementedError
+
+    def sign_digest(self, private_key, digest, hash_algo):
+        raise NotImplementedError
+
+    def verify_digest(self, public_key, signature, digest, hash_algo):
+        """Raise InvalidSignature on mismatch"""
+        raise NotImplementedError
+
+
+class RSAPSSScheme(SignatureScheme):
+    name = 'RSA-PSS'
+    padding_name = 'PSS-MGF1-MAXSALT'
+    private_key_types = (rsa.RSAPrivateKey,)
+    public_key_types = (rsa.RSAPublicKey,)
+
+    # OpenSSL cannot use these inside RSA signatures (no DigestInfo/PSS support):
+    # their digest is signed as a message with PSS over SHA-512 instead of prehashed
+    non_prehash_hashes = ('blake2b', 'blake2s')
+    fallback_hash = hashes.SHA512()
+
+    def build_params(self, hash_algo):
+        if hash_algo.name in self.non_prehash_hashes:
+            pss = padding.PSS(mgf=padding.MGF1(self.fallback_hash), salt_length=padding.PSS.MAX_LENGTH)
+            return None, (pss, self.fallback_hash)
+        pss = padding.PSS(mgf=padding.MGF1(hash_algo), salt_length=padding.PSS.MAX_LENGTH)
+        return (pss, hash_algo), (pss, utils.Prehashed(hash_algo))
+
+    def padding_for(self, hash_algo):
+        if hash_algo.name in self.non_prehash_hashes:
+            return f'{self.padding_name}-{self.fallback_hash.name.upper()}-OVER-DIGEST'
+        return self.padding_name
+
+    @staticmethod
+    def _digest(message, hash_algo):
+        hasher = hashes.Hash(hash_algo)
+        hasher.update(message)
+        return hasher.finalize()
+
+    def sign_message(self, private_key, message, hash_algo):
+        if hash_algo.name in self.non_prehash_hashes:
+            return self.sign_digest(private_key, self._digest(message, hash_algo), hash_algo)
+        return private_key.sign(message, *self.params(hash_algo)[0])
+
+    def verify_message(self, public_key, signature, message, hash_algo):
+        if hash_algo.name in self.non_prehash_hashes:
+            return self.verify_digest(public_key, signature, self._digest(message, hash_algo), hash_algo)
+        public_key.verify(signature, message, *self.params(hash_algo)[0])
+
+    def sign_digest(self, private_key, digest, hash_algo):
+        return private_key.sign(digest, *self.params(hash_algo)[1])
+
+    def verify_digest(self, public_key, signature, digest, hash_algo):
+        public_key.verify(signature, digest, *self.params(hash_algo)[1])
+
+
+class DSAScheme(SignatureScheme):
+    name = 'DSA'
+    private_key_types = (dsa.DSAPrivateKey,)
+    public_key_types = (dsa.DSAPublicKey,)
+
+    def build_params(self, hash_algo):
+        # Signing the prehashed digest is equivalent to signing the content
+        return hash_algo, utils.Prehashed(hash_algo)
+
+    def sign_message(self, private_key, message, hash_algo):
+        return private_key.sign(message, self.params(hash_algo)[0])
+
+    def verify_message(self, public_key, signature, message, hash_algo):
+        public_key.verify(signature, message, self.params(hash_algo)[0])
+
+    def sign_digest(self, private_key, digest, hash_algo):
+        return private_key.sign(digest, self.params(hash_algo)[1])
+
+    def verify_digest(self, public_key, signature, digest, hash_algo):
+        public_key.verify(signature, digest, self.params(hash_algo)[1])
+
+
+class ECDSAScheme(DSAScheme):
+    name = 'ECDSA'
+    private_key_types = (ec.EllipticCurvePrivateKey,)
+    public_key_types = (ec.EllipticCurvePublicKey,)
+
+    def build_params(self, hash_algo):
+        return ec.ECDSA(hash_algo), ec.ECDSA(utils.Prehashed(hash_algo))
+
+
+class EdDSAScheme(SignatureScheme):
+    """EdDSA hashes internally: hash_algorithm does not apply to messages, and
+    files are signed by using the digest bytes as the message (no prehashed mode)"""
+
+    def sign_message(self, private_key, message, hash_algo):
+        return private_key.sign(message)
+
+    def verify_message(self, public_key, signature, message, hash_algo):
+        public_key.verify(signature, message)
+
+    sign_digest = sign_message
+    verify_digest = verify_message
+
+
+class Ed25519Scheme(EdDSAScheme):
+    name = 'Ed25519'
+    private_key_types = (ed25519.Ed25519PrivateKey,)
+    public_key_types = (ed25519.Ed25519PublicKey,)
+
+
+class Ed448Scheme(EdDSAScheme):
+    name = 'Ed448'
+    private_key_types = (ed448.Ed448PrivateKey,)
+    public_key_types = (ed448.Ed448PublicKey,)
+
+
+# Registered schemes, and a cache of concrete key class -> scheme
+_schemes = []
+_schemes_by_key_type = {}
+
+
+def register(scheme):
+    """
+    Register a SignatureScheme instance
+    Later registrations take precedence, so a scheme can override a built-in one.
+    """
+    _schemes.insert(0, scheme)
+    _schemes_by_key_type.clear()
+    return scheme
+
+
+def resolve(key):
+    """
+    Return the scheme handling a private or public key
+    The isinstance() lookup runs once per concrete key class, then hits the cache.
+    :raises ValueError: if no scheme supports the key
+    """
+    key_type = type(key)
+    scheme = _schemes_by_key_type.get(key_type)
+    if scheme is None:
+        for candidate in _schemes:
+            if isinstance(key, candidate.private_key_types + candidate.public_key_types):
+                scheme = candidate
+                break
+        else:
+            raise ValueError("Unsupported key type")
+        _schemes_by_key_type[key_type] = scheme
+    return scheme
+
+
+def get_scheme(name):
+    """Return the registered scheme with this name"""
+    for scheme in _schemes:
+        if scheme.name == name:
+            return scheme
+    raise ValueError(f"Unknown signature scheme: {name}")
+
+
+for _scheme_class in (RSAPSSScheme, DSAScheme, ECDSAScheme, Ed25519Scheme, Ed448Scheme):
+    register(_scheme_class())
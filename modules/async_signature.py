@@ -0,0 +1,131 @@
+"""
+Asyncio facade over DigitalSignature
+
+File reading, hashing and private/public-key operations run on an executor
+(hashlib and OpenSSL release the GIL), so the event loop stays responsive. A
+semaphore bounds how many operations run at once. Uploads can be signed as
+they arrive from an async byte iterator without buffering them:
+
+    signer = AsyncDigitalSignature(max_concurrency=8)
+    signature = await signer.sign_stream(request.content.iter_chunked(1 << 20), private_key)
+"""
+import asyncio
+from modules import hashing
+from modules.signature import DigitalSignature
+
+# Chunks up to this size are hashed on the event loop; handing them to a thread costs more
+INLINE_UPDATE_LIMIT = 64 * 1024
+
+
+class AsyncDigitalSignature:
+    def __init__(self, signature_tool=None, executor=None, max_concurrency=None):
+        """
+        :param signature_tool: DigitalSignature doing the work (default: a new one)
+        :param executor: concurrent.futures executor (default: the loop's default executor)
+        :param max_concurrency: Maximum operations running at once (default: unbounded)
+        """
+        self.signature_tool = signature_tool or DigitalSignature()
+        self.executor = executor
+        self.semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+
+    async def _run(self, func, *args):
+        """Run a blocking call on the executor, within the concurrency limit"""
+        loop = asyncio.get_running_loop()
+        if self.semaphore is None:
+            return await loop.run_in_executor(self.executor, func, *args)
+        async with self.semaphore:
+            return await loop.run_in_executor(self.executor, func, *args)
+
+    async def sign_message(self, message, private_key, hash_algorithm='SHA256'):
+        """Async DigitalSignature.sign_message"""
+        return await self._run(self.signature_tool.sign_message, message, private_key, hash_algorithm)
+
+    async def verify_signature(self, message, signature, public_key, hash_algorithm='SHA256'):
+        """Async DigitalSignature.verify_signature"""
+        return await self._run(self.signature_tool.verify_signature, message, signature, public_key, hash_algorithm)
+
+    async def sign_file(self, file_path, private_key, hash_algorithm='SHA256'):
+        """Async DigitalSignature.sign_file"""
+        return await self._run(self.signature_tool.sign_file, file_path, private_key, hash_algorithm)
+
+    async def verify_file_signature(self, file_path, signature, public_key, hash_algorithm='SHA256'):
+        """Async DigitalSignature.verify_file_signature"""
+        return await self._run(
+            self.signature_tool.verify_file_signature, file_path, signature, public_key, hash_algorithm
+        )
+
+    async def sign_files(self, file_paths, private_key, hash_algorithm='SHA256'):
+        """
+        Sign several files concurrently
+        :return: List of signatures (or the exception raised for that file), in input order
+        """
+        return await asyncio.gather(
+            *(self.sign_file(path, private_key, hash_algorithm) for path in file_paths),
+            return_exceptions=True
+        )
+
+    async def verify_files(self, items, public_key, hash_algorithm='SHA256'):
+        """
+        Verify several files concurrently
+        :param items: Iterable of (file path, signature bytes)
+        :return: List of booleans (or the exception raised for that file), in input order
+        """
+        return await asyncio.gather(
+            *(self.verify_file_signature(path, signature, public_key, hash_algorithm) for path, signature in items),
+            return_exceptions=True
+        )
+
+    async def digest_stream(self, chunks, hash_algorithm='SHA256'):
+        """
+        Hash an async iterator of byte chunks as they arrive
+        :param chunks: Async iterable yielding bytes-like objects
+        :param hash_algorithm: Hash algorithm name
+        :return: Tuple of (digest bytes, number of bytes hashed)
+        """
+        hash_algo = self.signature_tool.hash_algorithms.get(
+            hash_algorithm, self.signature_tool.hash_algorithms['SHA256']
+        )
+        hasher = hashing.new_hasher(hash_algo.name)
+        total = 0
+
+        async for chunk in chunks:
+            if len(chunk) > INLINE_UPDATE_LIMIT:
+                # Updates stay ordered: the next chunk is only read after this one is hashed.
+                # The semaphore is held per chunk, not while waiting for the next one.
+                await self._run(hasher.update, chunk)
+            else:
+                hasher.update(chunk)
+            total += len(chunk)
+
+        return hasher.digest(), total
+
+    async def sign_stream(self, chunks, private_key, hash_algorithm='SHA256'):
+        """
+        Sign data from an async byte iterator without buffering it
+        The signature is identical to sign_file over the same bytes.
+        :return: Signature bytes
+        """
+        digest, _ = await self.digest_stream(chunks, hash_algorithm)
+        return await self._run(self.signature_tool.sign_digest, digest, private_key, hash_algorithm)
+
+    async def sign_stream_envelope(self, chunks, private_key, hash_algorithm='SHA256'):
+        """
+        Sign data from an async byte iterator and wrap it in a SignatureEnvelope
+        :return: SignatureEnvelope (see modules.envelope)
+        :raises ValueError: for an unknown hash algorithm, before the stream is read
+        """
+        # digest_stream falls back to SHA256 like sign_file, but an envelope records the
+        # algorithm name, so an unknown one is rejected up front as in sign_file_envelope
+        if hash_algorithm not in self.signature_tool.hash_algorithms:
+            raise ValueError(f"Unsupported hash algorithm: {hash_algorithm}")
+        digest, total = await self.digest_stream(chunks, hash_algorithm)
+        signature = await self._run(self.signature_tool.sign_digest, digest, private_key, hash_algorithm)
+        return self.signature_tool.create_envelope(digest, signature, private_key, hash_algorithm, total)
+
+    async def verify_stream(self, chunks, signature, public_key, hash_algorithm='SHA256'):
+        """
+        Verify data from an async byte iterator against a file signature
+        :return: True if signature is valid, False otherwise
+        """
+        digest, _ = await self.digest_stream(chunks, hash_algorithm)
+        return await self._run(self.signature_tool.verify_digest, digest, signature, public_key, hash_algorithm)
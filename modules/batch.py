@@ -0,0 +1,500 @@
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from cryptography.hazmat.primitives import serialization
+from modules.signature import DigitalSignature
+from modules.envelope import EnvelopeMismatch, parse as parse_envelope
+from modules.merkle import MerkleSignature, is_merkle_signature
+from modules.digest_cache import DigestCache
+from modules.keyring import Keyring
+from modules.utils import get_key_fingerprint
+from modules import hashing
+import csv
+import hmac
+import json
+import multiprocessing
+import os
+import time
+
+# Per-process state for the pool workers (the key is loaded once per process)
+_worker_state = {}
+
+
+def collect_files(paths=None, manifest=None, extension_filter=None):
+    """
+    Build the list of files to process from directories, file paths or a manifest
+    :param paths: Iterable of file or directory paths (directories are walked recursively)
+    :param manifest: Path to a text file with one file path per line
+                     (relative paths are resolved against the manifest's directory)
+    :param extension_filter: Optional extension (e.g. '.sig') or tuple of extensions to skip while walking
+    :return: Sorted list of file paths
+    """
+    files = []
+
+    for path in paths or []:
+        if os.path.isdir(path):
+            for dirpath, dirnames, filenames in os.walk(path):
+                dirnames.sort()
+                for name in filenames:
+                    if extension_filter and name.endswith(extension_filter):
+                        continue
+                    files.append(os.path.join(dirpath, name))
+        else:
+            files.append(path)
+
+    if manifest:
+        base_dir = os.path.dirname(os.path.abspath(manifest))
+        with open(manifest, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith('#'):
+                    continue
+                files.append(line if os.path.isabs(line) else os.path.join(base_dir, line))
+
+    return sorted(set(files))
+
+
+def common_root(paths):
+    """Return the directory shared by all given paths (None if there are none)"""
+    if not paths:
+        return None
+    root = os.path.commonpath([os.path.abspath(p) for p in paths])
+    return os.path.dirname(root) if os.path.isfile(root) else root
+
+
+def signature_path_for(file_path, out_dir=None, root=None):
+    """
+    Return where the signature of file_path is stored
+    :param file_path: Signed file
+    :param out_dir: Optional directory mirroring the tree under root
+    :param root: Root the relative path is computed from when out_dir is given
+    :return: Path of the .sig file
+    """
+    if not out_dir:
+        return file_path + '.sig'
+    rel_path = os.path.relpath(file_path, root) if root else os.path.basename(file_path)
+    return os.path.join(out_dir, rel_path + '.sig')
+
+
+def hash_file(file_path, hash_algorithm='SHA256', digest_cache=None):
+    """
+    Hash a file with hashlib (releases the GIL, so it scales across threads)
+    :param digest_cache: Optional DigestCache consulted before reading the file
+    :return: Tuple of (digest bytes, file size)
+    """
+    def compute(path):
+        return hashing.hash_file(path, hash_algorithm)
+
+    size = os.path.getsize(file_path)
+    if digest_cache:
+        return digest_cache.get_or_compute(file_path, hash_algorithm, compute), size
+    return compute(file_path), size
+
+
+def _init_sign_worker(key_pem):
+    """Load the private key once in every signing process"""
+    _worker_state['private_key'] = serialization.load_pem_private_key(key_pem, password=None)
+    _worker_state['signature_tool'] = DigitalSignature()
+
+
+def _sign_digest_worker(digest, hash_algorithm):
+    """Private-key operation executed in a signing process"""
+    return _worker_state['signature_tool'].sign_digest(digest, _worker_state['private_key'], hash_algorithm)
+
+
+def _init_verify_worker(key_pem, digest_cache_path=None, keyring_pems=()):
+    """Load the public key(s) (and open the digest cache) once in every verification process"""
+    _worker_state['public_key'] = serialization.load_pem_public_key(key_pem) if key_pem else None
+    if keyring_pems:
+        keyring = Keyring()
+        for pem in keyring_pems:
+            keyring.add_public_key(serialization.load_pem_public_key(pem))
+        _worker_state['keyring'] = keyring
+    else:
+        _worker_state['keyring'] = None
+    _worker_state['signature_tool'] = DigitalSignature()
+    _worker_state['digest_cache'] = DigestCache(digest_cache_path) if digest_cache_path else None
+
+
+def _verify_file_worker(path, signature_path, hash_algorithm):
+    """Hash and verify one file inside a verification process"""
+    return verify_one(
+        path, signature_path, _worker_state['public_key'],
+        _worker_state['signature_tool'], hash_algorithm, _worker_state['digest_cache'],
+        _worker_state['keyring']
+    )
+
+
+def _verify_result(path, signature_path):
+    """Base verification result, filled in as the checks progress"""
+    return {
+        "path": path,
+        "signature_path": signature_path,
+        "key_id": None,
+        "size": 0,
+        "ok": False,
+        "status": "error",
+        "error": None,
+        "hash_seconds": 0.0,
+        "verify_seconds": 0.0
+    }
+
+
+def verify_one(path, signature_path, public_key, signature_tool, hash_algorithm, digest_cache=None,
+               keyring=None):
+    """
+    Verify a single file against its detached signature
+    :param keyring: Optional Keyring; the key named by the signature's key ID is used
+    :return: Result dict with status 'valid', 'invalid', 'missing_signature' or 'error'
+    """
+    result = _verify_result(path, signature_path)
+
+    if not os.path.exists(signature_path):
+        result["status"] = "missing_signature"
+        result["error"] = "Signature file not found"
+        return result
+
+    try:
+        with open(signature_path, 'rb') as f:
+            signature = f.read()
+
+        if is_merkle_signature(signature):
+            return _verify_merkle(result, path, MerkleSignature.from_bytes(signature), public_key,
+                                  signature_tool, keyring)
+
+        envelope = parse_envelope(signature)
+        if envelope is not None:
+            return _verify_envelope(result, path, envelope, public_key, signature_tool, digest_cache, keyring)
+
+        result["key_id"] = signature_tool.load_key_id(signature_path)
+        if keyring is not None and result["key_id"]:
+            # Same fallback as check_envelope: the explicit key covers IDs missing from the keyring
+            public_key = keyring.find_public_key(result["key_id"]) or public_key
+            if public_key is None:
+                raise ValueError(f"Unknown key ID: {result['key_id']}")
+        if public_key is None:
+            raise ValueError("No public key to verify with")
+
+        start_time = time.perf_counter()
+        digest, result["size"] = hash_file(path, hash_algorithm, digest_cache)
+        result["hash_seconds"] = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        result["ok"] = signature_tool.verify_digest(digest, signature, public_key, hash_algorithm)
+        result["verify_seconds"] = time.perf_counter() - start_time
+
+        result["status"] = "valid" if result["ok"] else "invalid"
+    except Exception as e:
+        result["error"] = str(e)
+
+    return result
+
+
+def _verify_envelope(result, path, envelope, public_key, signature_tool, digest_cache, keyring):
+    """Verify against a signature envelope: O(1) checks and the key operation come before hashing"""
+    result["key_id"] = envelope.key_id
+    try:
+        start_time = time.perf_counter()
+        signature_ok = signature_tool.check_envelope(path, envelope, public_key, keyring)
+        result["verify_seconds"] = time.perf_counter() - start_time
+
+        if signature_ok:
+            start_time = time.perf_counter()
+            digest, result["size"] = hash_file(path, envelope.hash_algorithm, digest_cache)
+            result["hash_seconds"] = time.perf_counter() - start_time
+            result["ok"] = hmac.compare_digest(digest, envelope.digest)
+
+        result["status"] = "valid" if result["ok"] else "invalid"
+    except EnvelopeMismatch as e:
+        result["status"] = "invalid"
+        result["error"] = str(e)
+    except Exception as e:
+        result["error"] = str(e)
+    return result
+
+
+def _verify_merkle(result, path, merkle_signature, public_key, signature_tool, keyring):
+    """Verify a chunked (Merkle tree) signature; chunks are hashed on one thread per file"""
+    result["key_id"] = merkle_signature.envelope.key_id
+    try:
+        start_time = time.perf_counter()
+        result["ok"] = signature_tool.verify_file_chunked(path, merkle_signature, public_key, keyring, workers=1)
+        result["verify_seconds"] = time.perf_counter() - start_time
+        result["size"] = merkle_signature.envelope.file_size
+        result["status"] = "valid" if result["ok"] else "invalid"
+    except EnvelopeMismatch as e:
+        result["status"] = "invalid"
+        result["error"] = str(e)
+    except Exception as e:
+        result["error"] = str(e)
+    return result
+
+
+class BatchSigner:
+    def __init__(self, private_key, hash_algorithm='SHA256', hash_workers=None, sign_workers=None,
+                 digest_cache=None, signature_format='binary', signature_index=None):
+        """
+        :param private_key: Private key object used for every file
+        :param hash_algorithm: Hash algorithm name (see DigitalSignature.hash_algorithms)
+        :param hash_workers: Threads used for hashing (default: CPU count * 2)
+        :param sign_workers: Processes used for signing (default: CPU count, 0 signs in-process)
+        :param digest_cache: Optional DigestCache used to skip re-hashing unchanged files
+        :param signature_format: 'binary' or 'json' envelope (see modules.envelope),
+                                 or 'raw' signature bytes with a .keyid companion
+        :param signature_index: Optional SignatureIndex recording every file signed (one transaction per run)
+        """
+        self.signature_tool = DigitalSignature()
+        if hash_algorithm not in self.signature_tool.hash_algorithms:
+            raise ValueError(f"Unsupported hash algorithm: {hash_algorithm}")
+        if signature_format not in ('binary', 'json', 'raw'):
+            raise ValueError(f"Unsupported signature format: {signature_format}")
+
+        self.signature_format = signature_format
+        self.private_key = private_key
+        self.key_id = get_key_fingerprint(private_key)
+        self.hash_algorithm = hash_algorithm
+        self.digest_cache = digest_cache
+        self.signature_index = signature_index
+        cpu_count = os.cpu_count() or 1
+        self.hash_workers = hash_workers or cpu_count * 2
+        self.sign_workers = cpu_count if sign_workers is None else sign_workers
+
+    def _create_sign_executor(self):
+        """Create the process pool holding an unencrypted copy of the key"""
+        key_pem = self.private_key.private_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PrivateFormat.PKCS8,
+            encryption_algorithm=serialization.NoEncryption()
+        )
+        # spawn: workers start lazily at the first submit, while the hash threads may hold
+        # SQLite or OpenSSL locks that a forked child would inherit in a locked state
+        return ProcessPoolExecutor(
+            max_workers=self.sign_workers,
+            initializer=_init_sign_worker,
+            initargs=(key_pem,),
+            mp_context=multiprocessing.get_context('spawn')
+        )
+
+    def sign_files(self, files, out_dir=None, root=None, on_result=None):
+        """
+        Sign many files, writing one .sig per file
+        :param files: List of file paths
+        :param out_dir: Optional directory for signatures (default: next to each file)
+        :param root: Root used to mirror the tree under out_dir
+        :param on_result: Optional callback called with each result as it completes
+        :return: Tuple of (list of per-file results, summary dict)
+        """
+        start_time = time.perf_counter()
+        results = []
+        digests = {}
+        sign_executor = self._create_sign_executor() if self.sign_workers > 0 else None
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.hash_workers) as hash_executor:
+                hash_futures = {
+                    hash_executor.submit(hash_file, path, self.hash_algorithm, self.digest_cache): path
+                    for path in files
+                }
+                sign_futures = {}
+
+                for future in as_completed(hash_futures):
+                    path = hash_futures[future]
+                    try:
+                        digest, size = future.result()
+                    except Exception as e:
+                        results.append(self._finish(path, 0, None, None, e, out_dir, root, on_result))
+                        continue
+                    digests[path] = digest
+
+                    if sign_executor:
+                        sign_future = sign_executor.submit(_sign_digest_worker, digest, self.hash_algorithm)
+                        sign_futures[sign_future] = (path, size, digest)
+                    else:
+                        try:
+                            signature = self.signature_tool.sign_digest(digest, self.private_key, self.hash_algorithm)
+                            results.append(self._finish(path, size, digest, signature, None, out_dir, root, on_result))
+                        except Exception as e:
+                            results.append(self._finish(path, size, digest, None, e, out_dir, root, on_result))
+
+                for future in as_completed(sign_futures):
+                    path, size, digest = sign_futures[future]
+                    try:
+                        signature = future.result()
+                    except Exception as e:
+                        results.append(self._finish(path, size, digest, None, e, out_dir, root, on_result))
+                        continue
+                    results.append(self._finish(path, size, digest, signature, None, out_dir, root, on_result))
+        finally:
+            if sign_executor:
+                sign_executor.shutdown()
+
+        if self.signature_index is not None:
+            self.signature_index.add_many(
+                (r["path"], digests[r["path"]], self.hash_algorithm, self.key_id, r["size"], r["signature_path"])
+                for r in results if r["ok"]
+            )
+
+        return results, summarize(results, time.perf_counter() - start_time)
+
+    def _finish(self, path, size, digest, signature, error, out_dir, root, on_result):
+        """Write the signature (if any) and build the per-file result"""
+        result = {
+            "path": path,
+            "signature_path": None,
+            "size": size,
+            "ok": False,
+            "error": None
+        }
+
+        if error is None:
+            try:
+                signature_path = signature_path_for(path, out_dir, root)
+                os.makedirs(os.path.dirname(os.path.abspath(signature_path)), exist_ok=True)
+                if self.signature_format != 'raw':
+                    signature = self.signature_tool.create_envelope(
+                        digest, signature, self.private_key, self.hash_algorithm, size
+                    )
+                self.signature_tool.save_signature(
+                    signature, signature_path, key_id=self.key_id, signature_format=self.signature_format
+                )
+                result["signature_path"] = signature_path
+                result["ok"] = True
+            except Exception as e:
+                error = e
+
+        if error is not None:
+            result["error"] = str(error)
+
+        if on_result:
+            on_result(result)
+        return result
+
+
+class BatchVerifier:
+    def __init__(self, public_key=None, hash_algorithm='SHA256', workers=None, digest_cache=None,
+                 keyring=None):
+        """
+        :param public_key: Public key object used for signatures without a key ID, or whose
+                           key ID is not in the keyring
+        :param keyring: Optional Keyring holding the signers' public keys; signatures
+                        with a key ID are checked against the matching key (it is not modified)
+        :param hash_algorithm: Hash algorithm name the signatures were made with
+        :param workers: Processes used for hashing and verification
+                        (default: CPU count, 0 verifies on threads in-process)
+        :param digest_cache: Optional DigestCache used to skip re-hashing unchanged files
+        """
+        self.signature_tool = DigitalSignature()
+        if hash_algorithm not in self.signature_tool.hash_algorithms:
+            raise ValueError(f"Unsupported hash algorithm: {hash_algorithm}")
+
+        if public_key is None and keyring is None:
+            raise ValueError("A public key or a keyring is required")
+
+        self.public_key = public_key
+        self.keyring = keyring
+        self.hash_algorithm = hash_algorithm
+        self.digest_cache = digest_cache
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+
+    def _create_executor(self):
+        """Create a process pool, or a thread pool when workers is 0"""
+        if self.workers == 0:
+            return ThreadPoolExecutor(max_workers=(os.cpu_count() or 1) * 2)
+
+        def to_pem(key):
+            return key.public_bytes(
+                encoding=serialization.Encoding.PEM,
+                format=serialization.PublicFormat.SubjectPublicKeyInfo
+            )
+
+        key_pem = to_pem(self.public_key) if self.public_key is not None else None
+        keyring_pems = [to_pem(key) for key in self.keyring.public_keys.values()] if self.keyring is not None else []
+        # spawn for the same reason as the signing pool: never fork a multi-threaded process
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_verify_worker,
+            initargs=(key_pem, self.digest_cache.path if self.digest_cache else None, keyring_pems)
+        )
+
+    def verify_files(self, files, sig_dir=None, root=None, on_result=None):
+        """
+        Verify many files against their .sig companions
+        :param files: List of file paths
+        :param sig_dir: Optional directory holding the signatures (default: next to each file)
+        :param root: Root used to mirror the tree under sig_dir
+        :param on_result: Optional callback called with each result as it completes
+        :return: Tuple of (list of per-file results, summary dict)
+        """
+        start_time = time.perf_counter()
+        results = []
+
+        with self._create_executor() as executor:
+            futures = {}
+            for path in files:
+                signature_path = signature_path_for(path, sig_dir, root)
+                if self.workers == 0:
+                    future = executor.submit(
+                        verify_one, path, signature_path, self.public_key,
+                        self.signature_tool, self.hash_algorithm, self.digest_cache, self.keyring
+                    )
+                else:
+                    future = executor.submit(_verify_file_worker, path, signature_path, self.hash_algorithm)
+                futures[future] = (path, signature_path)
+
+            for future in as_completed(futures):
+                try:
+                    result = future.result()
+                except Exception as e:
+                    path, signature_path = futures[future]
+                    result = _verify_result(path, signature_path)
+                    result["error"] = str(e)
+                results.append(result)
+                if on_result:
+                    on_result(result)
+
+        summary = summarize(results, time.perf_counter() - start_time)
+        for status in ("valid", "invalid", "missing_signature", "error"):
+            summary[status] = sum(1 for r in results if r["status"] == status)
+        return results, summary
+
+
+def summarize(results, duration):
+    """Aggregate per-file results into counts and throughput"""
+    total_bytes = sum(r["size"] for r in results)
+    succeeded = sum(1 for r in results if r["ok"])
+    return {
+        "files": len(results),
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "bytes": total_bytes,
+        "seconds": duration,
+        "files_per_second": len(results) / duration if duration else 0.0,
+        "mb_per_second": total_bytes / (1024 * 1024) / duration if duration else 0.0
+    }
+
+
+def write_report(results, summary, report_path, report_format=None):
+    """
+    Write a machine-readable report of a batch run
+    :param results: Per-file results
+    :param summary: Summary dict from summarize()
+    :param report_path: Output path
+    :param report_format: 'json' or 'csv' (default: inferred from the extension)
+    """
+    if report_format is None:
+        report_format = 'csv' if report_path.lower().endswith('.csv') else 'json'
+
+    ordered = sorted(results, key=lambda r: r["path"])
+
+    if report_format == 'json':
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump({"summary": summary, "results": ordered}, f, indent=2, ensure_ascii=False)
+    elif report_format == 'csv':
+        fieldnames = []
+        for result in ordered:
+            fieldnames.extend(k for k in result if k not in fieldnames)
+        with open(report_path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer.writeheader()
+            writer.writerows(ordered)
+    else:
+        raise ValueError(f"Unsupported report format: {report_format}")
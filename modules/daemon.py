@@ -0,0 +1,392 @@
+"""
+Local signing daemon
+
+A long-running process keeps private keys loaded (and decrypted) in memory
+and serves digest signing and verification over a Unix domain socket, so
+clients pay neither the cryptography import nor the PEM decryption per
+signature. Requests from all connections go through one queue; a dispatcher
+coalesces whatever is waiting into batches that a worker pool processes,
+and queue depth, batch sizes and latency percentiles are available through
+the "stats" request.
+
+Wire format: every message is a 4-byte big-endian length followed by a JSON
+object. Binary values (digest, signature) are base64. Requests:
+
+    {"op": "sign", "key": "release", "hash": "SHA256", "digest": "..."}
+    {"op": "verify", "key_id": "<fingerprint>", "hash": "SHA256", "digest": "...", "signature": "..."}
+    {"op": "keys"}
+    {"op": "stats"}
+
+An optional "id" is echoed back. Responses carry "ok" and either the result
+fields or "error".
+"""
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from modules import hashing, metrics
+from modules.keyring import Keyring
+import base64
+import json
+import os
+import queue
+import socket
+import socketserver
+import stat
+import struct
+import threading
+import time
+
+_LENGTH = struct.Struct('>I')
+MAX_MESSAGE_SIZE = 1024 * 1024
+
+# Latencies kept for the percentiles reported by "stats"
+LATENCY_WINDOW = 4096
+
+
+def send_message(sock, message):
+    data = json.dumps(message, separators=(',', ':')).encode('utf-8')
+    sock.sendall(_LENGTH.pack(len(data)) + data)
+
+
+def _recv_exact(sock, size):
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    received = 0
+    while received < size:
+        n = sock.recv_into(view[received:])
+        if not n:
+            return None
+        received += n
+    return bytes(buffer)
+
+
+def recv_frame(sock):
+    """Read one length-prefixed frame, or None when the peer closed the connection"""
+    header = _recv_exact(sock, _LENGTH.size)
+    if header is None:
+        return None
+    (length,) = _LENGTH.unpack(header)
+    if length > MAX_MESSAGE_SIZE:
+        raise ValueError(f"Message too large: {length} bytes")
+    return _recv_exact(sock, length)
+
+
+def recv_message(sock):
+    """Read one message, or None when the peer closed the connection"""
+    data = recv_frame(sock)
+    if data is None:
+        return None
+    return json.loads(data.decode('utf-8'))
+
+
+class _Request:
+    __slots__ = ('message', 'future', 'enqueued')
+
+    def __init__(self, message):
+        self.message = message
+        self.future = Future()
+        self.enqueued = time.perf_counter()
+
+
+class SigningService:
+    def __init__(self, keys, workers=None, max_batch=64):
+        """
+        Key holder and batching request queue (transport independent)
+        :param keys: Dict of key name -> private key object
+        :param workers: Threads executing batches (default: CPU count)
+        :param max_batch: Maximum requests handed to a worker at once
+        """
+        # Imported here so clients (SigningClient) never load cryptography
+        from modules.signature import DigitalSignature
+
+        if not keys:
+            raise ValueError("At least one key is required")
+        self.signature_tool = DigitalSignature()
+        self.keys = dict(keys)
+        self.default_key = next(iter(self.keys))
+        self.keyring = Keyring()
+        self.key_ids = {}
+        for name, private_key in self.keys.items():
+            self.key_ids[name] = self.keyring.add_public_key(private_key.public_key())
+
+        self.max_batch = max_batch
+        self.queue = queue.Queue()
+        workers = workers or os.cpu_count() or 1
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        # A batch is only formed once a worker is free, so requests arriving
+        # while all workers are busy are coalesced into the next batch
+        self.free_workers = threading.Semaphore(workers)
+        self.lock = threading.Lock()
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.requests_total = 0
+        self.batches_total = 0
+        self.in_flight = 0
+        self.started = time.time()
+        self.running = True
+        self.dispatcher = threading.Thread(target=self._dispatch, name='signing-dispatcher', daemon=True)
+        self.dispatcher.start()
+
+    def submit(self, message):
+        """
+        Queue a request
+        :return: Future resolving to the response dict
+        """
+        request = _Request(message)
+        if not isinstance(message, dict):
+            request.future.set_result({"ok": False, "error": "Request must be a JSON object"})
+        elif message.get("op") in ("keys", "stats"):
+            # Introspection does not wait behind signing work
+            request.future.set_result(self._execute(message))
+        else:
+            self.queue.put(request)
+        return request.future
+
+    def _dispatch(self):
+        """Coalesce queued requests into batches for the worker pool"""
+        while self.running:
+            self.free_workers.acquire()
+            request = self.queue.get()
+            if request is None:
+                break
+            batch = [request]
+            while len(batch) < self.max_batch:
+                try:
+                    request = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if request is None:
+                    self.running = False
+                    break
+                batch.append(request)
+
+            with self.lock:
+                self.batches_total += 1
+                self.in_flight += len(batch)
+            metrics.count('daemon_batches_total')
+            self.executor.submit(self._run_batch, batch)
+
+    def _run_batch(self, batch):
+        try:
+            for request in batch:
+                response = self._execute(request.message)
+                latency = time.perf_counter() - request.enqueued
+                with self.lock:
+                    self.in_flight -= 1
+                    self.requests_total += 1
+                    self.latencies.append(latency)
+                metrics.observe_phase('daemon_request', latency, op=request.message.get("op"))
+                request.future.set_result(response)
+        finally:
+            self.free_workers.release()
+
+    def _execute(self, message):
+        response = {"id": message.get("id")} if "id" in message else {}
+        try:
+            op = message.get("op")
+            if op == "sign":
+                response.update(self._sign(message))
+            elif op == "verify":
+                response.update(self._verify(message))
+            elif op == "keys":
+                response["keys"] = self.key_ids
+            elif op == "stats":
+                response["stats"] = self.stats()
+            else:
+                raise ValueError(f"Unknown operation: {op}")
+            response["ok"] = True
+        except Exception as e:
+            response["ok"] = False
+            response["error"] = str(e)
+        return response
+
+    def _hash_algorithm(self, message):
+        hash_algorithm = message.get("hash", "SHA256")
+        if hash_algorithm not in self.signature_tool.hash_algorithms:
+            raise ValueError(f"Unsupported hash algorithm: {hash_algorithm}")
+        return hash_algorithm
+
+    def _sign(self, message):
+        name = message.get("key") or self.default_key
+        private_key = self.keys.get(name)
+        if private_key is None:
+            raise ValueError(f"Unknown key: {name}")
+        hash_algorithm = self._hash_algorithm(message)
+        digest = base64.b64decode(message["digest"])
+        signature = self.signature_tool.sign_digest(digest, private_key, hash_algorithm)
+        return {"signature": base64.b64encode(signature).decode('ascii'), "key_id": self.key_ids[name]}
+
+    def _verify(self, message):
+        key_id = message.get("key_id") or self.key_ids.get(message.get("key") or self.default_key)
+        public_key = self.keyring.find_public_key(key_id) if key_id else None
+        if public_key is None:
+            raise ValueError(f"Unknown key ID: {key_id}")
+        hash_algorithm = self._hash_algorithm(message)
+        valid = self.signature_tool.verify_digest(
+            base64.b64decode(message["digest"]), base64.b64decode(message["signature"]),
+            public_key, hash_algorithm
+        )
+        return {"valid": valid}
+
+    def stats(self):
+        """Queue depth, throughput and latency percentiles (milliseconds)"""
+        with self.lock:
+            latencies = sorted(self.latencies)
+            requests_total = self.requests_total
+            batches_total = self.batches_total
+            in_flight = self.in_flight
+
+        def percentile(p):
+            if not latencies:
+                return 0.0
+            return latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000
+
+        return {
+            "queue_depth": self.queue.qsize(),
+            "in_flight": in_flight,
+            "requests_total": requests_total,
+            "batches_total": batches_total,
+            "mean_batch_size": requests_total / batches_total if batches_total else 0.0,
+            "latency_ms": {"p50": percentile(0.50), "p95": percentile(0.95), "p99": percentile(0.99)},
+            "uptime_seconds": time.time() - self.started
+        }
+
+    def shutdown(self):
+        self.running = False
+        self.queue.put(None)
+        self.dispatcher.join()
+        self.executor.shutdown()
+
+
+class _ConnectionHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        service = self.server.service
+        while True:
+            try:
+                data = recv_frame(self.request)
+            except (OSError, ValueError):
+                return  # connection error or oversized frame: the stream cannot be resynchronized
+            if data is None:
+                return
+            try:
+                message = json.loads(data.decode('utf-8'))
+            except ValueError:
+                send_message(self.request, {"ok": False, "error": "Malformed JSON request"})
+                continue
+            send_message(self.request, service.submit(message).result())
+
+
+def remove_stale_socket(socket_path):
+    """
+    Remove a socket left behind by a daemon that is no longer running
+    Anything else at the path (a regular file, a live daemon's socket) is left alone.
+    """
+    try:
+        st = os.lstat(socket_path)
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(st.st_mode):
+        raise FileExistsError(f"Not a socket, refusing to remove: {socket_path}")
+
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(socket_path)
+    except OSError:
+        os.unlink(socket_path)  # nobody listening: stale
+        return
+    finally:
+        probe.close()
+    raise RuntimeError(f"A signing daemon is already running on {socket_path}")
+
+
+class SigningServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, socket_path, service):
+        """
+        Unix domain socket front end of a SigningService
+        The socket is made mode 0600 before it listens: anyone who can connect can sign.
+        :param socket_path: Filesystem path of the socket
+        :param service: SigningService
+        :raises RuntimeError: if another daemon is listening on socket_path
+        :raises FileExistsError: if socket_path exists and is not a socket
+        """
+        remove_stale_socket(socket_path)
+        self.service = service
+        super().__init__(socket_path, _ConnectionHandler)
+
+    def server_bind(self):
+        super().server_bind()
+        # Between bind and listen nobody can connect, so no window with looser permissions
+        os.chmod(self.server_address, 0o600)
+
+    def server_close(self):
+        super().server_close()
+        try:
+            os.unlink(self.server_address)
+        except OSError:
+            pass
+
+
+class SigningClient:
+    def __init__(self, socket_path, timeout=30):
+        """
+        Connection to a signing daemon (use one per thread)
+        :param socket_path: Filesystem path of the daemon's socket
+        :param timeout: Socket timeout in seconds
+        """
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        self.sock.connect(socket_path)
+
+    def request(self, message):
+        """
+        Send a request and wait for its response
+        :raises RuntimeError: if the daemon reports an error
+        """
+        send_message(self.sock, message)
+        response = recv_message(self.sock)
+        if response is None:
+            raise ConnectionError("Signing daemon closed the connection")
+        if not response.get("ok"):
+            raise RuntimeError(response.get("error", "Signing daemon error"))
+        return response
+
+    def sign_digest(self, digest, key=None, hash_algorithm='SHA256'):
+        """
+        :return: Tuple of (signature bytes, key ID)
+        """
+        response = self.request({
+            "op": "sign", "key": key, "hash": hash_algorithm,
+            "digest": base64.b64encode(digest).decode('ascii')
+        })
+        return base64.b64decode(response["signature"]), response["key_id"]
+
+    def sign_file(self, file_path, key=None, hash_algorithm='SHA256'):
+        """Hash a file locally and have the daemon sign the digest"""
+        digest = hashing.hash_file(file_path, hash_algorithm)
+        return self.sign_digest(digest, key, hash_algorithm)
+
+    def verify_digest(self, digest, signature, key_id, hash_algorithm='SHA256'):
+        response = self.request({
+            "op": "verify", "key_id": key_id, "hash": hash_algorithm,
+            "digest": base64.b64encode(digest).decode('ascii'),
+            "signature": base64.b64encode(signature).decode('ascii')
+        })
+        return response["valid"]
+
+    def keys(self):
+        """Dict of key name -> key ID"""
+        return self.request({"op": "keys"})["keys"]
+
+    def stats(self):
+        return self.request({"op": "stats"})["stats"]
+
+    def close(self):
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
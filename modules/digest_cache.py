@@ -0,0 +1,216 @@
+import os
+import sqlite3
+import threading
+import time
+from modules import metrics
+
+# Files modified this recently are not cached: another write within the same
+# mtime tick would leave size/mtime unchanged and the cached digest stale.
+RACY_WINDOW_NS = 2 * 1000 * 1000 * 1000
+
+# Hits whose last_used update is kept in memory before being written
+TOUCH_FLUSH_THRESHOLD = 1000
+
+
+def file_identity(st):
+    """
+    Identity of a file's contents from a stat result
+    ctime is included because it cannot be set from user space: an edit that
+    keeps the size and restores mtime (touch -r) still changes ctime.
+    :return: Tuple of (size, mtime_ns, ctime_ns, inode)
+    """
+    return st.st_size, st.st_mtime_ns, st.st_ctime_ns, st.st_ino
+
+
+def is_racy(st):
+    """Whether the file changed too recently for its identity to be trusted"""
+    return time.time_ns() - max(st.st_mtime_ns, st.st_ctime_ns) < RACY_WINDOW_NS
+
+
+class DigestCache:
+    def __init__(self, path=None, max_entries=10000):
+        """
+        On-disk cache of file digests keyed by file identity
+        :param path: SQLite database file (default: ~/.digital_signature/digest_cache.sqlite3)
+        :param max_entries: Maximum number of cached digests, least recently used are evicted
+        """
+        self.path = path or self.default_path()
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        # (path, algorithm) -> last hit time, written with the next put() or close()
+        self.touched = {}
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+
+        self.connection = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        columns = [row[1] for row in self.connection.execute("PRAGMA table_info(digests)")]
+        if columns and 'ctime_ns' not in columns:
+            # Cache written before ctime was part of the identity: start over
+            self.connection.execute("DROP TABLE digests")
+        self.connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS digests (
+                path TEXT NOT NULL,
+                algorithm TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                ctime_ns INTEGER NOT NULL,
+                inode INTEGER NOT NULL,
+                digest BLOB NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (path, algorithm)
+            )
+            """
+        )
+        self.connection.execute("CREATE INDEX IF NOT EXISTS digests_last_used ON digests (last_used)")
+        self.connection.commit()
+
+    @staticmethod
+    def default_path():
+        """Default cache location in the user's home directory"""
+        return os.path.join(os.path.expanduser("~"), ".digital_signature", "digest_cache.sqlite3")
+
+    @staticmethod
+    def _identity(file_path):
+        """Return (absolute path, stat result) identifying the current file contents"""
+        abs_path = os.path.abspath(file_path)
+        return abs_path, os.stat(abs_path)
+
+    def get(self, file_path, algorithm):
+        """
+        Look up a cached digest
+        :param file_path: Path to file
+        :param algorithm: Hash algorithm name (e.g. 'sha256')
+        :return: Digest bytes, or None if missing or the file changed
+        """
+        abs_path, st = self._identity(file_path)
+        algorithm = algorithm.lower()
+
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT size, mtime_ns, ctime_ns, inode, digest FROM digests WHERE path = ? AND algorithm = ?",
+                (abs_path, algorithm)
+            ).fetchone()
+
+            if row is None:
+                return None
+            if tuple(row[:4]) != file_identity(st):
+                return None
+
+            # A hit is a pure read: recency is written in batches, not one commit per hit
+            self.touched[(abs_path, algorithm)] = time.time()
+            if len(self.touched) >= TOUCH_FLUSH_THRESHOLD:
+                self._flush_touched()
+                self.connection.commit()
+            return bytes(row[4])
+
+    def put(self, file_path, algorithm, digest, st=None):
+        """
+        Store a digest for the file's current identity
+        :param file_path: Path to file
+        :param algorithm: Hash algorithm name (e.g. 'sha256')
+        :param digest: Digest bytes
+        :param st: stat result taken before hashing (default: stat now)
+        """
+        abs_path = os.path.abspath(file_path)
+        if st is None:
+            st = os.stat(abs_path)
+        if is_racy(st):
+            return
+
+        size, mtime_ns, ctime_ns, inode = file_identity(st)
+        with self.lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO digests (path, algorithm, size, mtime_ns, ctime_ns, inode, digest, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (abs_path, algorithm.lower(), size, mtime_ns, ctime_ns, inode, digest, time.time())
+            )
+            self._flush_touched()
+            self._evict()
+            self.connection.commit()
+
+    def get_or_compute(self, file_path, algorithm, compute):
+        """
+        Return the cached digest, computing and storing it on a miss
+        :param file_path: Path to file
+        :param algorithm: Hash algorithm name (e.g. 'sha256')
+        :param compute: Callable taking file_path and returning digest bytes
+        :return: Digest bytes
+        """
+        digest = self.get(file_path, algorithm)
+        if digest is not None:
+            metrics.count('digest_cache_hits_total')
+            return digest
+        metrics.count('digest_cache_misses_total')
+
+        st = os.stat(file_path)
+        digest = compute(file_path)
+        # Only cache if the file did not change while it was being hashed
+        if file_identity(os.stat(file_path)) == file_identity(st):
+            self.put(file_path, algorithm, digest, st)
+        return digest
+
+    def get_or_compute_many(self, file_path, algorithms, compute_many):
+        """
+        Return digests for several algorithms, computing only the missing ones in one pass
+        :param file_path: Path to file
+        :param algorithms: Iterable of hash algorithm names
+        :param compute_many: Callable taking (file_path, list of missing names) and returning
+                             a dict of lowercase name -> digest bytes
+        :return: Dict of lowercase name -> digest bytes
+        """
+        names = list(dict.fromkeys(a.lower() for a in algorithms))
+        digests = {}
+        for name in names:
+            digest = self.get(file_path, name)
+            if digest is not None:
+                digests[name] = digest
+        missing = [name for name in names if name not in digests]
+        metrics.count('digest_cache_hits_total', len(digests))
+        if not missing:
+            return digests
+        metrics.count('digest_cache_misses_total', len(missing))
+
+        st = os.stat(file_path)
+        computed = compute_many(file_path, missing)
+        unchanged = file_identity(os.stat(file_path)) == file_identity(st)
+        for name in missing:
+            digests[name] = computed[name]
+            if unchanged:
+                self.put(file_path, name, computed[name], st)
+        return digests
+
+    def _flush_touched(self):
+        """Write pending last_used updates (caller holds the lock and commits)"""
+        if self.touched:
+            self.connection.executemany(
+                "UPDATE digests SET last_used = ? WHERE path = ? AND algorithm = ?",
+                [(used, path, algorithm) for (path, algorithm), used in self.touched.items()]
+            )
+            self.touched.clear()
+
+    def _evict(self):
+        """Drop least recently used entries above max_entries"""
+        count = self.connection.execute("SELECT COUNT(*) FROM digests").fetchone()[0]
+        if count > self.max_entries:
+            self.connection.execute(
+                "DELETE FROM digests WHERE rowid IN "
+                "(SELECT rowid FROM digests ORDER BY last_used ASC LIMIT ?)",
+                (count - self.max_entries,)
+            )
+
+    def clear(self):
+        """Remove every cached digest"""
+        with self.lock:
+            self.touched.clear()
+            self.connection.execute("DELETE FROM digests")
+            self.connection.commit()
+
+    def close(self):
+        """Write pending recency updates and close the underlying database"""
+        with self.lock:
+            self._flush_touched()
+            self.connection.commit()
+            self.connection.close()
@@ -0,0 +1,189 @@
+"""
+Self-describing signature container
+
+A signature envelope stores, next to the signature bytes, everything a
+verifier needs to check it: signature scheme, hash algorithm, padding, the
+signer's key fingerprint, the signed file's size and digest. Verifiers can
+therefore pick the right key and reject a wrong key, hash or file size
+before reading the file.
+
+Binary layout (all integers big-endian):
+
+    magic 'DSIG' | version u8 | scheme (u8 length + ASCII) | hash (u8 length + ASCII)
+    | padding (u8 length + ASCII) | key fingerprint (32 bytes) | file size u64
+    | digest (u8 length + bytes) | signature (u16 length + bytes)
+
+The JSON form carries the same fields with binary values in base64 (the key
+fingerprint in hex). Files holding only raw signature bytes are still accepted
+by parse(), which returns None for them.
+"""
+import base64
+import json
+import struct
+
+MAGIC = b'DSIG'
+VERSION = 1
+JSON_FORMAT = 'digital-signature'
+
+_HEADER = struct.Struct('>4sB')
+_FINGERPRINT_SIZE = 32
+
+
+class EnvelopeError(ValueError):
+    """Raised for malformed envelopes"""
+
+
+class EnvelopeMismatch(ValueError):
+    """Raised when an envelope does not match the file or key it is checked against"""
+
+
+class SignatureEnvelope:
+    def __init__(self, scheme, hash_algorithm, key_id, file_size, digest, signature, padding=''):
+        """
+        :param scheme: Signature scheme name (see modules.algorithms)
+        :param hash_algorithm: Hash algorithm name (e.g. 'SHA256')
+        :param key_id: Hex SHA-256 fingerprint of the signer's public key
+        :param file_size: Size of the signed file in bytes
+        :param digest: Digest of the signed file
+        :param signature: Signature bytes over the digest
+        :param padding: Padding description ('' when the scheme has none)
+        """
+        self.scheme = scheme
+        self.hash_algorithm = hash_algorithm
+        self.padding = padding or ''
+        self.key_id = key_id.lower()
+        self.file_size = file_size
+        self.digest = digest
+        self.signature = signature
+
+    def to_bytes(self):
+        """Serialize to the compact binary form"""
+        parts = [_HEADER.pack(MAGIC, VERSION)]
+        for text in (self.scheme, self.hash_algorithm, self.padding):
+            data = text.encode('ascii')
+            parts.append(struct.pack('>B', len(data)) + data)
+        parts.append(bytes.fromhex(self.key_id))
+        parts.append(struct.pack('>QB', self.file_size, len(self.digest)) + self.digest)
+        parts.append(struct.pack('>H', len(self.signature)) + self.signature)
+        return b''.join(parts)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """
+        Parse the binary form
+        :raises EnvelopeError: if the data is truncated or of an unknown version
+        """
+        try:
+            magic, version = _HEADER.unpack_from(data, 0)
+            if magic != MAGIC:
+                raise EnvelopeError("Not a signature envelope")
+            if version != VERSION:
+                raise EnvelopeError(f"Unsupported envelope version: {version}")
+            offset = _HEADER.size
+
+            texts = []
+            for _ in range(3):
+                (length,) = struct.unpack_from('>B', data, offset)
+                offset += 1
+                texts.append(data[offset:offset + length].decode('ascii'))
+                offset += length
+
+            key_id = data[offset:offset + _FINGERPRINT_SIZE].hex()
+            offset += _FINGERPRINT_SIZE
+
+            file_size, digest_length = struct.unpack_from('>QB', data, offset)
+            offset += 9
+            digest = bytes(data[offset:offset + digest_length])
+            offset += digest_length
+
+            (signature_length,) = struct.unpack_from('>H', data, offset)
+            offset += 2
+            signature = bytes(data[offset:offset + signature_length])
+            offset += signature_length
+        except (struct.error, UnicodeDecodeError) as e:
+            raise EnvelopeError(f"Malformed signature envelope: {e}")
+
+        if offset != len(data) or len(digest) != digest_length or len(signature) != signature_length:
+            raise EnvelopeError("Malformed signature envelope: unexpected length")
+
+        scheme, hash_algorithm, padding = texts
+        return cls(scheme, hash_algorithm, key_id, file_size, digest, signature, padding)
+
+    def to_dict(self):
+        return {
+            "format": JSON_FORMAT,
+            "version": VERSION,
+            "scheme": self.scheme,
+            "hash": self.hash_algorithm,
+            "padding": self.padding,
+            "key_id": self.key_id,
+            "size": self.file_size,
+            "digest": base64.b64encode(self.digest).decode('ascii'),
+            "signature": base64.b64encode(self.signature).decode('ascii')
+        }
+
+    def to_json(self):
+        """Serialize to the JSON form (UTF-8 bytes)"""
+        return json.dumps(self.to_dict(), indent=2).encode('utf-8')
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Build an envelope from the JSON form
+        :raises EnvelopeError: on missing or invalid fields or an unknown version
+        """
+        if not isinstance(data, dict) or data.get("format") != JSON_FORMAT:
+            raise EnvelopeError("Not a signature envelope")
+        if data.get("version") != VERSION:
+            raise EnvelopeError(f"Unsupported envelope version: {data.get('version')}")
+        try:
+            texts = [data["scheme"], data["hash"], data.get("padding", '')]
+            if not all(isinstance(text, str) and text.isascii() for text in texts):
+                raise EnvelopeError("scheme, hash and padding must be ASCII strings")
+            key_id = data["key_id"]
+            if not isinstance(key_id, str) or len(key_id) != 2 * _FINGERPRINT_SIZE:
+                raise EnvelopeError(f"key_id must be {2 * _FINGERPRINT_SIZE} hex characters")
+            bytes.fromhex(key_id)
+            file_size = data["size"]
+            if not isinstance(file_size, int) or isinstance(file_size, bool) or file_size < 0:
+                raise EnvelopeError("size must be a non-negative integer")
+            return cls(
+                texts[0], texts[1], key_id, file_size,
+                base64.b64decode(data["digest"], validate=True),
+                base64.b64decode(data["signature"], validate=True),
+                texts[2]
+            )
+        except (KeyError, TypeError, ValueError) as e:
+            # ValueError covers the checks above, bad hex and bad base64 (binascii.Error)
+            raise EnvelopeError(f"Malformed signature envelope: {e}")
+
+    def check(self, file_size=None, scheme=None, key_id=None):
+        """
+        Compare the envelope against what the verifier has, without reading the file
+        :raises EnvelopeMismatch: describing the first mismatch
+        """
+        if file_size is not None and file_size != self.file_size:
+            raise EnvelopeMismatch(f"File size {file_size} does not match signed size {self.file_size}")
+        if key_id is not None and key_id.lower() != self.key_id:
+            raise EnvelopeMismatch(f"Signed with key {self.key_id}, not {key_id.lower()}")
+        if scheme is not None and scheme != self.scheme:
+            raise EnvelopeMismatch(f"Signed with {self.scheme}, not {scheme}")
+
+
+def parse(data):
+    """
+    Parse a signature file's contents
+    :param data: Bytes read from the signature file
+    :return: SignatureEnvelope, or None if the data is a raw signature
+    :raises EnvelopeError: if the data looks like an envelope but is malformed
+    """
+    if data[:len(MAGIC)] == MAGIC:
+        return SignatureEnvelope.from_bytes(data)
+    if data[:1] == b'{':
+        try:
+            document = json.loads(data.decode('utf-8'))
+        except (UnicodeDecodeError, ValueError):
+            return None
+        if isinstance(document, dict) and document.get("format") == JSON_FORMAT:
+            return SignatureEnvelope.from_dict(document)
+    return None
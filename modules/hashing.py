@@ -0,0 +1,162 @@
+import hashlib
+import mmap
+import os
+import time
+from modules import metrics
+
+# Buffer reused by the readinto() loop; large enough that the per-iteration
+# Python overhead is negligible compared to the hashing itself.
+DEFAULT_BUFFER_SIZE = 1024 * 1024
+
+# Files at least this large are hashed from a memory map in a single update()
+MMAP_THRESHOLD = 64 * 1024 * 1024
+
+
+class OperationCancelled(Exception):
+    """Raised when hashing is interrupted through a cancel event"""
+
+
+def new_hasher(algorithm='sha256'):
+    """
+    Create a hashlib object from a hash name
+    :param algorithm: Hash name, case-insensitive (e.g. 'SHA256', 'sha512')
+    :return: hashlib hash object
+    """
+    return hashlib.new(algorithm.lower())
+
+
+class MultiHasher:
+    """
+    Feeds the same data to several hashlib objects, so one read of a file yields
+    every requested digest. Large updates are split into windows that stay in the
+    CPU cache while each hasher consumes them.
+    """
+
+    def __init__(self, algorithms):
+        """
+        :param algorithms: Iterable of hash names, case-insensitive (duplicates are merged)
+        """
+        self.hashers = {}
+        for algorithm in algorithms:
+            name = algorithm.lower()
+            if name not in self.hashers:
+                self.hashers[name] = new_hasher(name)
+        if not self.hashers:
+            raise ValueError("At least one hash algorithm is required")
+        self.name = '+'.join(self.hashers)
+
+    def update(self, data):
+        if len(self.hashers) == 1:
+            next(iter(self.hashers.values())).update(data)
+            return
+        view = memoryview(data)
+        for start in range(0, len(view), DEFAULT_BUFFER_SIZE):
+            window = view[start:start + DEFAULT_BUFFER_SIZE]
+            for hasher in self.hashers.values():
+                hasher.update(window)
+
+    def digests(self):
+        """Return a dict of lowercase hash name -> digest bytes"""
+        return {name: hasher.digest() for name, hasher in self.hashers.items()}
+
+
+def update_from_file(hasher, f, size=None, buffer_size=None, progress=None, cancel_event=None):
+    """
+    Feed an open binary file into a hashlib object
+    :param hasher: hashlib hash object or MultiHasher
+    :param f: File object opened in binary mode
+    :param size: File size if known (used to pick the strategy)
+    :param buffer_size: Read buffer size (default: DEFAULT_BUFFER_SIZE)
+    :param progress: Optional callable receiving the number of bytes hashed so far
+    :param cancel_event: Optional threading.Event; hashing stops with OperationCancelled once set
+    :return: Number of bytes hashed
+    """
+    if size is None:
+        try:
+            size = os.fstat(f.fileno()).st_size
+        except (AttributeError, OSError):
+            size = -1
+
+    # Progress, cancellation and per-phase timing need the chunked loop
+    instrumented = metrics.enabled()
+    chunked = (buffer_size is not None or progress is not None or cancel_event is not None
+               or instrumented)
+    buffer_size = buffer_size or DEFAULT_BUFFER_SIZE
+
+    if 0 <= size <= buffer_size and not chunked:
+        # Small file: one read, one update
+        data = f.read()
+        hasher.update(data)
+        return len(data)
+
+    if size >= MMAP_THRESHOLD and not chunked:
+        try:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                hasher.update(mapped)
+                return len(mapped)
+        except (AttributeError, OSError, ValueError):
+            # Not mappable (pipe, special file, ...): fall back to reading
+            pass
+
+    buffer = bytearray(buffer_size)
+    view = memoryview(buffer)
+    total = 0
+    read_ns = hash_ns = 0
+    while True:
+        if cancel_event is not None and cancel_event.is_set():
+            raise OperationCancelled("Hashing cancelled")
+        if instrumented:
+            start = time.perf_counter_ns()
+            read = f.readinto(buffer)
+            middle = time.perf_counter_ns()
+            if read:
+                hasher.update(view[:read])
+            read_ns += middle - start
+            hash_ns += time.perf_counter_ns() - middle
+        else:
+            read = f.readinto(buffer)
+            if read:
+                hasher.update(view[:read])
+        if not read:
+            break
+        total += read
+        if progress is not None:
+            progress(total)
+
+    if instrumented:
+        metrics.observe_phase('file_read', read_ns / 1e9)
+        metrics.observe_phase('hash', hash_ns / 1e9, algorithm=hasher.name)
+        metrics.count('bytes_hashed_total', total, algorithm=hasher.name)
+    return total
+
+
+def hash_file(file_path, algorithm='sha256', buffer_size=None, progress=None, cancel_event=None):
+    """
+    Compute a file digest with the fastest available strategy
+    :param file_path: Path to file
+    :param algorithm: Hash name, case-insensitive (e.g. 'SHA256')
+    :param buffer_size: Force a readinto() loop with this buffer size
+    :param progress: Optional callable receiving the number of bytes hashed so far
+    :param cancel_event: Optional threading.Event used to cancel hashing
+    :return: Digest bytes
+    """
+    hasher = new_hasher(algorithm)
+    with open(file_path, 'rb', buffering=0) as f:
+        update_from_file(hasher, f, buffer_size=buffer_size, progress=progress, cancel_event=cancel_event)
+    return hasher.digest()
+
+
+def hash_file_multi(file_path, algorithms, buffer_size=None, progress=None, cancel_event=None):
+    """
+    Compute several digests of a file in a single read pass
+    :param file_path: Path to file
+    :param algorithms: Iterable of hash names, case-insensitive (e.g. ['SHA256', 'sha512'])
+    :param buffer_size: Force a readinto() loop with this buffer size
+    :param progress: Optional callable receiving the number of bytes hashed so far
+    :param cancel_event: Optional threading.Event used to cancel hashing
+    :return: Dict of lowercase hash name -> digest bytes
+    """
+    hasher = MultiHasher(algorithms)
+    with open(file_path, 'rb', buffering=0) as f:
+        update_from_file(hasher, f, buffer_size=buffer_size, progress=progress, cancel_event=cancel_event)
+    return hasher.digests()
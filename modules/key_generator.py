@@ -1,40 +1,194 @@
-from cryptography.hazmat.primitives.asymmetric import rsa, dsa
+from cryptography.hazmat.primitives.asymmetric import rsa, dsa, ec, ed25519, ed448
 from cryptography.hazmat.primitives import serialization
+from modules import metrics
+import base64
 import os
-import time
+
+
+# Elliptic curves offered for ECDSA keys
+EC_CURVES = {
+    'P-256': ec.SECP256R1,
+    'P-384': ec.SECP384R1
+}
+
+
+def _der_length(length):
+    """Encode a DER length field"""
+    if length < 0x80:
+        return bytes([length])
+    encoded = length.to_bytes((length.bit_length() + 7) // 8, 'big')
+    return bytes([0x80 | len(encoded)]) + encoded
+
+
+def _der_encode_integers(values):
+    """Encode non-negative integers as a DER SEQUENCE of INTEGERs"""
+    body = b''
+    for value in values:
+        encoded = value.to_bytes(value.bit_length() // 8 + 1, 'big')  # leading 0x00 keeps it positive
+        body += b'\x02' + _der_length(len(encoded)) + encoded
+    return b'\x30' + _der_length(len(body)) + body
+
+
+def _der_decode_integers(data):
+    """Decode a DER SEQUENCE of INTEGERs"""
+    def read_length(pos):
+        length = data[pos]
+        if length < 0x80:
+            return length, pos + 1
+        count = length & 0x7f
+        return int.from_bytes(data[pos + 1:pos + 1 + count], 'big'), pos + 1 + count
+
+    if not data or data[0] != 0x30:
+        raise ValueError("Invalid DSA parameters")
+    length, pos = read_length(1)
+    end = pos + length
+    values = []
+    while pos < end:
+        if data[pos] != 0x02:
+            raise ValueError("Invalid DSA parameters")
+        length, pos = read_length(pos + 1)
+        values.append(int.from_bytes(data[pos:pos + length], 'big'))
+        pos += length
+    return values
 
 class KeyGenerator:
-    def __init__(self):
+    def __init__(self, key_pool=None, reuse_dsa_parameters=False, keyring=None):
+        """
+        :param key_pool: Optional KeyPool handing out pre-generated key pairs
+        :param reuse_dsa_parameters: Derive new DSA keys from cached domain parameters
+        :param keyring: Optional Keyring reusing parsed/decrypted keys across loads
+        """
         self.public_key = None
         self.private_key = None
+        self.key_pool = key_pool
+        self.keyring = keyring
+        self.reuse_dsa_parameters = reuse_dsa_parameters
+        self.dsa_parameters = {}  # key size -> DSAParameters
+    
+    def generate_keys(self, algorithm='RSA', key_size=2048):
+        """
+        Generate a new key pair for the given algorithm name
+        :param algorithm: 'RSA', 'DSA', 'ECDSA P-256', 'ECDSA P-384', 'Ed25519' or 'Ed448'
+        :param key_size: Key size in bits (RSA and DSA only)
+        """
+        if algorithm == 'RSA':
+            return self.generate_rsa_keys(key_size=key_size)
+        elif algorithm == 'DSA':
+            return self.generate_dsa_keys(key_size=key_size)
+        elif algorithm.startswith('ECDSA '):
+            return self.generate_ec_keys(curve=algorithm.split(' ', 1)[1])
+        elif algorithm == 'Ed25519':
+            return self.generate_ed25519_keys()
+        elif algorithm == 'Ed448':
+            return self.generate_ed448_keys()
+        raise ValueError(f"Unsupported algorithm: {algorithm}")
+    
+    def set_keys(self, private_key, public_key=None):
+        """Use an existing key pair (e.g. one taken from a key pool)"""
+        self.private_key = private_key
+        self.public_key = public_key or private_key.public_key()
+        return self.private_key, self.public_key
     
     def generate_rsa_keys(self, key_size=2048):
         """Generate a new RSA key pair"""
-        """Sinh cặp khóa RSA mới và đo thời gian."""
-        start_time = time.time()  # Bắt đầu đo thời gian
-        self.private_key = rsa.generate_private_key(
-            public_exponent=65537,
-            key_size=key_size
-        )
-        self.public_key = self.private_key.public_key()
-        end_time = time.time()  # Kết thúc đo thời gian
-        duration = end_time - start_time
-        print(f"Thời gian sinh khóa RSA: {duration:.4f} giây")
+        """Sinh cặp khóa RSA mới (thời gian được ghi vào modules.metrics)."""
+        with metrics.phase('keygen', algorithm='RSA', key_size=key_size):
+            if self.key_pool:
+                self.set_keys(*self.key_pool.get('RSA', key_size))
+            else:
+                self.private_key = rsa.generate_private_key(
+                    public_exponent=65537,
+                    key_size=key_size
+                )
+                self.public_key = self.private_key.public_key()
         return self.private_key, self.public_key
     
-    def generate_dsa_keys(self, key_size=2048):
+    def generate_dsa_keys(self, key_size=2048, parameters=None):
         """Generate a new DSA key pair"""
-        """Sinh cặp khóa DSA mới và đo thời gian."""
-        start_time = time.time()  # Bắt đầu đo thời gian
-        self.private_key = dsa.generate_private_key(
-            key_size=key_size
-        )
-        self.public_key = self.private_key.public_key()
-        end_time = time.time()  # Kết thúc đo thời gian
-        duration = end_time - start_time
-        print(f"Thời gian sinh khóa DSA: {duration:.4f} giây")
+        """Sinh cặp khóa DSA mới (thời gian được ghi vào modules.metrics)."""
+        with metrics.phase('keygen', algorithm='DSA', key_size=key_size):
+            if parameters is None and self.reuse_dsa_parameters:
+                parameters = self.dsa_parameters.get(key_size)
+            
+            if parameters is not None:
+                # Only the private value is random, p/q/g are reused
+                self.private_key = parameters.generate_private_key()
+                self.public_key = self.private_key.public_key()
+            elif self.key_pool:
+                self.set_keys(*self.key_pool.get('DSA', key_size))
+            else:
+                self.private_key = dsa.generate_private_key(
+                    key_size=key_size
+                )
+                self.public_key = self.private_key.public_key()
+        
+        if self.reuse_dsa_parameters and key_size not in self.dsa_parameters:
+            self.dsa_parameters[key_size] = self.private_key.parameters()
         return self.private_key, self.public_key
     
+    def generate_ec_keys(self, curve='P-256'):
+        """Generate a new ECDSA key pair on a NIST curve"""
+        if curve not in EC_CURVES:
+            raise ValueError(f"Unsupported curve: {curve}")
+        with metrics.phase('keygen', algorithm=f'ECDSA {curve}'):
+            self.private_key = ec.generate_private_key(EC_CURVES[curve]())
+            self.public_key = self.private_key.public_key()
+        return self.private_key, self.public_key
+    
+    def generate_ed25519_keys(self):
+        """Generate a new Ed25519 key pair"""
+        with metrics.phase('keygen', algorithm='Ed25519'):
+            self.private_key = ed25519.Ed25519PrivateKey.generate()
+            self.public_key = self.private_key.public_key()
+        return self.private_key, self.public_key
+    
+    def generate_ed448_keys(self):
+        """Generate a new Ed448 key pair"""
+        with metrics.phase('keygen', algorithm='Ed448'):
+            self.private_key = ed448.Ed448PrivateKey.generate()
+            self.public_key = self.private_key.public_key()
+        return self.private_key, self.public_key
+    
+    def generate_dsa_parameters(self, key_size=2048):
+        """Generate DSA domain parameters (p, q, g) and reuse them for new keys"""
+        parameters = dsa.generate_parameters(key_size=key_size)
+        self.dsa_parameters[key_size] = parameters
+        self.reuse_dsa_parameters = True
+        return parameters
+    
+    def save_dsa_parameters(self, filename, key_size=2048):
+        """Save cached DSA parameters to a PEM file (OpenSSL 'DSA PARAMETERS' format)"""
+        parameters = self.dsa_parameters.get(key_size)
+        if parameters is None:
+            raise ValueError(f"No DSA parameters for key size {key_size}")
+        
+        numbers = parameters.parameter_numbers()
+        der = _der_encode_integers([numbers.p, numbers.q, numbers.g])
+        body = base64.encodebytes(der).decode('ascii').replace('\n', '')
+        lines = [body[i:i + 64] for i in range(0, len(body), 64)]
+        pem = "-----BEGIN DSA PARAMETERS-----\n" + "\n".join(lines) + "\n-----END DSA PARAMETERS-----\n"
+        
+        with open(filename, 'w', encoding='ascii') as f:
+            f.write(pem)
+    
+    def load_dsa_parameters(self, filename):
+        """Load DSA parameters from a PEM file and reuse them for new keys"""
+        with open(filename, 'r', encoding='ascii') as f:
+            pem = f.read()
+        
+        begin = "-----BEGIN DSA PARAMETERS-----"
+        end = "-----END DSA PARAMETERS-----"
+        if begin not in pem or end not in pem:
+            raise ValueError("Not a DSA parameters PEM file")
+        body = pem.split(begin, 1)[1].split(end, 1)[0]
+        p, q, g = _der_decode_integers(base64.b64decode(''.join(body.split())))
+        
+        parameters = dsa.DSAParameterNumbers(p, q, g).parameters()
+        key_size = p.bit_length()
+        self.dsa_parameters[key_size] = parameters
+        self.reuse_dsa_parameters = True
+        return parameters
+    
     def save_private_key(self, filename, password=None):
         """Save private key to file"""
         if not self.private_key:
@@ -68,6 +222,10 @@ class KeyGenerator:
     
     def load_private_key(self, filename, password=None):
         """Load private key from file"""
+        if self.keyring is not None:
+            self.private_key = self.keyring.load_private_key(filename, password)
+            return self.private_key
+        
         with open(filename, 'rb') as f:
             key_data = f.read()
         
@@ -85,6 +243,10 @@ class KeyGenerator:
     
     def load_public_key(self, filename):
         """Load public key from file"""
+        if self.keyring is not None:
+            self.public_key = self.keyring.load_public_key(filename)
+            return self.public_key
+        
         with open(filename, 'rb') as f:
             key_data = f.read()
         
@@ -0,0 +1,111 @@
+from concurrent.futures import ProcessPoolExecutor
+from collections import deque
+import multiprocessing
+import threading
+from cryptography.hazmat.primitives import serialization
+from modules.key_generator import KeyGenerator
+
+
+def _generate_key_der(algorithm, key_size):
+    """Generate a key pair in a worker process and return the private key as DER"""
+    private_key, _ = KeyGenerator().generate_keys(algorithm, key_size)
+    return private_key.private_bytes(
+        encoding=serialization.Encoding.DER,
+        format=serialization.PrivateFormat.PKCS8,
+        encryption_algorithm=serialization.NoEncryption()
+    )
+
+
+class KeyPool:
+    def __init__(self, depth=2, workers=None):
+        """
+        Pool of pre-generated key pairs, refilled in background processes
+        :param depth: Number of ready key pairs kept per (algorithm, key size)
+        :param workers: Number of generator processes (default: CPU count)
+        """
+        self.depth = depth
+        # spawn avoids forking a process that may be running a Tk main loop
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('spawn')
+        )
+        self.lock = threading.RLock()
+        self.ready = {}
+        self.pending = {}
+        self.closed = False
+
+    def prefill(self, algorithm, key_size):
+        """Start generating key pairs for this (algorithm, key size) up to depth"""
+        spec = (algorithm, int(key_size))
+        with self.lock:
+            if self.closed:
+                return
+            ready = self.ready.setdefault(spec, deque())
+            pending = self.pending.setdefault(spec, [])
+            futures = []
+            for _ in range(self.depth - len(ready) - len(pending)):
+                try:
+                    futures.append(self.executor.submit(_generate_key_der, *spec))
+                except RuntimeError:
+                    # Pool broken or shut down: get() falls back to in-process generation
+                    break
+            pending.extend(futures)
+
+        # Registered outside the lock: the callback runs immediately if the future is already done
+        for future in futures:
+            future.add_done_callback(lambda f, spec=spec: self._on_generated(spec, f))
+
+    def _on_generated(self, spec, future):
+        """Move a finished key from pending to ready"""
+        with self.lock:
+            pending = self.pending.get(spec, [])
+            if future not in pending:
+                return  # already claimed by get()
+            pending.remove(future)
+            if future.cancelled() or future.exception() is not None:
+                return
+            self.ready[spec].append(future.result())
+
+    def available(self, algorithm, key_size):
+        """Number of key pairs that can be handed out immediately"""
+        with self.lock:
+            return len(self.ready.get((algorithm, int(key_size)), ()))
+
+    def get(self, algorithm, key_size):
+        """
+        Take a key pair from the pool and schedule a refill
+        Falls back to waiting for an in-flight key, then to generating in-process.
+        :return: Tuple of (private_key, public_key)
+        """
+        spec = (algorithm, int(key_size))
+        key_der = None
+        future = None
+
+        with self.lock:
+            if self.ready.get(spec):
+                key_der = self.ready[spec].popleft()
+            elif self.pending.get(spec):
+                future = self.pending[spec].pop(0)
+
+        if key_der is None and future is not None:
+            try:
+                key_der = future.result()
+            except Exception:
+                key_der = None
+
+        self.prefill(*spec)
+
+        if key_der is None:
+            return KeyGenerator().generate_keys(algorithm, spec[1])
+
+        # Keys come from our own workers, so the expensive RSA consistency check is skipped
+        private_key = serialization.load_der_private_key(
+            key_der, password=None, unsafe_skip_rsa_key_validation=True
+        )
+        return private_key, private_key.public_key()
+
+    def shutdown(self):
+        """Stop the generator processes and drop pending work"""
+        with self.lock:
+            self.closed = True
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,174 @@
+from collections import OrderedDict
+from modules import metrics
+from modules.utils import get_key_fingerprint
+import hashlib
+import hmac
+import os
+import threading
+
+
+class _CachedKey:
+    """A parsed key plus what is needed to check a later request may reuse it"""
+
+    def __init__(self, key, password):
+        self.key = key
+        # Only a salted hash of the password is kept, to check later requests
+        self.salt = os.urandom(16)
+        self.password_check = self._password_hash(password)
+
+    def _password_hash(self, password):
+        if password is None:
+            return None
+        return hashlib.sha256(self.salt + password.encode()).digest()
+
+    def matches_password(self, password):
+        expected = self.password_check
+        if expected is None or password is None:
+            return expected is None and password is None
+        return hmac.compare_digest(expected, self._password_hash(password))
+
+    def wipe(self):
+        """Drop the key object and overwrite the password check.
+        The key material itself lives in OpenSSL, which clears it when the object is freed."""
+        self.key = None
+        if self.password_check is not None:
+            self.password_check = bytes(len(self.password_check))
+        self.salt = bytes(len(self.salt))
+
+
+class Keyring:
+    def __init__(self, max_entries=32):
+        """
+        Cache of parsed (and decrypted) keys loaded from PEM files
+        Entries are keyed by absolute path, mtime and a SHA-256 of the file contents,
+        so an edited or replaced key file is always re-parsed.
+        :param max_entries: Maximum number of cached keys, least recently used are evicted
+        """
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()  # (kind, path, mtime_ns, content sha256) -> _CachedKey
+        self.public_keys = {}  # SPKI SHA-256 fingerprint -> public key, for verification
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _read(filename):
+        """Read a PEM file into a mutable buffer that can be wiped after parsing"""
+        abs_path = os.path.abspath(filename)
+        with open(abs_path, 'rb') as f:
+            st = os.fstat(f.fileno())
+            data = bytearray(f.read())
+        return abs_path, st.st_mtime_ns, data
+
+    def _lookup(self, cache_key, password):
+        with self.lock:
+            entry = self.entries.get(cache_key)
+            if entry is not None and entry.matches_password(password):
+                self.entries.move_to_end(cache_key)
+                self.hits += 1
+                metrics.count('keyring_hits_total')
+                return entry.key
+            self.misses += 1
+        metrics.count('keyring_misses_total')
+        return None
+
+    def _store(self, cache_key, key, password):
+        with self.lock:
+            old = self.entries.pop(cache_key, None)
+            if old is not None:
+                old.wipe()
+            self.entries[cache_key] = _CachedKey(key, password)
+            while len(self.entries) > self.max_entries:
+                _, evicted = self.entries.popitem(last=False)
+                evicted.wipe()
+
+    def _load(self, kind, filename, password, parse):
+        abs_path, mtime_ns, data = self._read(filename)
+        try:
+            cache_key = (kind, abs_path, mtime_ns, hashlib.sha256(data).digest())
+            key = self._lookup(cache_key, password)
+            if key is None:
+                with metrics.phase('key_parse', kind=kind):
+                    key = parse(data)
+                self._store(cache_key, key, password)
+            return key
+        finally:
+            # Do not leave the (possibly unencrypted) PEM lying around in memory
+            data[:] = bytes(len(data))
+
+    def load_private_key(self, filename, password=None):
+        """
+        Load a private key, reusing the decrypted key if the file is unchanged
+        :param filename: PEM file
+        :param password: Password of an encrypted key
+        :return: Private key object
+        """
+        from cryptography.hazmat.primitives import serialization
+
+        password = password or None
+        return self._load(
+            'private', filename, password,
+            lambda data: serialization.load_pem_private_key(
+                data, password=password.encode() if password is not None else None
+            )
+        )
+
+    def load_public_key(self, filename):
+        """
+        Load a public key, reusing the parsed key if the file is unchanged
+        :param filename: PEM file
+        :return: Public key object
+        """
+        from cryptography.hazmat.primitives import serialization
+
+        return self._load('public', filename, None, serialization.load_pem_public_key)
+
+    def add_public_key(self, public_key):
+        """
+        Index a public key by fingerprint for verification
+        :return: Fingerprint (key ID) as hex
+        """
+        fingerprint = get_key_fingerprint(public_key)
+        with self.lock:
+            self.public_keys[fingerprint] = public_key
+        return fingerprint
+
+    def load_public_key_directory(self, directory, extensions=('.pem', '.pub')):
+        """
+        Load and index every public key file in a directory
+        Files that are not public keys (e.g. private keys) are skipped.
+        :return: List of fingerprints that were added
+        """
+        fingerprints = []
+        for name in sorted(os.listdir(directory)):
+            path = os.path.join(directory, name)
+            if not name.lower().endswith(extensions) or not os.path.isfile(path):
+                continue
+            try:
+                public_key = self.load_public_key(path)
+            except (ValueError, TypeError):
+                continue
+            fingerprints.append(self.add_public_key(public_key))
+        return fingerprints
+
+    def find_public_key(self, key_id):
+        """
+        Return the public key with this fingerprint, or None
+        :param key_id: Hex fingerprint (case-insensitive)
+        """
+        return self.public_keys.get(key_id.strip().lower())
+
+    def clear(self):
+        """Wipe and drop every cached key"""
+        with self.lock:
+            for entry in self.entries.values():
+                entry.wipe()
+            self.entries.clear()
+            self.public_keys.clear()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __bool__(self):
+        # An empty keyring is still a keyring
+        return True
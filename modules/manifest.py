@@ -0,0 +1,362 @@
+"""
+Signed manifests: one signature covering many files
+
+A manifest lists every file of a tree as "<hex digest>  <size>  <path>",
+sorted by path (relative, '/'-separated), after a small header naming the
+hash algorithm. Only the manifest is signed (its .sig is a signature
+envelope), so signing N files costs one private-key operation, and
+verification checks that one signature before comparing file digests
+concurrently.
+
+Incremental signing keeps a "<manifest>.state" file with the size, mtime,
+ctime and inode each digest was computed from; on the next run only files
+whose stat changed are re-hashed, so re-signing costs a stat per file plus
+time proportional to the changes. The state is only written by incremental
+runs, so the first incremental run (even after a normal one) hashes every
+file.
+"""
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from modules.batch import hash_file, summarize
+from modules.digest_cache import file_identity, is_racy
+from modules.envelope import EnvelopeMismatch
+from modules.signature import DigitalSignature
+from modules.utils import get_key_fingerprint
+from modules import hashing
+import hmac
+import json
+import os
+import time
+
+HEADER = '# digital-signature manifest v1'
+STATE_VERSION = 2
+
+
+class ManifestError(ValueError):
+    """Raised for malformed manifests"""
+
+
+def relative_path(file_path, root):
+    """Manifest path of a file: relative to root, with '/' separators"""
+    rel_path = os.path.relpath(os.path.abspath(file_path), os.path.abspath(root))
+    if rel_path.startswith('..') or os.path.isabs(rel_path):
+        raise ManifestError(f"File is outside the manifest root: {file_path}")
+    if '\n' in rel_path or '\r' in rel_path:
+        raise ManifestError(f"File name contains a line break: {file_path!r}")
+    try:
+        rel_path.encode('utf-8')
+    except UnicodeEncodeError:
+        # Undecodable bytes (surrogate-escaped by os.fsdecode) cannot be written to the manifest
+        raise ManifestError(f"File name is not valid UTF-8: {file_path!r}")
+    return rel_path.replace(os.sep, '/')
+
+
+def format_manifest(entries, hash_algorithm):
+    """
+    Render manifest entries deterministically
+    :param entries: Iterable of (path, size, digest) tuples
+    :param hash_algorithm: Hash algorithm name (e.g. 'SHA256')
+    :return: Manifest bytes (UTF-8)
+    """
+    lines = [HEADER, f'# hash: {hash_algorithm}']
+    for path, size, digest in sorted(entries):
+        lines.append(f'{digest.hex()}  {size}  {path}')
+    return ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+def parse_manifest(data):
+    """
+    Parse manifest bytes
+    :return: Tuple of (hash algorithm name, list of (path, size, digest))
+    :raises ManifestError: if the manifest is malformed
+    """
+    try:
+        lines = data.decode('utf-8').splitlines()
+    except UnicodeDecodeError:
+        raise ManifestError("Manifest is not valid UTF-8")
+    if len(lines) < 2 or lines[0] != HEADER or not lines[1].startswith('# hash: '):
+        raise ManifestError("Not a signed manifest")
+    hash_algorithm = lines[1][len('# hash: '):].strip()
+
+    entries = []
+    for number, line in enumerate(lines[2:], start=3):
+        try:
+            digest, size, path = line.split('  ', 2)
+            entries.append((path, int(size), bytes.fromhex(digest)))
+        except ValueError:
+            raise ManifestError(f"Malformed manifest line {number}")
+    return hash_algorithm, entries
+
+
+def load_state(state_path, hash_algorithm):
+    """
+    Load the stat state of a previous incremental run
+    :return: Dict of manifest path -> (size, mtime_ns, ctime_ns, inode, digest); empty if
+             missing, unreadable, from an older version or made with another hash algorithm
+    """
+    try:
+        with open(state_path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        if state.get("version") != STATE_VERSION or state.get("hash") != hash_algorithm:
+            return {}
+        return {
+            path: (size, mtime_ns, ctime_ns, inode, bytes.fromhex(digest))
+            for path, (size, mtime_ns, ctime_ns, inode, digest) in state["files"].items()
+        }
+    except (OSError, ValueError, KeyError, TypeError):
+        return {}
+
+
+def save_state(state_path, hash_algorithm, files):
+    """Write the stat state (written to a temporary file, then renamed)"""
+    state = {
+        "version": STATE_VERSION,
+        "hash": hash_algorithm,
+        "files": {
+            path: [size, mtime_ns, ctime_ns, inode, digest.hex()]
+            for path, (size, mtime_ns, ctime_ns, inode, digest) in files.items()
+        }
+    }
+    tmp_path = state_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, separators=(',', ':'))
+    os.replace(tmp_path, state_path)
+
+
+class ManifestSigner:
+    def __init__(self, private_key, hash_algorithm='SHA256', workers=None, digest_cache=None, signature_index=None):
+        """
+        :param private_key: Private key object signing the manifest
+        :param hash_algorithm: Hash algorithm name (see DigitalSignature.hash_algorithms)
+        :param workers: Threads used for hashing (default: CPU count * 2)
+        :param digest_cache: Optional DigestCache used to skip re-hashing unchanged files
+        :param signature_index: Optional SignatureIndex recording the manifest and every file it covers
+        """
+        self.signature_tool = DigitalSignature()
+        if hash_algorithm not in self.signature_tool.hash_algorithms:
+            raise ValueError(f"Unsupported hash algorithm: {hash_algorithm}")
+
+        self.private_key = private_key
+        self.hash_algorithm = hash_algorithm
+        self.workers = workers or (os.cpu_count() or 1) * 2
+        self.digest_cache = digest_cache
+        self.signature_index = signature_index
+
+    def sign_files(self, files, root, manifest_path, on_result=None, incremental=False):
+        """
+        Hash files in parallel, write the manifest and sign it once
+        :param files: List of file paths under root
+        :param root: Directory manifest paths are relative to
+        :param manifest_path: Output manifest; the signature goes to manifest_path + '.sig'
+        :param on_result: Optional callback called with each per-file result
+        :param incremental: Reuse digests of files whose size/mtime/ctime/inode did not change
+                            since the previous run (tracked in manifest_path + '.state')
+        :return: Tuple of (list of per-file results, summary dict); if any file failed,
+                 nothing is written or signed and summary["signed"] is False
+        """
+        start_time = time.perf_counter()
+        signature_path = manifest_path + '.sig'
+        state_path = manifest_path + '.state'
+        excluded = {os.path.abspath(p) for p in (manifest_path, signature_path, state_path, state_path + '.tmp')}
+        files = [f for f in files if os.path.abspath(f) not in excluded]
+
+        previous = load_state(state_path, self.hash_algorithm) if incremental else {}
+        current = {}
+        results = []
+        entries = []
+
+        def finish(result):
+            results.append(result)
+            if on_result:
+                on_result(result)
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {}
+            for path in files:
+                result = {"path": path, "size": 0, "ok": False, "status": "error", "error": None}
+                try:
+                    rel_path = relative_path(path, root)
+                    st = os.stat(path)
+                except (OSError, ManifestError) as e:
+                    result["error"] = str(e)
+                    finish(result)
+                    continue
+
+                identity = file_identity(st)
+                cached = previous.get(rel_path)
+                if cached is not None and cached[:4] == identity:
+                    # Unchanged since the last run: no read at all
+                    result.update(size=st.st_size, ok=True, status="reused")
+                    entries.append((rel_path, st.st_size, cached[4]))
+                    current[rel_path] = cached
+                    finish(result)
+                    continue
+
+                future = executor.submit(hash_file, path, self.hash_algorithm, self.digest_cache)
+                futures[future] = (path, rel_path, identity, result)
+
+            for future in as_completed(futures):
+                path, rel_path, identity, result = futures[future]
+                try:
+                    digest, result["size"] = future.result()
+                    entries.append((rel_path, result["size"], digest))
+                    result.update(ok=True, status="hashed")
+                    # Files changed during or just before hashing are re-hashed next time
+                    st = os.stat(path)
+                    if result["size"] == identity[0] and file_identity(st) == identity and not is_racy(st):
+                        current[rel_path] = identity + (digest,)
+                except Exception as e:
+                    result["error"] = str(e)
+                finish(result)
+
+        def make_summary(signed):
+            summary = summarize(results, time.perf_counter() - start_time)
+            summary["manifest"] = manifest_path
+            summary["signature"] = signature_path
+            summary["hashed"] = sum(1 for r in results if r["status"] == "hashed")
+            summary["reused"] = sum(1 for r in results if r["status"] == "reused")
+            summary["removed"] = len(set(previous) - {entry[0] for entry in entries})
+            summary["signed"] = signed
+            return summary
+
+        if any(not r["ok"] for r in results):
+            # A manifest without a listed file would vouch for an incomplete tree
+            return results, make_summary(False)
+
+        data = format_manifest(entries, self.hash_algorithm)
+        with open(manifest_path, 'wb') as f:
+            f.write(data)
+
+        # The only private-key operation of the run
+        envelope = self.signature_tool.sign_file_envelope(manifest_path, self.private_key, self.hash_algorithm)
+        self.signature_tool.save_signature(envelope, signature_path)
+
+        if incremental:
+            save_state(state_path, self.hash_algorithm, current)
+
+        if self.signature_index is not None:
+            # Files are signed through the manifest: their records point at its signature
+            key_id = get_key_fingerprint(self.private_key)
+            records = [(manifest_path, envelope.digest, self.hash_algorithm, key_id, len(data), signature_path)]
+            records.extend(
+                (os.path.join(root, *path.split('/')), digest, self.hash_algorithm, key_id, size, signature_path)
+                for path, size, digest in entries
+            )
+            self.signature_index.add_many(records)
+
+        return results, make_summary(True)
+
+
+class ManifestVerifier:
+    def __init__(self, public_key=None, workers=None, digest_cache=None, keyring=None):
+        """
+        :param public_key: Public key object (default: looked up in keyring by key ID)
+        :param workers: Threads used for hashing (default: CPU count * 2)
+        :param digest_cache: Optional DigestCache used to skip re-hashing unchanged files
+        :param keyring: Optional Keyring holding the signers' public keys
+        """
+        if public_key is None and keyring is None:
+            raise ValueError("A public key or a keyring is required")
+        self.signature_tool = DigitalSignature()
+        self.public_key = public_key
+        self.keyring = keyring
+        self.workers = workers or (os.cpu_count() or 1) * 2
+        self.digest_cache = digest_cache
+
+    def verify_manifest_signature(self, manifest_path):
+        """
+        Check the manifest's own signature (one public-key operation)
+        The manifest is read once and the verified bytes are returned, so the
+        entries checked afterwards are exactly the ones that were signed.
+        :return: Tuple of (manifest bytes or None, error message or None)
+        """
+        signature_path = manifest_path + '.sig'
+        if not os.path.exists(signature_path):
+            return None, "Signature file not found"
+        envelope = self.signature_tool.load_envelope(signature_path)
+        if envelope is None:
+            return None, "Manifest signature is not a signature envelope"
+
+        with open(manifest_path, 'rb') as f:
+            data = f.read()
+        try:
+            if not self.signature_tool.check_envelope(manifest_path, envelope, self.public_key, self.keyring):
+                return None, "Invalid manifest signature"
+        except EnvelopeMismatch as e:
+            return None, str(e)
+
+        hasher = hashing.new_hasher(envelope.hash_algorithm)
+        hasher.update(data)
+        if not hmac.compare_digest(hasher.digest(), envelope.digest):
+            return None, "Manifest does not match its signature"
+        return data, None
+
+    def _check(self, root, path, size, digest, hash_algorithm):
+        file_path = os.path.join(root, *path.split('/'))
+        result = {
+            "path": file_path,
+            "size": 0,
+            "ok": False,
+            "status": "error",
+            "error": None
+        }
+        try:
+            if not os.path.exists(file_path):
+                result["status"] = "missing_file"
+                result["error"] = "File not found"
+                return result
+            actual_size = os.path.getsize(file_path)
+            if actual_size != size:
+                # Cheap rejection before hashing
+                result["status"] = "invalid"
+                result["error"] = f"Size {actual_size} does not match manifest size {size}"
+                return result
+            actual, result["size"] = hash_file(file_path, hash_algorithm, self.digest_cache)
+            result["ok"] = hmac.compare_digest(actual, digest)
+            result["status"] = "valid" if result["ok"] else "invalid"
+        except Exception as e:
+            result["error"] = str(e)
+        return result
+
+    def verify(self, manifest_path, root=None, on_result=None):
+        """
+        Verify the manifest signature, then every listed file concurrently
+        :param manifest_path: Signed manifest (its signature is manifest_path + '.sig')
+        :param root: Directory manifest paths are relative to (default: the manifest's directory)
+        :param on_result: Optional callback called with each per-file result
+        :return: Tuple of (list of per-file results, summary dict); no file is checked
+                 when summary["manifest_valid"] is False (see summary["manifest_error"])
+        """
+        start_time = time.perf_counter()
+        root = root or os.path.dirname(os.path.abspath(manifest_path))
+
+        data, manifest_error = self.verify_manifest_signature(manifest_path)
+        results = []
+        entries = None
+        if data is not None:
+            try:
+                hash_algorithm, entries = parse_manifest(data)
+                if hash_algorithm not in self.signature_tool.hash_algorithms:
+                    raise ManifestError(f"Unsupported hash algorithm: {hash_algorithm}")
+            except ManifestError as e:
+                # Signed by a trusted key but unusable: reported like a bad signature
+                manifest_error = str(e)
+                entries = None
+        manifest_valid = entries is not None
+        if manifest_valid:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                futures = [
+                    executor.submit(self._check, root, path, size, digest, hash_algorithm)
+                    for path, size, digest in entries
+                ]
+                for future in as_completed(futures):
+                    result = future.result()
+                    results.append(result)
+                    if on_result:
+                        on_result(result)
+
+        summary = summarize(results, time.perf_counter() - start_time)
+        summary["manifest_valid"] = manifest_valid
+        summary["manifest_error"] = manifest_error
+        for status in ("valid", "invalid", "missing_file", "error"):
+            summary[status] = sum(1 for r in results if r["status"] == status)
+        return results, summary
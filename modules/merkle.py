@@ -0,0 +1,195 @@
+"""
+Chunked (Merkle tree) file signatures
+
+The file is split into fixed-size chunks that are hashed in parallel
+(hashlib releases the GIL). The chunk hashes are the leaves of a binary
+Merkle tree and only the root is signed. Because the leaves are stored with
+the signature, a byte range can be verified by re-hashing just the chunks it
+covers, and a modified file can be re-signed by re-hashing only the chunks
+that changed.
+
+Leaves and inner nodes are domain-separated as in RFC 6962
+(H(0x00 || chunk), H(0x01 || left || right)); an odd node at the end of a
+level is carried up unchanged.
+
+Binary layout (all integers big-endian):
+
+    magic 'DSMT' | version u8 | chunk size u32 | leaf count u32 | leaf size u8
+    | leaves | envelope (see modules.envelope, digest = Merkle root)
+"""
+from concurrent.futures import ThreadPoolExecutor
+from modules import hashing
+from modules.envelope import SignatureEnvelope, EnvelopeError
+import os
+import struct
+import threading
+
+MAGIC = b'DSMT'
+VERSION = 1
+
+# Large enough to amortize per-chunk overhead, small enough for useful range checks
+DEFAULT_CHUNK_SIZE = 4 * 1024 * 1024
+
+_HEADER = struct.Struct('>4sBIIB')
+_LEAF_PREFIX = b'\x00'
+_NODE_PREFIX = b'\x01'
+
+
+def chunk_count(file_size, chunk_size):
+    """Number of leaves for a file (an empty file still has one, empty, chunk)"""
+    return max(1, -(-file_size // chunk_size))
+
+
+def chunks_for_range(offset, length, chunk_size):
+    """Return the range of chunk indexes covering [offset, offset + length)"""
+    if length <= 0:
+        return range(0)
+    return range(offset // chunk_size, (offset + length - 1) // chunk_size + 1)
+
+
+def merkle_root(leaves, algorithm='sha256'):
+    """
+    Compute the root of the tree over a list of leaf hashes
+    :param leaves: List of leaf digests
+    :param algorithm: hashlib name
+    :return: Root digest
+    """
+    level = list(leaves)
+    while len(level) > 1:
+        parents = []
+        for i in range(0, len(level) - 1, 2):
+            hasher = hashing.new_hasher(algorithm)
+            hasher.update(_NODE_PREFIX + level[i] + level[i + 1])
+            parents.append(hasher.digest())
+        if len(level) % 2:
+            parents.append(level[-1])
+        level = parents
+    return level[0]
+
+
+class ChunkHasher:
+    def __init__(self, file_path, algorithm='sha256', chunk_size=DEFAULT_CHUNK_SIZE, workers=None,
+                 progress=None, cancel_event=None):
+        """
+        Hash chunks of one file on a thread pool
+        :param file_path: Path to file
+        :param algorithm: hashlib name
+        :param chunk_size: Chunk size in bytes
+        :param workers: Threads (default: CPU count)
+        :param progress: Optional callable receiving the number of bytes hashed so far
+        :param cancel_event: Optional threading.Event; hashing stops with OperationCancelled once set
+        """
+        self.file_path = file_path
+        self.algorithm = algorithm
+        self.chunk_size = chunk_size
+        self.workers = workers or os.cpu_count() or 1
+        self.progress = progress
+        self.cancel_event = cancel_event
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.bytes_done = 0
+
+    def _buffer(self):
+        """Per-thread read buffer, reused for every chunk"""
+        buffer = getattr(self.local, 'buffer', None)
+        if buffer is None:
+            buffer = self.local.buffer = bytearray(self.chunk_size)
+        return buffer
+
+    def hash_chunk(self, index):
+        """Return the leaf hash of one chunk"""
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            raise hashing.OperationCancelled()
+
+        buffer = self._buffer()
+        with open(self.file_path, 'rb', buffering=0) as f:
+            f.seek(index * self.chunk_size)
+            view = memoryview(buffer)
+            filled = 0
+            while filled < self.chunk_size:
+                n = f.readinto(view[filled:])
+                if not n:
+                    break
+                filled += n
+
+        hasher = hashing.new_hasher(self.algorithm)
+        hasher.update(_LEAF_PREFIX)
+        hasher.update(view[:filled])
+
+        if self.progress is not None:
+            with self.lock:
+                self.bytes_done += filled
+                done = self.bytes_done
+            self.progress(done)
+        return hasher.digest()
+
+    def hash_chunks(self, indexes):
+        """
+        Hash several chunks in parallel
+        :return: Dict of chunk index -> leaf hash
+        """
+        indexes = list(indexes)
+        if len(indexes) <= 1 or self.workers == 1:
+            return {i: self.hash_chunk(i) for i in indexes}
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(indexes))) as executor:
+            return dict(zip(indexes, executor.map(self.hash_chunk, indexes)))
+
+
+class MerkleSignature:
+    def __init__(self, envelope, chunk_size, leaves):
+        """
+        Signature over the Merkle root of a chunked file
+        :param envelope: SignatureEnvelope whose digest is the Merkle root
+        :param chunk_size: Chunk size in bytes
+        :param leaves: List of leaf hashes
+        """
+        self.envelope = envelope
+        self.chunk_size = chunk_size
+        self.leaves = leaves
+
+    @property
+    def algorithm(self):
+        """hashlib name of the tree hash"""
+        return self.envelope.hash_algorithm.lower()
+
+    def check_leaves(self):
+        """Return True if the stored leaves hash to the signed root"""
+        if len(self.leaves) != chunk_count(self.envelope.file_size, self.chunk_size):
+            return False
+        return merkle_root(self.leaves, self.algorithm) == self.envelope.digest
+
+    def to_bytes(self):
+        leaf_size = len(self.leaves[0])
+        return b''.join([
+            _HEADER.pack(MAGIC, VERSION, self.chunk_size, len(self.leaves), leaf_size),
+            b''.join(self.leaves),
+            self.envelope.to_bytes()
+        ])
+
+    @classmethod
+    def from_bytes(cls, data):
+        """
+        Parse the binary form
+        :raises EnvelopeError: if the data is malformed
+        """
+        try:
+            magic, version, chunk_size, count, leaf_size = _HEADER.unpack_from(data, 0)
+        except struct.error as e:
+            raise EnvelopeError(f"Malformed Merkle signature: {e}")
+        if magic != MAGIC:
+            raise EnvelopeError("Not a Merkle signature")
+        if version != VERSION:
+            raise EnvelopeError(f"Unsupported Merkle signature version: {version}")
+        if chunk_size == 0:
+            raise EnvelopeError("Malformed Merkle signature: zero chunk size")
+
+        offset = _HEADER.size
+        end = offset + count * leaf_size
+        if end > len(data):
+            raise EnvelopeError("Malformed Merkle signature: truncated leaves")
+        leaves = [bytes(data[i:i + leaf_size]) for i in range(offset, end, leaf_size)]
+        return cls(SignatureEnvelope.from_bytes(data[end:]), chunk_size, leaves)
+
+
+def is_merkle_signature(data):
+    return data[:len(MAGIC)] == MAGIC
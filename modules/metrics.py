@@ -0,0 +1,205 @@
+"""
+Optional timing and counter instrumentation
+
+Instrumentation is disabled by default: phase() then returns a shared no-op
+context manager and count() returns immediately, so instrumented code pays
+only a function call. Enable it with enable() to collect per-phase duration
+histograms and counters, export them in Prometheus text format or forward
+every observation to a callback.
+
+    from modules import metrics
+    registry = metrics.enable()
+    DigitalSignature().sign_file("artifact.bin", private_key)
+    print(registry.to_prometheus())
+"""
+import threading
+import time
+
+# Histogram bucket upper bounds in seconds
+DEFAULT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 60.0)
+
+# Metric name used for phase durations
+PHASE_METRIC = 'phase_seconds'
+
+
+class _NullTimer:
+    """Context manager doing nothing, returned while instrumentation is disabled"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    def __init__(self, metrics, name, labels):
+        self.metrics = metrics
+        self.name = name
+        self.labels = labels
+        self.start = 0
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.metrics.observe(self.name, (time.perf_counter_ns() - self.start) / 1e9, **self.labels)
+        return False
+
+
+def _escape_label_value(value):
+    """Escape a label value for the Prometheus text format"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class Metrics:
+    def __init__(self, buckets=DEFAULT_BUCKETS, callback=None):
+        """
+        :param buckets: Histogram bucket upper bounds in seconds
+        :param callback: Optional callable(kind, name, value, labels) called for every
+                         observation ('histogram') and increment ('counter')
+        """
+        self.buckets = tuple(sorted(buckets))
+        self.callback = callback
+        self.lock = threading.Lock()
+        self.counters = {}    # (name, labels) -> value
+        self.histograms = {}  # (name, labels) -> [bucket counts..., sum, count]
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted(labels.items()))
+
+    def increment(self, name, amount=1, **labels):
+        """Add amount to a counter"""
+        key = self._key(name, labels)
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+        if self.callback:
+            self.callback('counter', name, amount, labels)
+
+    def observe(self, name, value, **labels):
+        """Record a value (usually seconds) in a histogram"""
+        key = self._key(name, labels)
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    histogram[i] += 1
+            histogram[-2] += value
+            histogram[-1] += 1
+        if self.callback:
+            self.callback('histogram', name, value, labels)
+
+    def timer(self, name, **labels):
+        """Context manager observing the duration of its block"""
+        return _Timer(self, name, labels)
+
+    def snapshot(self):
+        """
+        Return the current values
+        :return: Dict with 'counters' and 'histograms' keyed by (name, labels tuple)
+        """
+        with self.lock:
+            return {
+                "counters": dict(self.counters),
+                "histograms": {
+                    key: {
+                        "buckets": dict(zip(self.buckets, values[:-2])),
+                        "sum": values[-2],
+                        "count": values[-1]
+                    }
+                    for key, values in self.histograms.items()
+                }
+            }
+
+    def reset(self):
+        """Drop every recorded value"""
+        with self.lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+    def to_prometheus(self, prefix='digital_signature_'):
+        """Render all metrics in the Prometheus text exposition format"""
+        def format_labels(labels, extra=()):
+            items = list(labels) + list(extra)
+            if not items:
+                return ''
+            return '{' + ','.join(f'{k}="{_escape_label_value(v)}"' for k, v in items) + '}'
+
+        snapshot = self.snapshot()
+        lines = []
+
+        for name in sorted({key[0] for key in snapshot["counters"]}):
+            metric = prefix + name
+            lines.append(f"# TYPE {metric} counter")
+            for (key_name, labels), value in sorted(snapshot["counters"].items()):
+                if key_name == name:
+                    lines.append(f"{metric}{format_labels(labels)} {value}")
+
+        for name in sorted({key[0] for key in snapshot["histograms"]}):
+            metric = prefix + name
+            lines.append(f"# TYPE {metric} histogram")
+            for (key_name, labels), histogram in sorted(snapshot["histograms"].items()):
+                if key_name != name:
+                    continue
+                for bound, bucket_count in histogram["buckets"].items():
+                    lines.append(f"{metric}_bucket{format_labels(labels, [('le', bound)])} {bucket_count}")
+                lines.append(f"{metric}_bucket{format_labels(labels, [('le', '+Inf')])} {histogram['count']}")
+                lines.append(f"{metric}_sum{format_labels(labels)} {histogram['sum']}")
+                lines.append(f"{metric}_count{format_labels(labels)} {histogram['count']}")
+
+        return '\n'.join(lines) + '\n'
+
+
+# Registry receiving observations, None while instrumentation is disabled
+_active = None
+
+
+def enable(metrics=None):
+    """
+    Start recording into metrics (a new Metrics registry by default)
+    :return: The active Metrics registry
+    """
+    global _active
+    _active = metrics if metrics is not None else Metrics()
+    return _active
+
+
+def disable():
+    """Stop recording; instrumented code becomes a no-op again"""
+    global _active
+    _active = None
+
+
+def get_metrics():
+    """Return the active registry, or None when disabled"""
+    return _active
+
+
+def enabled():
+    return _active is not None
+
+
+def phase(name, **labels):
+    """Time a phase of an operation (no-op while disabled)"""
+    if _active is None:
+        return _NULL_TIMER
+    return _active.timer(PHASE_METRIC, phase=name, **labels)
+
+
+def observe_phase(name, seconds, **labels):
+    """Record an already measured phase duration (no-op while disabled)"""
+    if _active is not None:
+        _active.observe(PHASE_METRIC, seconds, phase=name, **labels)
+
+
+def count(name, amount=1, **labels):
+    """Increment a counter (no-op while disabled)"""
+    if _active is not None:
+        _active.increment(name, amount, **labels)
@@ -1,15 +1,29 @@
 from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.asymmetric import padding, utils
 from cryptography.exceptions import InvalidSignature
+from modules import algorithms, hashing, metrics
+from modules.envelope import SignatureEnvelope, EnvelopeMismatch, parse as parse_envelope
+from modules import merkle
+from modules.utils import get_key_fingerprint
+import hmac
 import os
-import time
+
+# Companion file holding the signer's key fingerprint, next to the .sig file
+KEY_ID_SUFFIX = '.keyid'
 
 class DigitalSignature:
-    def __init__(self):
+    def __init__(self, digest_cache=None):
+        """
+        :param digest_cache: Optional DigestCache used to skip re-hashing unchanged files
+        """
+        self.digest_cache = digest_cache
         self.hash_algorithms = {
             'SHA256': hashes.SHA256(),
             'SHA384': hashes.SHA384(),
-            'SHA512': hashes.SHA512()
+            'SHA512': hashes.SHA512(),
+            'SHA3-256': hashes.SHA3_256(),
+            'SHA3-512': hashes.SHA3_512(),
+            'BLAKE2b': hashes.BLAKE2b(64),
+            'BLAKE2s': hashes.BLAKE2s(32)
         }
     
     def sign_message(self, message, private_key, hash_algorithm='SHA256'):
@@ -26,23 +40,8 @@ class DigitalSignature:
         # Choose hash algorithm
         hash_algo = self.hash_algorithms.get(hash_algorithm, self.hash_algorithms['SHA256'])
         
-        # Different signing process for RSA and DSA
-        if private_key.__class__.__name__ == 'RSAPrivateKey':
-            signature = private_key.sign(
-                message,
-                padding.PSS(
-                    mgf=padding.MGF1(hash_algo),
-                    salt_length=padding.PSS.MAX_LENGTH
-                ),
-                hash_algo
-            )
-        elif private_key.__class__.__name__ == 'DSAPrivateKey':
-            signature = private_key.sign(
-                message,
-                hash_algo
-            )
-        else:
-            raise ValueError("Unsupported key type")
+        # Signing process depends on the key type (resolved once per key class)
+        signature = algorithms.resolve(private_key).sign_message(private_key, message, hash_algo)
         
         return signature
     
@@ -61,144 +60,446 @@ class DigitalSignature:
         # Choose hash algorithm
         hash_algo = self.hash_algorithms.get(hash_algorithm, self.hash_algorithms['SHA256'])
         
+        scheme = algorithms.resolve(public_key)
+        
         try:
-            # Different verification process for RSA and DSA
-            if public_key.__class__.__name__ == 'RSAPublicKey':
-                public_key.verify(
-                    signature,
-                    message,
-                    padding.PSS(
-                        mgf=padding.MGF1(hash_algo),
-                        salt_length=padding.PSS.MAX_LENGTH
-                    ),
-                    hash_algo
-                )
-            elif public_key.__class__.__name__ == 'DSAPublicKey':
-                public_key.verify(
-                    signature,
-                    message,
-                    hash_algo
-                )
-            else:
-                raise ValueError("Unsupported key type")
+            scheme.verify_message(public_key, signature, message, hash_algo)
             return True
         except InvalidSignature:
             return False
     
-    def sign_file(self, file_path, private_key, hash_algorithm='SHA256'):
-        """Sign a file using private key and measure time taken"""
-        start_time = time.time()  # Start timing
+    def sign_digest(self, digest, private_key, hash_algorithm='SHA256'):
+        """
+        Sign a precomputed digest using private key
+        :param digest: Digest bytes produced with hash_algorithm
+        :param private_key: Private key object
+        :param hash_algorithm: Hash algorithm the digest was computed with
+        :return: Signature bytes
+        """
+        hash_algo = self.hash_algorithms.get(hash_algorithm, self.hash_algorithms['SHA256'])
+
+        scheme = algorithms.resolve(private_key)
+        with metrics.phase('private_key_op', algorithm=scheme.name):
+            return scheme.sign_digest(private_key, digest, hash_algo)
+
+    def verify_digest(self, digest, signature, public_key, hash_algorithm='SHA256'):
+        """
+        Verify a signature over a precomputed digest
+        :param digest: Digest bytes produced with hash_algorithm
+        :param signature: Signature bytes
+        :param public_key: Public key object
+        :param hash_algorithm: Hash algorithm the digest was computed with
+        :return: True if signature is valid, False otherwise
+        """
+        hash_algo = self.hash_algorithms.get(hash_algorithm, self.hash_algorithms['SHA256'])
+
+        try:
+            self._verify_digest(digest, signature, public_key, hash_algo)
+            return True
+        except InvalidSignature:
+            return False
+
+    def _verify_digest(self, digest, signature, public_key, hash_algo):
+        """Verify a prehashed digest, raising InvalidSignature on mismatch"""
+        scheme = algorithms.resolve(public_key)
+        with metrics.phase('public_key_op', algorithm=scheme.name):
+            scheme.verify_digest(public_key, signature, digest, hash_algo)
+
+    def _hash_file(self, file_path, hash_algo, progress=None, cancel_event=None):
         """
-        Sign a file using private key
+        Compute the digest of a file in a single streamed pass
+        :param file_path: Path to file
+        :param hash_algo: cryptography hash algorithm instance
+        :param progress: Optional callable receiving the number of bytes hashed so far
+        :param cancel_event: Optional threading.Event used to cancel hashing
+        :return: Digest bytes
+        """
+        def compute(path):
+            return self._read_digest(path, hash_algo, progress, cancel_event)
+
+        if self.digest_cache:
+            return self.digest_cache.get_or_compute(file_path, hash_algo.name, compute)
+        return compute(file_path)
+
+    def _read_digest(self, file_path, hash_algo, progress=None, cancel_event=None):
+        """Read the whole file through the shared hashing primitive"""
+        return hashing.hash_file(file_path, hash_algo.name, progress=progress, cancel_event=cancel_event)
+
+    def file_digests(self, file_path, algorithms, progress=None, cancel_event=None):
+        """
+        Compute several digests of a file in a single read pass (cached digests are reused)
+        :param file_path: Path to file
+        :param algorithms: Iterable of hashlib names (e.g. ['sha256', 'sha512'])
+        :param progress: Optional callable receiving the number of bytes hashed so far
+        :param cancel_event: Optional threading.Event used to cancel hashing
+        :return: Dict of lowercase hash name -> digest bytes
+        """
+        def compute(path, names):
+            return hashing.hash_file_multi(path, names, progress=progress, cancel_event=cancel_event)
+
+        if self.digest_cache:
+            return self.digest_cache.get_or_compute_many(file_path, algorithms, compute)
+        return compute(file_path, algorithms)
+
+    def sign_file_with_checksums(self, file_path, private_key, hash_algorithm='SHA256',
+                                 checksum_algorithms=('sha256',), progress=None, cancel_event=None):
+        """
+        Sign a file and compute checksums from the same read of the file
+        :param checksum_algorithms: hashlib names of the checksums to return
+        :return: Tuple of (signature bytes, dict of hash name -> hex checksum)
+        """
+        hash_algo = self.hash_algorithms.get(hash_algorithm, self.hash_algorithms['SHA256'])
+        algorithms.resolve(private_key)
+
+        digests = self.file_digests(file_path, [hash_algo.name, *checksum_algorithms], progress, cancel_event)
+        signature = self.sign_digest(digests[hash_algo.name], private_key, hash_algorithm)
+        metrics.count('files_signed_total')
+
+        return signature, {name.lower(): digests[name.lower()].hex() for name in checksum_algorithms}
+
+    def verify_file_with_checksums(self, file_path, signature, public_key, hash_algorithm='SHA256',
+                                   checksum_algorithms=('sha256',), progress=None, cancel_event=None):
+        """
+        Verify a file signature and compute checksums from the same read of the file
+        :param checksum_algorithms: hashlib names of the checksums to return
+        :return: Tuple of (True if signature is valid, dict of hash name -> hex checksum)
+        """
+        hash_algo = self.hash_algorithms.get(hash_algorithm, self.hash_algorithms['SHA256'])
+        algorithms.resolve(public_key)
+
+        digests = self.file_digests(file_path, [hash_algo.name, *checksum_algorithms], progress, cancel_event)
+        checksums = {name.lower(): digests[name.lower()].hex() for name in checksum_algorithms}
+        try:
+            self._verify_digest(digests[hash_algo.name], signature, public_key, hash_algo)
+            metrics.count('files_verified_total', result='valid')
+            return True, checksums
+        except InvalidSignature:
+            metrics.count('files_verified_total', result='invalid')
+            return False, checksums
+
+    def sign_file(self, file_path, private_key, hash_algorithm='SHA256', progress=None, cancel_event=None):
+        """
+        Sign a file using private key (phases are recorded in modules.metrics)
         :param file_path: Path to file
         :param private_key: Private key object
         :param hash_algorithm: Hash algorithm to use
+        :param progress: Optional callable receiving the number of bytes hashed so far
+        :param cancel_event: Optional threading.Event used to cancel hashing
         :return: Signature bytes
         """
         # Choose hash algorithm
         hash_algo = self.hash_algorithms.get(hash_algorithm, self.hash_algorithms['SHA256'])
-        
-        # Calculate file hash
-        hasher = hashes.Hash(hash_algo)
-        with open(file_path, 'rb') as f:
-            # Read in chunks to handle large files
-            chunk = f.read(8192)
-            while chunk:
-                hasher.update(chunk)
-                chunk = f.read(8192)
-        
-        digest = hasher.finalize()
-        
+
+        algorithms.resolve(private_key)  # fail on unsupported keys before reading the file
+
+        # Calculate file hash (the file is read exactly once for every key type)
+        digest = self._hash_file(file_path, hash_algo, progress, cancel_event)
+
         # Sign the digest
-        if private_key.__class__.__name__ == 'RSAPrivateKey':
-            signature = private_key.sign(
-                digest,
-                padding.PSS(
-                    mgf=padding.MGF1(hash_algo),
-                    salt_length=padding.PSS.MAX_LENGTH
-                ),
-                utils.Prehashed(hash_algo)
-            )
-        elif private_key.__class__.__name__ == 'DSAPrivateKey':
-            # DSA doesn't support prehashed, so we need to sign whole file
-            with open(file_path, 'rb') as f:
-                content = f.read()
-            signature = private_key.sign(
-                content,
-                hash_algo
-            )
-        else:
-            raise ValueError("Unsupported key type")
-        
-        end_time = time.time()  # End timing
-        duration = end_time - start_time
-        print(f"Time taken to sign file with {private_key.__class__.__name__}: {duration:.4f} seconds")
+        signature = self.sign_digest(digest, private_key, hash_algorithm)
+        metrics.count('files_signed_total')
 
         return signature
-    
-    def verify_file_signature(self, file_path, signature, public_key, hash_algorithm='SHA256'):
-        start_time = time.time() 
+
+    def create_envelope(self, digest, signature, private_key, hash_algorithm, file_size):
+        """Wrap a signature with the metadata needed to verify it (see modules.envelope)"""
+        scheme = algorithms.resolve(private_key)
+        return SignatureEnvelope(
+            scheme.name, hash_algorithm, get_key_fingerprint(private_key), file_size, digest, signature,
+            scheme.padding_for(self.hash_algorithms[hash_algorithm])
+        )
+
+    def sign_file_envelope(self, file_path, private_key, hash_algorithm='SHA256', progress=None, cancel_event=None):
+        """
+        Sign a file and return a self-describing SignatureEnvelope
+        :param file_path: Path to file
+        :param private_key: Private key object
+        :param hash_algorithm: Hash algorithm to use
+        :param progress: Optional callable receiving the number of bytes hashed so far
+        :param cancel_event: Optional threading.Event used to cancel hashing
+        :return: SignatureEnvelope
+        """
+        if hash_algorithm not in self.hash_algorithms:
+            raise ValueError(f"Unsupported hash algorithm: {hash_algorithm}")
+        hash_algo = self.hash_algorithms[hash_algorithm]
+
+        algorithms.resolve(private_key)
+
+        file_size = os.path.getsize(file_path)
+        digest = self._hash_file(file_path, hash_algo, progress, cancel_event)
+        signature = self.sign_digest(digest, private_key, hash_algorithm)
+        metrics.count('files_signed_total')
+
+        return self.create_envelope(digest, signature, private_key, hash_algorithm, file_size)
+
+    def check_envelope(self, file_path, envelope, public_key=None, keyring=None):
+        """
+        Check a SignatureEnvelope without reading the file
+        Key, scheme, hash and file size are compared, then the signature over the
+        recorded digest is verified; only the file digest remains to be compared.
+        :param public_key: Public key object (default: looked up in keyring by the envelope's key ID)
+        :param keyring: Optional Keyring holding the signers' public keys
+        :return: True if the signature over the recorded digest is valid
+        :raises EnvelopeMismatch: if the envelope does not match the key or file
+        """
+        if keyring is not None:
+            public_key = keyring.find_public_key(envelope.key_id) or public_key
+        if public_key is None:
+            raise EnvelopeMismatch(f"Unknown key ID: {envelope.key_id}")
+
+        hash_algo = self.hash_algorithms.get(envelope.hash_algorithm)
+        if hash_algo is None:
+            raise EnvelopeMismatch(f"Unsupported hash algorithm: {envelope.hash_algorithm}")
+        if len(envelope.digest) != hash_algo.digest_size:
+            raise EnvelopeMismatch("Digest length does not match the hash algorithm")
+
+        envelope.check(
+            file_size=os.path.getsize(file_path),
+            scheme=algorithms.resolve(public_key).name,
+            key_id=get_key_fingerprint(public_key)
+        )
+
+        try:
+            self._verify_digest(envelope.digest, envelope.signature, public_key, hash_algo)
+            return True
+        except InvalidSignature:
+            return False
+
+    def verify_envelope(self, file_path, envelope, public_key=None, keyring=None, progress=None,
+                        cancel_event=None):
+        """
+        Verify a file against a SignatureEnvelope (mismatches are rejected before reading the file)
+        :param file_path: Path to file
+        :param envelope: SignatureEnvelope
+        :param public_key: Public key object (default: looked up in keyring by the envelope's key ID)
+        :param keyring: Optional Keyring holding the signers' public keys
+        :param progress: Optional callable receiving the number of bytes hashed so far
+        :param cancel_event: Optional threading.Event used to cancel hashing
+        :return: True if signature is valid, False otherwise
+        :raises EnvelopeMismatch: if the envelope does not match the key or file
+        """
+        if not self.check_envelope(file_path, envelope, public_key, keyring):
+            metrics.count('files_verified_total', result='invalid')
+            return False
+
+        hash_algo = self.hash_algorithms[envelope.hash_algorithm]
+        digest = self._hash_file(file_path, hash_algo, progress, cancel_event)
+        is_valid = hmac.compare_digest(digest, envelope.digest)
+        metrics.count('files_verified_total', result='valid' if is_valid else 'invalid')
+        return is_valid
+
+    def sign_file_chunked(self, file_path, private_key, hash_algorithm='SHA256',
+                          chunk_size=merkle.DEFAULT_CHUNK_SIZE, workers=None, progress=None, cancel_event=None):
+        """
+        Sign a file as a Merkle tree of chunks hashed in parallel (see modules.merkle)
+        :param file_path: Path to file
+        :param private_key: Private key object
+        :param hash_algorithm: Hash algorithm for chunks and tree nodes
+        :param chunk_size: Chunk size in bytes
+        :param workers: Hashing threads (default: CPU count)
+        :param progress: Optional callable receiving the number of bytes hashed so far
+        :param cancel_event: Optional threading.Event used to cancel hashing
+        :return: MerkleSignature
+        """
+        if hash_algorithm not in self.hash_algorithms:
+            raise ValueError(f"Unsupported hash algorithm: {hash_algorithm}")
+        algorithms.resolve(private_key)
+
+        file_size = os.path.getsize(file_path)
+        hasher = merkle.ChunkHasher(file_path, hash_algorithm, chunk_size, workers, progress, cancel_event)
+        with metrics.phase('hash', mode='chunked'):
+            hashes = hasher.hash_chunks(range(merkle.chunk_count(file_size, chunk_size)))
+        leaves = [hashes[i] for i in sorted(hashes)]
+
+        return self._sign_tree(file_path, private_key, hash_algorithm, chunk_size, file_size, leaves)
+
+    def resign_file_chunked(self, file_path, private_key, previous, changed_ranges=None, workers=None,
+                            progress=None, cancel_event=None):
+        """
+        Re-sign a modified file, re-hashing only the chunks that changed
+        :param file_path: Path to file
+        :param private_key: Private key object
+        :param previous: MerkleSignature of the previous version of the file
+        :param changed_ranges: Iterable of (offset, length) byte ranges written since the previous
+                               signature (None re-hashes every chunk). Growth or truncation is
+                               detected from the file size.
+        :param workers: Hashing threads (default: CPU count)
+        :return: New MerkleSignature
+        :raises EnvelopeMismatch: if previous is not a consistent tree signed by this key
+        """
+        self._check_previous_tree(previous, private_key)
+        chunk_size = previous.chunk_size
+        hash_algorithm = previous.envelope.hash_algorithm
+        old_size = previous.envelope.file_size
+        file_size = os.path.getsize(file_path)
+        count = merkle.chunk_count(file_size, chunk_size)
+
+        if changed_ranges is None:
+            dirty = set(range(count))
+        else:
+            dirty = set()
+            for offset, length in changed_ranges:
+                dirty.update(merkle.chunks_for_range(offset, length, chunk_size))
+            if file_size != old_size:
+                # The old and new last chunks changed length, new chunks were appended
+                dirty.add(merkle.chunk_count(old_size, chunk_size) - 1)
+                dirty.update(range(len(previous.leaves), count))
+                dirty.add(count - 1)
+            dirty = {i for i in dirty if i < count}
+
+        hasher = merkle.ChunkHasher(file_path, hash_algorithm, chunk_size, workers, progress, cancel_event)
+        with metrics.phase('hash', mode='chunked'):
+            hashes = hasher.hash_chunks(sorted(dirty))
+        leaves = [hashes[i] if i in hashes else previous.leaves[i] for i in range(count)]
+
+        return self._sign_tree(file_path, private_key, hash_algorithm, chunk_size, file_size, leaves)
+
+    def _check_previous_tree(self, previous, private_key):
+        """
+        Reused leaves are signed again without reading their chunks, so the previous
+        tree must be consistent and carry a valid signature from the same key
+        """
+        envelope = previous.envelope
+        hash_algo = self.hash_algorithms.get(envelope.hash_algorithm)
+        if hash_algo is None:
+            raise EnvelopeMismatch(f"Unsupported hash algorithm: {envelope.hash_algorithm}")
+        if previous.chunk_size <= 0 or any(len(leaf) != hash_algo.digest_size for leaf in previous.leaves):
+            raise EnvelopeMismatch("Previous signature does not match its chunk size or hash algorithm")
+        if not previous.check_leaves():
+            raise EnvelopeMismatch("Previous signature's leaves do not match its signed root")
+
+        public_key = private_key.public_key()
+        envelope.check(scheme=algorithms.resolve(public_key).name, key_id=get_key_fingerprint(public_key))
+        if not self.verify_digest(envelope.digest, envelope.signature, public_key, envelope.hash_algorithm):
+            raise EnvelopeMismatch("Previous signature is not valid")
+
+    def _sign_tree(self, file_path, private_key, hash_algorithm, chunk_size, file_size, leaves):
+        """Sign the Merkle root of the given leaves"""
+        root = merkle.merkle_root(leaves, hash_algorithm)
+        signature = self.sign_digest(root, private_key, hash_algorithm)
+        metrics.count('files_signed_total')
+        envelope = self.create_envelope(root, signature, private_key, hash_algorithm, file_size)
+        return merkle.MerkleSignature(envelope, chunk_size, leaves)
+
+    def verify_file_chunked(self, file_path, merkle_signature, public_key=None, keyring=None, offset=0,
+                            length=None, workers=None, progress=None, cancel_event=None):
+        """
+        Verify a chunked signature, optionally only over a byte range
+        The signed root and stored leaves are checked first; then only the chunks
+        covering [offset, offset + length) are re-hashed.
+        :param file_path: Path to file
+        :param merkle_signature: MerkleSignature
+        :param public_key: Public key object (default: looked up in keyring by key ID)
+        :param keyring: Optional Keyring holding the signers' public keys
+        :param offset: Start of the range to verify
+        :param length: Length of the range (None: whole file)
+        :param workers: Hashing threads (default: CPU count)
+        :return: True if the signature and the checked chunks are valid, False otherwise
+        :raises EnvelopeMismatch: if the signature does not match the key or file
+        """
+        envelope = merkle_signature.envelope
+        if not self.check_envelope(file_path, envelope, public_key, keyring) or not merkle_signature.check_leaves():
+            metrics.count('files_verified_total', result='invalid')
+            return False
+
+        chunk_size = merkle_signature.chunk_size
+        if length is None:
+            indexes = range(len(merkle_signature.leaves))
+        else:
+            if offset < 0 or offset + length > envelope.file_size:
+                raise ValueError("Range is outside the file")
+            indexes = merkle.chunks_for_range(offset, length, chunk_size)
+
+        hasher = merkle.ChunkHasher(file_path, envelope.hash_algorithm, chunk_size, workers, progress, cancel_event)
+        with metrics.phase('hash', mode='chunked'):
+            hashes = hasher.hash_chunks(indexes)
+        is_valid = all(hmac.compare_digest(digest, merkle_signature.leaves[i]) for i, digest in hashes.items())
+        metrics.count('files_verified_total', result='valid' if is_valid else 'invalid')
+        return is_valid
+
+    def verify_file_signature(self, file_path, signature, public_key, hash_algorithm='SHA256',
+                              progress=None, cancel_event=None, keyring=None, key_id=None):
         """
         Verify a file signature using public key
         :param file_path: Path to file
         :param signature: Signature bytes
-        :param public_key: Public key object
+        :param public_key: Public key object (may be None when keyring and key_id are given; used
+                           when key_id is not in the keyring)
         :param hash_algorithm: Hash algorithm used
+        :param progress: Optional callable receiving the number of bytes hashed so far
+        :param cancel_event: Optional threading.Event used to cancel hashing
+        :param keyring: Optional Keyring to pick the signer's public key from
+        :param key_id: Fingerprint of the signing key (see load_key_id)
         :return: True if signature is valid, False otherwise
         """
         hash_algo = self.hash_algorithms.get(hash_algorithm, self.hash_algorithms['SHA256'])
-        
-        try:
-            if public_key.__class__.__name__ == 'RSAPublicKey':
-                # Calculate file hash
-                hasher = hashes.Hash(hash_algo)
-                with open(file_path, 'rb') as f:
-                    chunk = f.read(8192)
-                    while chunk:
-                        hasher.update(chunk)
-                        chunk = f.read(8192)
-                
-                digest = hasher.finalize()
-                
-                # Verify the signature
-                public_key.verify(
-                    signature,
-                    digest,
-                    padding.PSS(
-                        mgf=padding.MGF1(hash_algo),
-                        salt_length=padding.PSS.MAX_LENGTH
-                    ),
-                    utils.Prehashed(hash_algo)
-                )
-            elif public_key.__class__.__name__ == 'DSAPublicKey':
-                # DSA doesn't support prehashed, so we need to verify whole file
-                with open(file_path, 'rb') as f:
-                    content = f.read()
-                public_key.verify(
-                    signature,
-                    content,
-                    hash_algo
-                )
-            else:
-                raise ValueError("Unsupported key type")
-            
-            end_time = time.time()  # End timing
-            duration = end_time - start_time
-            print(f"Time taken to verify signature with {public_key.__class__.__name__}: {duration:.4f} seconds")
 
+        if keyring is not None and key_id:
+            # O(1) lookup of the signer's key; an unknown ID falls back to public_key as in check_envelope
+            found = keyring.find_public_key(key_id)
+            if found is None and public_key is None:
+                raise ValueError(f"Unknown key ID: {key_id}")
+            public_key = found or public_key
+        if public_key is None:
+            raise ValueError("No public key to verify with")
+
+        algorithms.resolve(public_key)  # fail on unsupported keys before reading the file
+
+        digest = self._hash_file(file_path, hash_algo, progress, cancel_event)
+
+        try:
+            self._verify_digest(digest, signature, public_key, hash_algo)
+            metrics.count('files_verified_total', result='valid')
             return True
         except InvalidSignature:
+            metrics.count('files_verified_total', result='invalid')
             return False
-        
 
+    def save_signature(self, signature, filename, key_id=None, signature_format='binary'):
+        """
+        Save signature to file
+        :param signature: Signature bytes, SignatureEnvelope or MerkleSignature
+        :param key_id: Optional signer key fingerprint of a raw signature, written to <filename>.keyid
+        :param signature_format: 'binary' or 'json' for envelopes
+        """
+        if isinstance(signature, merkle.MerkleSignature):
+            data = signature.to_bytes()
+            key_id = None
+        elif isinstance(signature, SignatureEnvelope):
+            data = signature.to_json() if signature_format == 'json' else signature.to_bytes()
+            key_id = None  # the envelope already carries it
+        else:
+            data = signature
 
-    
-    def save_signature(self, signature, filename):
-        """Save signature to file"""
-        with open(filename, 'wb') as f:
-            f.write(signature)
+        with metrics.phase('signature_write'):
+            with open(filename, 'wb') as f:
+                f.write(data)
+            if key_id:
+                with open(filename + KEY_ID_SUFFIX, 'w', encoding='ascii') as f:
+                    f.write(key_id + '\n')
     
     def load_signature(self, filename):
-        """Load signature from file"""
+        """Load signature bytes from file (unwrapping an envelope)"""
+        with open(filename, 'rb') as f:
+            data = f.read()
+        envelope = parse_envelope(data)
+        return envelope.signature if envelope is not None else data
+
+    def load_merkle_signature(self, filename):
+        """Load a MerkleSignature from file, or None if it holds another kind of signature"""
         with open(filename, 'rb') as f:
-            return f.read()
+            data = f.read()
+        return merkle.MerkleSignature.from_bytes(data) if merkle.is_merkle_signature(data) else None
+
+    def load_envelope(self, filename):
+        """Load a SignatureEnvelope from file, or None if it holds a raw signature"""
+        with open(filename, 'rb') as f:
+            return parse_envelope(f.read())
+    
+    def load_key_id(self, filename):
+        """Return the signer key fingerprint stored next to a signature, or None"""
+        try:
+            with open(filename + KEY_ID_SUFFIX, 'r', encoding='ascii') as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
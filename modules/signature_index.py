@@ -0,0 +1,176 @@
+"""
+Local index of signed artifacts
+
+A signature is recorded once it has been saved, with the content digest,
+path, size, hash algorithm, signer key fingerprint, signature path and time.
+"Has this exact content been signed, and by whom?" is then one indexed
+lookup by digest, instead of re-hashing files and trying candidate .sig
+files:
+
+    envelope = tool.sign_file_envelope('release.tar.gz', private_key)
+    tool.save_signature(envelope, 'release.tar.gz.sig')
+    index.record('release.tar.gz', envelope, 'release.tar.gz.sig')
+
+    for record in index.find_file('release.tar.gz'):
+        print(record["key_fingerprint"], record["signature_path"])
+
+BatchSigner and ManifestSigner record what they saved when given an index;
+the GUI sign tab records after the user saves. Stream signatures
+(StreamSigner, AsyncDigitalSignature.sign_stream_envelope) have no file, so
+callers that save them call record() with a name of their choice. Chunked
+(Merkle) signatures are excluded: they sign a tree root, not the content
+digest, so a lookup by content could never match them.
+
+Records are never removed when a file changes: the old digest stays signed.
+"""
+from modules import hashing
+from modules.envelope import SignatureEnvelope
+import os
+import sqlite3
+import threading
+import time
+
+_COLUMNS = ("digest", "algorithm", "path", "size", "key_fingerprint", "signature_path", "signed_at")
+
+
+class SignatureIndex:
+    def __init__(self, path=None):
+        """
+        On-disk index of signatures keyed by content digest
+        :param path: SQLite database file (default: ~/.digital_signature/signature_index.sqlite3)
+        """
+        self.path = path or self.default_path()
+        self.lock = threading.Lock()
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+
+        self.connection = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS signatures (
+                digest BLOB NOT NULL,
+                algorithm TEXT NOT NULL,
+                path TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                key_fingerprint TEXT NOT NULL,
+                signature_path TEXT,
+                signed_at REAL NOT NULL,
+                PRIMARY KEY (path, algorithm, digest, key_fingerprint)
+            )
+            """
+        )
+        self.connection.execute("CREATE INDEX IF NOT EXISTS signatures_digest ON signatures (digest, algorithm)")
+        self.connection.execute("CREATE INDEX IF NOT EXISTS signatures_key ON signatures (key_fingerprint, signed_at)")
+        self.connection.commit()
+
+    @staticmethod
+    def default_path():
+        """Default index location in the user's home directory"""
+        return os.path.join(os.path.expanduser("~"), ".digital_signature", "signature_index.sqlite3")
+
+    @staticmethod
+    def _row(file_path, digest, algorithm, key_fingerprint, size, signature_path=None, signed_at=None):
+        return (
+            bytes(digest), algorithm.lower(), os.path.abspath(file_path), size, key_fingerprint.lower(),
+            os.path.abspath(signature_path) if signature_path else None,
+            time.time() if signed_at is None else signed_at
+        )
+
+    def add(self, file_path, digest, algorithm, key_fingerprint, size, signature_path=None, signed_at=None):
+        """
+        Record one signature (re-signing the same content with the same key updates the record)
+        :param file_path: Path of the signed file
+        :param digest: Digest bytes of the file contents
+        :param algorithm: Hash algorithm name (e.g. 'SHA256')
+        :param key_fingerprint: Signer key ID (see utils.get_key_fingerprint)
+        :param size: File size in bytes
+        :param signature_path: Where the signature was saved, if known
+        :param signed_at: Unix time (default: now)
+        """
+        self.add_many([(file_path, digest, algorithm, key_fingerprint, size, signature_path, signed_at)])
+
+    def record(self, file_path, envelope, signature_path, signed_at=None):
+        """
+        Record a saved signature envelope
+        :param file_path: Path (or name) of the signed content
+        :param envelope: SignatureEnvelope that was saved
+        :param signature_path: Where it was saved
+        :raises ValueError: for Merkle signatures (see module docstring)
+        """
+        if not isinstance(envelope, SignatureEnvelope):
+            raise ValueError("Only signature envelopes can be indexed")
+        self.add(file_path, envelope.digest, envelope.hash_algorithm, envelope.key_id, envelope.file_size,
+                 signature_path, signed_at)
+
+    def add_many(self, records):
+        """
+        Record many signatures in one transaction
+        :param records: Iterable of tuples with the arguments of add()
+        """
+        rows = [self._row(*record) for record in records]
+        if not rows:
+            return
+        with self.lock:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO signatures (digest, algorithm, path, size, key_fingerprint, "
+                "signature_path, signed_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            self.connection.commit()
+
+    def _select(self, where, params):
+        with self.lock:
+            rows = self.connection.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM signatures WHERE {where} ORDER BY signed_at DESC",
+                params
+            ).fetchall()
+        return [dict(zip(_COLUMNS, (bytes(row[0]),) + tuple(row[1:]))) for row in rows]
+
+    def find_digest(self, digest, algorithm=None):
+        """
+        Look up signatures of some content
+        :param digest: Digest bytes (or hex string)
+        :param algorithm: Hash algorithm name (default: any)
+        :return: List of record dicts, newest first
+        """
+        if isinstance(digest, str):
+            digest = bytes.fromhex(digest)
+        if algorithm is None:
+            return self._select("digest = ?", (digest,))
+        return self._select("digest = ? AND algorithm = ?", (digest, algorithm.lower()))
+
+    def find_file(self, file_path, algorithm='SHA256', digest_cache=None):
+        """
+        Hash a file once and look up signatures of its current contents
+        :param file_path: Path to file
+        :param algorithm: Hash algorithm name the signatures were made with
+        :param digest_cache: Optional DigestCache consulted before reading the file
+        :return: List of record dicts, newest first
+        """
+        algorithm = algorithm.lower()
+        if digest_cache:
+            digest = digest_cache.get_or_compute(file_path, algorithm, lambda path: hashing.hash_file(path, algorithm))
+        else:
+            digest = hashing.hash_file(file_path, algorithm)
+        return self.find_digest(digest, algorithm)
+
+    def find_key(self, key_fingerprint):
+        """
+        List everything a key has signed
+        :param key_fingerprint: Signer key ID
+        :return: List of record dicts, newest first
+        """
+        return self._select("key_fingerprint = ?", (key_fingerprint.strip().lower(),))
+
+    def clear(self):
+        """Remove every record"""
+        with self.lock:
+            self.connection.execute("DELETE FROM signatures")
+            self.connection.commit()
+
+    def close(self):
+        """Close the underlying database"""
+        with self.lock:
+            self.connection.close()
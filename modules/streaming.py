@@ -0,0 +1,157 @@
+"""
+Incremental signing and verification of byte streams
+
+StreamSigner and StreamVerifier hash data as it is fed to them with
+update() and sign or verify the digest (Prehashed) in finalize(), so the
+whole message never has to be in memory or on disk. Signatures are identical
+to DigitalSignature.sign_file over the same bytes.
+
+    signer = StreamSigner(private_key, 'SHA256')
+    tar = subprocess.Popen(['tar', 'c', 'release/'], stdout=subprocess.PIPE)
+    signer.update_from(tar.stdout)
+    signature = signer.finalize()
+
+    verifier = StreamVerifier(public_key, signature)
+    verifier.update_from(sock)
+    ok = verifier.finalize()
+"""
+from modules import algorithms, hashing
+from modules.envelope import SignatureEnvelope
+from modules.signature import DigitalSignature
+from modules.utils import get_key_fingerprint
+import hmac
+
+
+class _StreamHasher:
+    def __init__(self, hash_algorithm, signature_tool):
+        self.signature_tool = signature_tool or DigitalSignature()
+        if hash_algorithm not in self.signature_tool.hash_algorithms:
+            raise ValueError(f"Unsupported hash algorithm: {hash_algorithm}")
+        self.hash_algorithm = hash_algorithm
+        self.hasher = hashing.new_hasher(self.signature_tool.hash_algorithms[hash_algorithm].name)
+        self.bytes_processed = 0
+        self.finalized = False
+
+    def update(self, data):
+        """
+        Feed the next chunk of data
+        :param data: bytes-like object
+        :return: self
+        """
+        if self.finalized:
+            raise ValueError("Stream already finalized")
+        self.hasher.update(data)
+        self.bytes_processed += len(data)
+        return self
+
+    def update_from(self, source, buffer_size=None):
+        """
+        Feed everything from a source until it is exhausted
+        :param source: Binary file object or pipe (readinto/read), socket (recv_into),
+                       or an iterable/generator of bytes-like chunks
+        :param buffer_size: Read buffer size (default: hashing.DEFAULT_BUFFER_SIZE)
+        :return: Number of bytes read from the source
+        """
+        start = self.bytes_processed
+
+        if hasattr(source, 'readinto') or hasattr(source, 'recv_into'):
+            read_into = source.readinto if hasattr(source, 'readinto') else source.recv_into
+            buffer = bytearray(buffer_size or hashing.DEFAULT_BUFFER_SIZE)
+            view = memoryview(buffer)
+            while True:
+                n = read_into(buffer)
+                if not n:
+                    break
+                self.update(view[:n])
+        elif hasattr(source, 'read'):
+            size = buffer_size or hashing.DEFAULT_BUFFER_SIZE
+            while True:
+                data = source.read(size)
+                if not data:
+                    break
+                self.update(data)
+        else:
+            for chunk in source:
+                self.update(chunk)
+
+        return self.bytes_processed - start
+
+    def wrap(self, chunks):
+        """
+        Pass chunks through while hashing them (for pipelines that also consume the data)
+        :param chunks: Iterable of bytes-like chunks
+        :return: Generator yielding the same chunks
+        """
+        for chunk in chunks:
+            self.update(chunk)
+            yield chunk
+
+    def write(self, data):
+        """File-like alias of update(), so the hasher can be a write target"""
+        self.update(data)
+        return len(data)
+
+    def _digest(self):
+        if self.finalized:
+            raise ValueError("Stream already finalized")
+        self.finalized = True
+        return self.hasher.digest()
+
+
+class StreamSigner(_StreamHasher):
+    def __init__(self, private_key, hash_algorithm='SHA256', signature_tool=None):
+        """
+        :param private_key: Private key object
+        :param hash_algorithm: Hash algorithm name (see DigitalSignature.hash_algorithms)
+        :param signature_tool: DigitalSignature performing the key operation (default: a new one)
+        """
+        super().__init__(hash_algorithm, signature_tool)
+        self.private_key = private_key
+
+    def finalize(self, envelope=False):
+        """
+        Sign everything fed so far
+        :param envelope: Return a SignatureEnvelope instead of raw signature bytes
+        :return: Signature bytes or SignatureEnvelope
+        """
+        digest = self._digest()
+        signature = self.signature_tool.sign_digest(digest, self.private_key, self.hash_algorithm)
+        if envelope:
+            return self.signature_tool.create_envelope(
+                digest, signature, self.private_key, self.hash_algorithm, self.bytes_processed
+            )
+        return signature
+
+
+class StreamVerifier(_StreamHasher):
+    def __init__(self, public_key, signature, hash_algorithm='SHA256', signature_tool=None):
+        """
+        :param public_key: Public key object
+        :param signature: Signature bytes or SignatureEnvelope (whose hash algorithm then applies)
+        :param hash_algorithm: Hash algorithm name for raw signatures
+        :param signature_tool: DigitalSignature performing the key operation (default: a new one)
+        """
+        self.envelope = signature if isinstance(signature, SignatureEnvelope) else None
+        if self.envelope is not None:
+            hash_algorithm = self.envelope.hash_algorithm
+            signature = self.envelope.signature
+        super().__init__(hash_algorithm, signature_tool)
+        self.public_key = public_key
+        self.signature = signature
+
+    def finalize(self):
+        """
+        Verify everything fed so far against the signature
+        :return: True if signature is valid, False otherwise
+        :raises EnvelopeMismatch: if the envelope names another key or scheme (as check_envelope)
+        """
+        digest = self._digest()
+        if self.envelope is not None:
+            self.envelope.check(
+                scheme=algorithms.resolve(self.public_key).name,
+                key_id=get_key_fingerprint(self.public_key)
+            )
+            if (self.bytes_processed != self.envelope.file_size
+                    or not hmac.compare_digest(digest, self.envelope.digest)):
+                return False
+        return self.signature_tool.verify_digest(digest, self.signature, self.public_key, self.hash_algorithm)
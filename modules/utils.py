@@ -1,26 +1,55 @@
 import os
 import base64
 import hashlib
+from modules import hashing
 
-def get_file_hash(file_path, algorithm='sha256'):
-    """Calculate hash of a file"""
-    hash_algorithms = {
-        'sha256': hashlib.sha256(),
-        'sha384': hashlib.sha384(),
-        'sha512': hashlib.sha512(),
-        'md5': hashlib.md5()  # Not recommended for security purposes
-    }
-    
-    hasher = hash_algorithms.get(algorithm.lower(), hashlib.sha256())
-    
-    with open(file_path, 'rb') as f:
-        # Read in chunks to handle large files
-        chunk = f.read(8192)
-        while chunk:
-            hasher.update(chunk)
-            chunk = f.read(8192)
+# md5 is kept for legacy checksums only, it is not recommended for security purposes
+CHECKSUM_ALGORITHMS = ('sha256', 'sha384', 'sha512', 'sha3-256', 'sha3-512', 'blake2b', 'blake2s', 'md5')
+
+def get_file_hash(file_path, algorithm='sha256', digest_cache=None):
+    """
+    Calculate hash of a file
+    :param file_path: Path to file
+    :param algorithm: Hash algorithm name
+    :param digest_cache: Optional DigestCache consulted before reading the file
+    :return: Hex digest string
+    """
+    algorithm = algorithm.lower()
+    if algorithm not in CHECKSUM_ALGORITHMS:
+        algorithm = 'sha256'
+    return get_file_hashes(file_path, [algorithm], digest_cache)[algorithm]
+
+def get_file_hashes(file_path, algorithms, digest_cache=None):
+    """
+    Calculate several hashes of a file, reading it only once
+    :param file_path: Path to file
+    :param algorithms: Iterable of hash algorithm names
+    :param digest_cache: Optional DigestCache consulted before reading the file
+    :return: Dict of lowercase algorithm name -> hex digest string
+    """
+    def compute(path, names):
+        return hashing.hash_file_multi(path, names)
     
-    return hasher.hexdigest()
+    if digest_cache:
+        digests = digest_cache.get_or_compute_many(file_path, algorithms, compute)
+    else:
+        digests = compute(file_path, algorithms)
+    return {name: digest.hex() for name, digest in digests.items()}
+
+def get_key_fingerprint(key):
+    """
+    SHA-256 fingerprint of a key's SubjectPublicKeyInfo (used as key ID)
+    :param key: Public or private key object
+    :return: Lowercase hex string
+    """
+    from cryptography.hazmat.primitives import serialization
+
+    public_key = key.public_key() if hasattr(key, 'public_key') else key
+    spki = public_key.public_bytes(
+        encoding=serialization.Encoding.DER,
+        format=serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+    return hashlib.sha256(spki).hexdigest()
 
 def ensure_directory_exists(path):
     """Ensure that directory exists, create if not"""
@@ -0,0 +1,63 @@
+import argparse
+import sys
+import time
+from modules.signature_index import SignatureIndex
+
+
+def print_records(records):
+    for record in records:
+        signed_at = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(record["signed_at"]))
+        signature = record["signature_path"] or "-"
+        print(f"      {signed_at}  khóa {record['key_fingerprint'][:16]}  {record['algorithm']}  "
+              f"{record['size']} byte  {record['path']}  (chữ ký: {signature})")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tra cứu chỉ mục chữ ký: nội dung này đã được ký chưa, bởi khóa nào")
+    parser.add_argument("files", nargs="*", help="Tệp cần tra cứu (hash một lần, không cần tệp .sig)")
+    parser.add_argument("--digest", action="append", default=[], help="Tra cứu theo hash (hex), lặp lại được")
+    parser.add_argument("--key", action="append", default=[], help="Liệt kê mọi thứ một khóa đã ký (mã khóa)")
+    parser.add_argument("--hash", default="SHA256", help="Thuật toán hash khi tra cứu tệp (SHA256, SHA384, SHA512, SHA3-256, SHA3-512, BLAKE2b, BLAKE2s)")
+    parser.add_argument("--index", default=SignatureIndex.default_path(), help="Tệp chỉ mục chữ ký")
+    args = parser.parse_args(argv)
+
+    if not args.files and not args.digest and not args.key:
+        parser.error("cần ít nhất một tệp, --digest hoặc --key")
+    for digest in args.digest:
+        try:
+            bytes.fromhex(digest)
+        except ValueError:
+            parser.error(f"--digest không phải chuỗi hex hợp lệ: {digest}")
+
+    index = SignatureIndex(args.index)
+    unsigned = 0
+    try:
+        for path in args.files:
+            try:
+                records = index.find_file(path, args.hash)
+            except (OSError, ValueError) as e:
+                print(f"LỖI     {path}: {e}", file=sys.stderr)
+                unsigned += 1
+                continue
+            print(f"{'ĐÃ KÝ' if records else 'CHƯA KÝ':<8}{path}")
+            print_records(records)
+            unsigned += not records
+
+        for digest in args.digest:
+            records = index.find_digest(digest)
+            print(f"{'ĐÃ KÝ' if records else 'CHƯA KÝ':<8}{digest}")
+            print_records(records)
+            unsigned += not records
+
+        for key_id in args.key:
+            records = index.find_key(key_id)
+            print(f"KHÓA    {key_id}: {len(records)} chữ ký")
+            print_records(records)
+    finally:
+        index.close()
+
+    return 0 if unsigned == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+import argparse
+import json
+import os
+import signal
+import sys
+import threading
+from modules.daemon import SigningClient, SigningServer, SigningService
+
+DEFAULT_SOCKET = os.path.join(os.path.expanduser("~"), ".digital_signature", "signing.sock")
+
+
+def parse_key_argument(value):
+    """'ten=duong_dan.pem' or just 'duong_dan.pem' (name taken from the file name)"""
+    if "=" in value:
+        name, path = value.split("=", 1)
+    else:
+        path = value
+        name = os.path.splitext(os.path.basename(path))[0]
+    return name, path
+
+
+def serve(args):
+    from batch_sign import load_private_key
+
+    keys = {}
+    for value in args.key:
+        name, path = parse_key_argument(value)
+        keys[name] = load_private_key(path, args.password)
+        print(f"Đã nạp khóa '{name}' từ {path}", file=sys.stderr)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.socket)), mode=0o700, exist_ok=True)
+    service = SigningService(keys, workers=args.workers, max_batch=args.max_batch)
+    try:
+        server = SigningServer(args.socket, service)
+    except (RuntimeError, FileExistsError) as e:
+        service.shutdown()
+        print(f"Không thể khởi động máy chủ ký: {e}", file=sys.stderr)
+        return 1
+
+    def stop(signum, frame):
+        threading.Thread(target=server.shutdown).start()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    print(f"Máy chủ ký đang chạy tại {args.socket}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        service.shutdown()
+    return 0
+
+
+def sign(args):
+    from modules.signature import DigitalSignature
+
+    signature_tool = DigitalSignature()
+    with SigningClient(args.socket) as client:
+        for path in args.files:
+            signature, key_id = client.sign_file(path, args.key_name, args.hash)
+            signature_tool.save_signature(signature, path + ".sig", key_id=key_id)
+            print(f"OK    {path} -> {path}.sig")
+    return 0
+
+
+def stats(args):
+    with SigningClient(args.socket) as client:
+        print(json.dumps(client.stats(), indent=2))
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Máy chủ ký giữ khóa trong bộ nhớ, phục vụ qua Unix socket")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET, help="Đường dẫn Unix socket")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = commands.add_parser("serve", help="Chạy máy chủ ký")
+    serve_parser.add_argument("--key", action="append", required=True,
+                              help="Khóa riêng (PEM), dạng ten=duong_dan.pem (lặp lại được)")
+    serve_parser.add_argument("--password", help="Mật khẩu khóa riêng")
+    serve_parser.add_argument("--workers", type=int, help="Số luồng xử lý")
+    serve_parser.add_argument("--max-batch", type=int, default=64, help="Số yêu cầu tối đa mỗi lô")
+    serve_parser.set_defaults(func=serve)
+
+    sign_parser = commands.add_parser("sign", help="Ký tệp qua máy chủ ký (hash được tính cục bộ)")
+    sign_parser.add_argument("files", nargs="+", help="Tệp cần ký")
+    sign_parser.add_argument("--key-name", help="Tên khóa trên máy chủ (mặc định: khóa đầu tiên)")
+    sign_parser.add_argument("--hash", default="SHA256", help="Thuật toán hash (SHA256, SHA384, SHA512, SHA3-256, SHA3-512, BLAKE2b, BLAKE2s)")
+    sign_parser.set_defaults(func=sign)
+
+    stats_parser = commands.add_parser("stats", help="Độ dài hàng đợi, kích thước lô và độ trễ")
+    stats_parser.set_defaults(func=stats)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
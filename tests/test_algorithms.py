@@ -0,0 +1,96 @@
+import os
+import shutil
+import tempfile
+import unittest
+from cryptography.exceptions import InvalidSignature
+from modules import algorithms
+from modules.key_generator import KeyGenerator
+from modules.signature import DigitalSignature
+
+KEY_TYPES = (
+    ('RSA', 1024, 'RSA-PSS'),
+    ('DSA', 1024, 'DSA'),
+    ('ECDSA P-256', None, 'ECDSA'),
+    ('Ed25519', None, 'Ed25519'),
+    ('Ed448', None, 'Ed448'),
+)
+
+
+class SchemeRegistryTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.keys = {
+            algorithm: KeyGenerator().generate_keys(algorithm, key_size or 2048)
+            for algorithm, key_size, _ in KEY_TYPES
+        }
+
+    def test_every_key_type_resolves(self):
+        for algorithm, _, scheme_name in KEY_TYPES:
+            private_key, public_key = self.keys[algorithm]
+            with self.subTest(algorithm=algorithm):
+                self.assertEqual(algorithms.resolve(private_key).name, scheme_name)
+                self.assertIs(algorithms.resolve(public_key), algorithms.resolve(private_key))
+                self.assertIs(algorithms.get_scheme(scheme_name), algorithms.resolve(public_key))
+
+    def test_unknown_keys_and_names_are_rejected(self):
+        with self.assertRaises(ValueError):
+            algorithms.resolve(object())
+        with self.assertRaises(ValueError):
+            algorithms.get_scheme('ROT13')
+
+    def test_later_registration_takes_precedence(self):
+        saved = list(algorithms._schemes)
+
+        def restore():
+            algorithms._schemes[:] = saved
+            algorithms._schemes_by_key_type.clear()
+        self.addCleanup(restore)
+
+        private_key = self.keys['Ed25519'][0]
+        algorithms.resolve(private_key)  # populate the per-class cache first
+
+        class Override(algorithms.Ed25519Scheme):
+            name = 'Ed25519-override'
+        override = algorithms.register(Override())
+        self.assertIs(algorithms.resolve(private_key), override)
+
+    def test_message_and_digest_round_trip(self):
+        tool = DigitalSignature()
+        for algorithm, _, _ in KEY_TYPES:
+            private_key, public_key = self.keys[algorithm]
+            for hash_algorithm in ('SHA256', 'SHA3-512', 'BLAKE2b', 'BLAKE2s'):
+                with self.subTest(algorithm=algorithm, hash_algorithm=hash_algorithm):
+                    signature = tool.sign_message(b'message', private_key, hash_algorithm)
+                    self.assertTrue(tool.verify_signature(b'message', signature, public_key, hash_algorithm))
+                    self.assertFalse(tool.verify_signature(b'messagE', signature, public_key, hash_algorithm))
+
+    def test_rsa_blake2_falls_back_to_pss_over_the_digest(self):
+        scheme = algorithms.get_scheme('RSA-PSS')
+        tool = DigitalSignature()
+        private_key, public_key = self.keys['RSA']
+        blake2b = tool.hash_algorithms['BLAKE2b']
+        self.assertEqual(scheme.padding_for(blake2b), 'PSS-MGF1-MAXSALT-SHA512-OVER-DIGEST')
+        self.assertEqual(scheme.padding_for(tool.hash_algorithms['SHA256']), 'PSS-MGF1-MAXSALT')
+
+        # The message path hashes with BLAKE2b and signs that digest, so both paths interoperate
+        digest = scheme._digest(b'payload', blake2b)
+        signature = scheme.sign_message(private_key, b'payload', blake2b)
+        scheme.verify_digest(public_key, signature, digest, blake2b)
+        with self.assertRaises(InvalidSignature):
+            scheme.verify_digest(public_key, signature, bytes(len(digest)), blake2b)
+
+    def test_rsa_blake2_file_envelope(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        file_path = os.path.join(directory, 'data.bin')
+        with open(file_path, 'wb') as f:
+            f.write(os.urandom(20000))
+        tool = DigitalSignature()
+        private_key, public_key = self.keys['RSA']
+        envelope = tool.sign_file_envelope(file_path, private_key, 'BLAKE2s')
+        self.assertTrue(envelope.padding.endswith('-OVER-DIGEST'))
+        self.assertTrue(tool.verify_envelope(file_path, envelope, public_key))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import asyncio
+import os
+import shutil
+import tempfile
+import unittest
+from modules.async_signature import INLINE_UPDATE_LIMIT, AsyncDigitalSignature
+from modules.key_generator import KeyGenerator
+from modules.signature import DigitalSignature
+
+
+async def chunks_of(data, size):
+    for i in range(0, len(data), size):
+        await asyncio.sleep(0)
+        yield data[i:i + size]
+
+
+class AsyncSignatureTest(unittest.IsolatedAsyncioTestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.private_key, cls.public_key = KeyGenerator().generate_keys('Ed25519')
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        # Larger than INLINE_UPDATE_LIMIT so big chunks go through the executor
+        self.data = os.urandom(3 * INLINE_UPDATE_LIMIT + 123)
+        self.file_path = self.write('data.bin', self.data)
+        self.tool = DigitalSignature()
+        self.signer = AsyncDigitalSignature(self.tool, max_concurrency=2)
+
+    def write(self, name, data):
+        path = os.path.join(self.directory, name)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+
+    async def test_stream_round_trip_matches_file_signature(self):
+        for size in (1000, INLINE_UPDATE_LIMIT + 1):
+            for hash_algorithm in ('SHA256', 'SHA3-256', 'BLAKE2b'):
+                with self.subTest(size=size, hash_algorithm=hash_algorithm):
+                    signature = await self.signer.sign_stream(
+                        chunks_of(self.data, size), self.private_key, hash_algorithm
+                    )
+                    self.assertTrue(self.tool.verify_file_signature(
+                        self.file_path, signature, self.public_key, hash_algorithm
+                    ))
+                    self.assertTrue(await self.signer.verify_stream(
+                        chunks_of(self.data, size), signature, self.public_key, hash_algorithm
+                    ))
+                    self.assertFalse(await self.signer.verify_stream(
+                        chunks_of(self.data[:-1], size), signature, self.public_key, hash_algorithm
+                    ))
+
+    async def test_stream_envelope(self):
+        envelope = await self.signer.sign_stream_envelope(
+            chunks_of(self.data, 4096), self.private_key, 'SHA512'
+        )
+        self.assertEqual(envelope.file_size, len(self.data))
+        self.assertTrue(self.tool.verify_envelope(self.file_path, envelope, self.public_key))
+
+    async def test_unknown_hash_algorithm_is_rejected_before_reading(self):
+        read = []
+
+        async def chunks():
+            read.append(True)
+            yield self.data
+
+        with self.assertRaises(ValueError):
+            await self.signer.sign_stream_envelope(chunks(), self.private_key, 'MD5')
+        self.assertEqual(read, [])
+
+    async def test_sign_and_verify_files(self):
+        other_path = self.write('other.bin', os.urandom(5000))
+        missing_path = os.path.join(self.directory, 'missing.bin')
+        signatures = await self.signer.sign_files([self.file_path, missing_path, other_path], self.private_key)
+        self.assertIsInstance(signatures[1], OSError)
+        results = await self.signer.verify_files(
+            [(self.file_path, signatures[0]), (other_path, signatures[2]), (other_path, signatures[0])],
+            self.public_key
+        )
+        self.assertEqual(results, [True, True, False])
+
+    async def test_message_round_trip(self):
+        signature = await self.signer.sign_message(b'message', self.private_key)
+        self.assertTrue(await self.signer.verify_signature(b'message', signature, self.public_key))
+        self.assertFalse(await self.signer.verify_signature(b'messagE', signature, self.public_key))
+
+
+if __name__ == '__main__':
+    unittest.main()
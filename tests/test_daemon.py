@@ -0,0 +1,143 @@
+import os
+import shutil
+import socket
+import stat
+import struct
+import tempfile
+import threading
+import unittest
+from modules import hashing
+from modules.daemon import SigningClient, SigningServer, SigningService, recv_message, remove_stale_socket, send_message
+from modules.key_generator import KeyGenerator
+from modules.signature import DigitalSignature
+from modules.utils import get_key_fingerprint
+
+
+class SigningDaemonTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.keys = {
+            'release': KeyGenerator().generate_keys('Ed25519')[0],
+            'nightly': KeyGenerator().generate_keys('ECDSA P-256')[0],
+        }
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.socket_path = os.path.join(self.directory, 'signing.sock')
+        self.service = SigningService(self.keys, workers=2)
+        self.server = SigningServer(self.socket_path, self.service)
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+
+        def stop():
+            self.server.shutdown()
+            self.server.server_close()
+            thread.join()
+            self.service.shutdown()
+        self.addCleanup(stop)
+
+        self.file_path = os.path.join(self.directory, 'data.bin')
+        with open(self.file_path, 'wb') as f:
+            f.write(os.urandom(20000))
+
+    def client(self):
+        client = SigningClient(self.socket_path, timeout=10)
+        self.addCleanup(client.close)
+        return client
+
+    def test_keys(self):
+        self.assertEqual(self.client().keys(), {
+            name: get_key_fingerprint(private_key) for name, private_key in self.keys.items()
+        })
+
+    def test_sign_and_verify_round_trip(self):
+        client = self.client()
+        tool = DigitalSignature()
+        for key, hash_algorithm in (('release', 'SHA256'), ('nightly', 'SHA3-256'), (None, 'BLAKE2b')):
+            with self.subTest(key=key, hash_algorithm=hash_algorithm):
+                signature, key_id = client.sign_file(self.file_path, key, hash_algorithm)
+                private_key = self.keys[key or 'release']
+                self.assertEqual(key_id, get_key_fingerprint(private_key))
+                # A daemon signature verifies locally like one from sign_file
+                self.assertTrue(tool.verify_file_signature(
+                    self.file_path, signature, private_key.public_key(), hash_algorithm
+                ))
+                digest = hashing.hash_file(self.file_path, hash_algorithm)
+                self.assertTrue(client.verify_digest(digest, signature, key_id, hash_algorithm))
+                self.assertFalse(client.verify_digest(bytes(len(digest)), signature, key_id, hash_algorithm))
+
+    def test_concurrent_clients_are_batched(self):
+        errors = []
+
+        def work():
+            try:
+                with SigningClient(self.socket_path, timeout=10) as client:
+                    for _ in range(20):
+                        signature, key_id = client.sign_digest(os.urandom(32))
+                        self.assertEqual(len(signature), 64)
+            except Exception as e:
+                errors.append(e)
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        stats = self.client().stats()
+        self.assertEqual(stats["requests_total"], 80)
+        self.assertLessEqual(stats["batches_total"], 80)
+
+    def test_errors_keep_the_connection_usable(self):
+        client = self.client()
+        with self.assertRaises(RuntimeError):
+            client.sign_digest(os.urandom(32), key='missing')
+        with self.assertRaises(RuntimeError):
+            client.sign_digest(os.urandom(32), hash_algorithm='MD5')
+        with self.assertRaises(RuntimeError):
+            client.request(["not", "an", "object"])
+        with self.assertRaises(RuntimeError):
+            client.verify_digest(os.urandom(32), b'sig', '00' * 32)
+
+        data = b'{not json'
+        client.sock.sendall(struct.pack('>I', len(data)) + data)
+        self.assertFalse(recv_message(client.sock)["ok"])
+        send_message(client.sock, {"op": "keys", "id": 7})
+        response = recv_message(client.sock)
+        self.assertEqual((response["ok"], response["id"]), (True, 7))
+
+    def test_socket_is_private(self):
+        self.assertEqual(stat.S_IMODE(os.stat(self.socket_path).st_mode), 0o600)
+
+    def test_live_socket_is_not_replaced(self):
+        with self.assertRaises(RuntimeError):
+            remove_stale_socket(self.socket_path)
+        self.assertTrue(os.path.exists(self.socket_path))
+
+
+class StaleSocketTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.path = os.path.join(self.directory, 'signing.sock')
+
+    def test_stale_socket_is_removed(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.bind(self.path)
+        sock.close()  # bound but never listening
+        remove_stale_socket(self.path)
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_other_files_are_left_alone(self):
+        with open(self.path, 'w') as f:
+            f.write('not a socket')
+        with self.assertRaises(FileExistsError):
+            remove_stale_socket(self.path)
+        self.assertTrue(os.path.exists(self.path))
+
+    def test_missing_path_is_fine(self):
+        remove_stale_socket(self.path)
+
+
+if __name__ == '__main__':
+    unittest.main()
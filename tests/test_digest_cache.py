@@ -0,0 +1,150 @@
+import hashlib
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+import unittest
+from unittest import mock
+from modules.digest_cache import DigestCache
+
+# ctime cannot be set back, so the racy window is shortened instead of waiting seconds
+RACY_WINDOW_NS = 50 * 1000 * 1000
+
+
+def hash_file(path, algorithm='sha256'):
+    with open(path, 'rb') as f:
+        return hashlib.new(algorithm, f.read()).digest()
+
+
+def sha256_file(path):
+    return hash_file(path)
+
+
+@mock.patch('modules.digest_cache.RACY_WINDOW_NS', RACY_WINDOW_NS)
+class DigestCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.cache_path = os.path.join(self.directory, 'cache.sqlite3')
+        self.cache = DigestCache(self.cache_path)
+        self.addCleanup(lambda: self.cache.close())  # the test may replace the instance
+        self.file_path = self.write('data.bin', os.urandom(5000))
+        self.computed = 0
+
+    def write(self, name, data):
+        path = os.path.join(self.directory, name)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+
+    def settle(self):
+        """Wait until recent changes are outside the racy window"""
+        time.sleep(RACY_WINDOW_NS / 1e9 + 0.01)
+
+    def compute(self, path):
+        self.computed += 1
+        return sha256_file(path)
+
+    def digest(self, path=None, algorithm='sha256'):
+        return self.cache.get_or_compute(path or self.file_path, algorithm, self.compute)
+
+    def test_unchanged_file_is_hashed_once(self):
+        self.settle()
+        self.assertEqual(self.digest(), sha256_file(self.file_path))
+        self.assertEqual(self.digest(), sha256_file(self.file_path))
+        self.assertEqual(self.computed, 1)
+        self.assertEqual(self.cache.get(self.file_path, 'SHA256'), sha256_file(self.file_path))
+
+    def test_recently_modified_file_is_not_cached(self):
+        self.digest()
+        self.digest()
+        self.assertEqual(self.computed, 2)
+
+    def test_size_change_invalidates(self):
+        self.settle()
+        self.digest()
+        with open(self.file_path, 'ab') as f:
+            f.write(b'more')
+        self.assertIsNone(self.cache.get(self.file_path, 'sha256'))
+        self.assertEqual(self.digest(), sha256_file(self.file_path))
+
+    def test_same_size_edit_with_restored_mtime_invalidates(self):
+        self.settle()
+        self.digest()
+        self.settle()
+        st = os.stat(self.file_path)
+        with open(self.file_path, 'r+b') as f:
+            f.write(b'edit')
+        os.utime(self.file_path, ns=(st.st_atime_ns, st.st_mtime_ns))
+        self.assertIsNone(self.cache.get(self.file_path, 'sha256'))
+        self.assertEqual(self.digest(), sha256_file(self.file_path))
+
+    def test_replaced_file_invalidates(self):
+        self.settle()
+        self.digest()
+        replacement = self.write('other.bin', os.urandom(5000))
+        self.settle()
+        os.replace(replacement, self.file_path)
+        self.assertIsNone(self.cache.get(self.file_path, 'sha256'))
+
+    def test_change_during_hashing_is_not_cached(self):
+        self.settle()
+
+        def compute_and_modify(path):
+            digest = sha256_file(path)
+            with open(path, 'ab') as f:
+                f.write(b'x')
+            return digest
+        self.cache.get_or_compute(self.file_path, 'sha256', compute_and_modify)
+        self.settle()
+        self.assertIsNone(self.cache.get(self.file_path, 'sha256'))
+
+    def test_algorithms_are_cached_separately(self):
+        self.settle()
+        computed = self.cache.get_or_compute_many(
+            self.file_path, ['SHA256', 'sha512'],
+            lambda path, names: {name: hash_file(path, name) for name in names}
+        )
+        self.assertEqual(sorted(computed), ['sha256', 'sha512'])
+        self.assertEqual(self.cache.get(self.file_path, 'sha512'), computed['sha512'])
+        self.assertIsNone(self.cache.get(self.file_path, 'sha3_256'))
+
+    def test_persists_across_instances(self):
+        self.settle()
+        self.digest()
+        self.cache.close()
+        self.cache = DigestCache(self.cache_path)
+        self.assertEqual(self.cache.get(self.file_path, 'sha256'), sha256_file(self.file_path))
+
+    def test_least_recently_used_entries_are_evicted(self):
+        self.cache.max_entries = 2
+        paths = [self.write(f'f{i}', bytes([i]) * 100) for i in range(3)]
+        self.settle()
+        for path in paths[:2]:
+            self.digest(path)
+        time.sleep(0.01)
+        self.cache.get(paths[0], 'sha256')  # paths[1] is now the least recently used
+        self.digest(paths[2])
+        self.assertIsNotNone(self.cache.get(paths[0], 'sha256'))
+        self.assertIsNone(self.cache.get(paths[1], 'sha256'))
+        self.assertIsNotNone(self.cache.get(paths[2], 'sha256'))
+
+    def test_cache_without_ctime_is_discarded(self):
+        self.cache.close()
+        old_path = os.path.join(self.directory, 'old.sqlite3')
+        connection = sqlite3.connect(old_path)
+        connection.execute(
+            "CREATE TABLE digests (path TEXT, algorithm TEXT, size INTEGER, mtime_ns INTEGER, inode INTEGER, "
+            "digest BLOB, last_used REAL, PRIMARY KEY (path, algorithm))"
+        )
+        connection.commit()
+        connection.close()
+        self.cache = DigestCache(old_path)
+        self.settle()
+        self.digest()
+        self.assertEqual(self.cache.get(self.file_path, 'sha256'), sha256_file(self.file_path))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,173 @@
+import os
+import shutil
+import struct
+import tempfile
+import unittest
+from modules import envelope
+from modules.envelope import EnvelopeError, EnvelopeMismatch, SignatureEnvelope
+from modules.key_generator import KeyGenerator
+from modules.signature import DigitalSignature
+
+MAGIC_AND_VERSION = envelope.MAGIC + bytes([envelope.VERSION])
+
+
+def sample_envelope():
+    return SignatureEnvelope('Ed25519', 'SHA256', 'AB' * 32, 1234, bytes(range(32)), b'\x07' * 64)
+
+
+class EnvelopeFormatTest(unittest.TestCase):
+    def test_binary_round_trip(self):
+        original = sample_envelope()
+        parsed = SignatureEnvelope.from_bytes(original.to_bytes())
+        self.assertEqual(parsed.to_dict(), original.to_dict())
+        self.assertEqual(parsed.key_id, 'ab' * 32)
+
+    def test_json_round_trip(self):
+        original = sample_envelope()
+        parsed = envelope.parse(original.to_json())
+        self.assertEqual(parsed.to_dict(), original.to_dict())
+
+    def test_padding_round_trip(self):
+        original = SignatureEnvelope('RSA', 'SHA512', 'cd' * 32, 0, b'\x01' * 64, b'\x02' * 256, 'PSS')
+        parsed = SignatureEnvelope.from_bytes(original.to_bytes())
+        self.assertEqual(parsed.padding, 'PSS')
+        self.assertEqual(parsed.signature, original.signature)
+
+    def test_raw_signature_is_not_an_envelope(self):
+        self.assertIsNone(envelope.parse(b'\x30\x45' + b'\x00' * 70))
+        self.assertIsNone(envelope.parse(b'{"not": "an envelope"}'))
+        self.assertIsNone(envelope.parse(b'{broken json'))
+
+    def test_every_truncation_is_rejected(self):
+        data = sample_envelope().to_bytes()
+        for end in range(len(MAGIC_AND_VERSION), len(data)):
+            with self.subTest(end=end):
+                with self.assertRaises(EnvelopeError):
+                    SignatureEnvelope.from_bytes(data[:end])
+
+    def test_trailing_bytes_are_rejected(self):
+        with self.assertRaises(EnvelopeError):
+            SignatureEnvelope.from_bytes(sample_envelope().to_bytes() + b'\x00')
+
+    def test_bad_magic_is_rejected(self):
+        data = b'XSIG' + sample_envelope().to_bytes()[4:]
+        with self.assertRaises(EnvelopeError):
+            SignatureEnvelope.from_bytes(data)
+        self.assertIsNone(envelope.parse(data))
+
+    def test_unknown_version_is_rejected(self):
+        data = bytearray(sample_envelope().to_bytes())
+        data[4] = envelope.VERSION + 1
+        with self.assertRaises(EnvelopeError):
+            envelope.parse(bytes(data))
+
+    def test_bad_lengths_are_rejected(self):
+        data = sample_envelope().to_bytes()
+        signature_length = len(data) - 2 - 64
+        for patched in (
+            data[:signature_length] + struct.pack('>H', 65) + data[signature_length + 2:],
+            data[:signature_length] + struct.pack('>H', 63) + data[signature_length + 2:],
+            data[:5] + b'\xff' + data[6:],  # scheme length past the end
+        ):
+            with self.subTest(patched=patched[:8]):
+                with self.assertRaises(EnvelopeError):
+                    SignatureEnvelope.from_bytes(patched)
+
+    def test_malformed_json_is_rejected(self):
+        document = sample_envelope().to_dict()
+        document["digest"] = "not base64!"
+        with self.assertRaises(EnvelopeError):
+            SignatureEnvelope.from_dict(document)
+        del document["digest"]
+        with self.assertRaises(EnvelopeError):
+            SignatureEnvelope.from_dict(document)
+
+    def test_invalid_json_fields_are_rejected(self):
+        for field, value in (
+            ("key_id", 1234),
+            ("key_id", "ab" * 31),
+            ("key_id", "zz" * 32),
+            ("size", "1234"),
+            ("size", -1),
+            ("size", 1.5),
+            ("size", True),
+            ("scheme", None),
+            ("hash", "SHA\u00e9"),
+            ("padding", 7),
+            ("signature", 12),
+        ):
+            with self.subTest(field=field, value=value):
+                document = sample_envelope().to_dict()
+                document[field] = value
+                with self.assertRaises(EnvelopeError):
+                    SignatureEnvelope.from_dict(document)
+        with self.assertRaises(EnvelopeError):
+            SignatureEnvelope.from_dict(["not", "a", "dict"])
+
+    def test_check_reports_mismatches(self):
+        signed = sample_envelope()
+        signed.check(file_size=1234, scheme='Ed25519', key_id='AB' * 32)
+        with self.assertRaises(EnvelopeMismatch):
+            signed.check(file_size=1235)
+        with self.assertRaises(EnvelopeMismatch):
+            signed.check(scheme='RSA')
+        with self.assertRaises(EnvelopeMismatch):
+            signed.check(key_id='00' * 32)
+
+
+class EnvelopeSignatureTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.private_key, cls.public_key = KeyGenerator().generate_keys('Ed25519')
+        cls.other_public_key = KeyGenerator().generate_keys('Ed25519')[1]
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.file_path = os.path.join(self.directory, 'data.bin')
+        with open(self.file_path, 'wb') as f:
+            f.write(os.urandom(100000))
+        self.tool = DigitalSignature()
+
+    def sign_and_reload(self, signature_format):
+        signed = self.tool.sign_file_envelope(self.file_path, self.private_key, 'SHA384')
+        signature_path = self.file_path + '.sig'
+        self.tool.save_signature(signed, signature_path, signature_format=signature_format)
+        return self.tool.load_envelope(signature_path)
+
+    def test_saved_envelope_verifies(self):
+        for signature_format in ('binary', 'json'):
+            with self.subTest(signature_format=signature_format):
+                loaded = self.sign_and_reload(signature_format)
+                self.assertEqual(loaded.hash_algorithm, 'SHA384')
+                self.assertTrue(self.tool.verify_envelope(self.file_path, loaded, self.public_key))
+
+    def test_modified_file_fails(self):
+        loaded = self.sign_and_reload('binary')
+        with open(self.file_path, 'r+b') as f:
+            f.seek(5000)
+            byte = f.read(1)
+            f.seek(5000)
+            f.write(bytes([byte[0] ^ 1]))
+        self.assertFalse(self.tool.verify_envelope(self.file_path, loaded, self.public_key))
+
+    def test_resized_file_is_rejected_before_hashing(self):
+        loaded = self.sign_and_reload('binary')
+        with open(self.file_path, 'ab') as f:
+            f.write(b'x')
+        with self.assertRaises(EnvelopeMismatch):
+            self.tool.verify_envelope(self.file_path, loaded, self.public_key)
+
+    def test_wrong_key_is_rejected(self):
+        loaded = self.sign_and_reload('binary')
+        with self.assertRaises(EnvelopeMismatch):
+            self.tool.verify_envelope(self.file_path, loaded, self.other_public_key)
+
+    def test_tampered_signature_fails(self):
+        loaded = self.sign_and_reload('binary')
+        loaded.signature = bytes([loaded.signature[0] ^ 1]) + loaded.signature[1:]
+        self.assertFalse(self.tool.verify_envelope(self.file_path, loaded, self.public_key))
+
+
+if __name__ == '__main__':
+    unittest.main()
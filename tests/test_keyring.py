@@ -0,0 +1,74 @@
+import os
+import shutil
+import tempfile
+import unittest
+from modules.key_generator import KeyGenerator
+from modules.keyring import Keyring
+from modules.signature import DigitalSignature
+from modules.utils import get_key_fingerprint
+
+
+def write_key_pair(directory, name, algorithm='Ed25519'):
+    generator = KeyGenerator()
+    generator.generate_keys(algorithm)
+    generator.save_private_key(os.path.join(directory, name + '_private.key'))
+    generator.save_public_key(os.path.join(directory, name + '.pem'))
+    return generator.private_key, generator.public_key
+
+
+class KeyringLookupTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.keys = {name: write_key_pair(self.directory, name) for name in ('alice', 'bob')}
+        self.keyring = Keyring()
+
+    def test_lookup_by_fingerprint_ignores_case_and_whitespace(self):
+        public_key = self.keys['alice'][1]
+        fingerprint = self.keyring.add_public_key(public_key)
+        self.assertEqual(fingerprint, get_key_fingerprint(public_key))
+        self.assertIs(self.keyring.find_public_key(fingerprint), public_key)
+        self.assertIs(self.keyring.find_public_key(f' {fingerprint.upper()}\n'), public_key)
+        self.assertIsNone(self.keyring.find_public_key('00' * 32))
+
+    def test_directory_loads_public_keys_only(self):
+        fingerprints = self.keyring.load_public_key_directory(self.directory)
+        self.assertEqual(
+            sorted(fingerprints), sorted(get_key_fingerprint(public) for _, public in self.keys.values())
+        )
+        # Private key files do not match the default extensions and are never indexed
+        self.assertEqual(len(self.keyring.public_keys), 2)
+
+    def test_signature_picks_the_signer_by_key_id(self):
+        file_path = os.path.join(self.directory, 'data.bin')
+        with open(file_path, 'wb') as f:
+            f.write(os.urandom(10000))
+        tool = DigitalSignature()
+        private_key, public_key = self.keys['bob']
+        signature = tool.sign_file(file_path, private_key)
+        key_id = get_key_fingerprint(public_key)
+        self.keyring.load_public_key_directory(self.directory)
+
+        # The wrong explicit key is ignored when the keyring knows the signer
+        self.assertTrue(tool.verify_file_signature(
+            file_path, signature, self.keys['alice'][1], keyring=self.keyring, key_id=key_id
+        ))
+
+    def test_unknown_key_id_falls_back_to_the_explicit_key(self):
+        file_path = os.path.join(self.directory, 'data.bin')
+        with open(file_path, 'wb') as f:
+            f.write(os.urandom(10000))
+        tool = DigitalSignature()
+        private_key, public_key = self.keys['alice']
+        signature = tool.sign_file(file_path, private_key)
+        unknown = '00' * 32
+
+        self.assertTrue(tool.verify_file_signature(
+            file_path, signature, public_key, keyring=self.keyring, key_id=unknown
+        ))
+        with self.assertRaises(ValueError):
+            tool.verify_file_signature(file_path, signature, None, keyring=self.keyring, key_id=unknown)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,166 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest import mock
+from modules.key_generator import KeyGenerator
+from modules.manifest import ManifestError, ManifestSigner, ManifestVerifier, format_manifest, parse_manifest
+
+
+class ManifestFormatTest(unittest.TestCase):
+    def test_round_trip_is_sorted(self):
+        entries = [('b/z.txt', 3, b'\x02' * 32), ('a.txt', 0, b'\x01' * 32), ('name with  spaces', 7, b'\x03' * 32)]
+        data = format_manifest(entries, 'SHA256')
+        self.assertEqual(parse_manifest(data), ('SHA256', sorted(entries)))
+        self.assertEqual(format_manifest(reversed(entries), 'SHA256'), data)
+
+    def test_malformed_manifests_are_rejected(self):
+        for data in (
+            b'',
+            b'# hash: SHA256\n',
+            b'# digital-signature manifest v1\n',
+            b'# digital-signature manifest v1\n# hash: SHA256\nnot an entry\n',
+            b'# digital-signature manifest v1\n# hash: SHA256\nzz  1  a.txt\n',
+            b'# digital-signature manifest v1\n# hash: SHA256\n00  size  a.txt\n',
+            b'# digital-signature manifest v1\n# hash: SHA256\n00  1  \xff.txt\n',
+        ):
+            with self.subTest(data=data):
+                with self.assertRaises(ManifestError):
+                    parse_manifest(data)
+
+
+class SignedManifestTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.private_key, cls.public_key = KeyGenerator().generate_keys('Ed25519')
+        cls.other_public_key = KeyGenerator().generate_keys('Ed25519')[1]
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        self.files = []
+        for name in ('a.txt', 'b.bin', os.path.join('sub', 'c.txt')):
+            path = os.path.join(self.root, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb') as f:
+                f.write(os.urandom(1000))
+            self.files.append(path)
+        self.manifest_path = os.path.join(self.root, 'MANIFEST')
+
+    def sign(self, files=None, incremental=False):
+        signer = ManifestSigner(self.private_key, workers=2)
+        return signer.sign_files(files or self.files, self.root, self.manifest_path, incremental=incremental)
+
+    def verify(self, public_key=None):
+        return ManifestVerifier(public_key or self.public_key, workers=2).verify(self.manifest_path)
+
+    def resign_manifest(self, data):
+        """Replace the manifest with arbitrary contents under a valid signature"""
+        with open(self.manifest_path, 'wb') as f:
+            f.write(data)
+        signer = ManifestSigner(self.private_key)
+        envelope = signer.signature_tool.sign_file_envelope(self.manifest_path, self.private_key)
+        signer.signature_tool.save_signature(envelope, self.manifest_path + '.sig')
+
+    def test_round_trip(self):
+        _, summary = self.sign()
+        self.assertTrue(summary["signed"])
+        self.assertEqual(summary["hashed"], 3)
+
+        results, summary = self.verify()
+        self.assertTrue(summary["manifest_valid"])
+        self.assertEqual(summary["valid"], 3)
+        self.assertEqual(sorted(r["path"] for r in results), sorted(self.files))
+
+    def test_modified_file_is_invalid(self):
+        self.sign()
+        with open(self.files[1], 'r+b') as f:
+            f.write(b'\x00')
+        _, summary = self.verify()
+        self.assertTrue(summary["manifest_valid"])
+        self.assertEqual((summary["valid"], summary["invalid"]), (2, 1))
+
+    def test_missing_file_is_reported(self):
+        self.sign()
+        os.remove(self.files[2])
+        _, summary = self.verify()
+        self.assertEqual(summary["missing_file"], 1)
+
+    def test_tampered_manifest_is_rejected(self):
+        self.sign()
+        with open(self.manifest_path, 'rb') as f:
+            data = f.read()
+        with open(self.manifest_path, 'wb') as f:
+            f.write(data.replace(b'a.txt', b'A.txt'))
+        results, summary = self.verify()
+        self.assertFalse(summary["manifest_valid"])
+        self.assertEqual(results, [])
+
+    def test_wrong_key_is_rejected(self):
+        self.sign()
+        _, summary = self.verify(self.other_public_key)
+        self.assertFalse(summary["manifest_valid"])
+        self.assertIsNotNone(summary["manifest_error"])
+
+    def test_missing_signature_is_rejected(self):
+        self.sign()
+        os.remove(self.manifest_path + '.sig')
+        _, summary = self.verify()
+        self.assertFalse(summary["manifest_valid"])
+
+    def test_signed_but_unusable_manifest_is_reported(self):
+        for data in (
+            b'# digital-signature manifest v1\n# hash: MD5\n',
+            b'# digital-signature manifest v1\n# hash: SHA256\ngarbage\n',
+        ):
+            with self.subTest(data=data):
+                self.resign_manifest(data)
+                results, summary = self.verify()
+                self.assertFalse(summary["manifest_valid"])
+                self.assertIn(summary["manifest_error"].split(':')[0],
+                              ("Unsupported hash algorithm", "Malformed manifest line 3"))
+                self.assertEqual(results, [])
+
+    def test_unreadable_file_prevents_signing(self):
+        results, summary = self.sign(self.files + [os.path.join(self.root, 'missing.txt')])
+        self.assertFalse(summary["signed"])
+        self.assertEqual(summary["failed"], 1)
+        self.assertFalse(os.path.exists(self.manifest_path))
+        self.assertFalse(os.path.exists(self.manifest_path + '.sig'))
+
+    def test_non_utf8_file_name_prevents_signing(self):
+        path = os.path.join(os.fsencode(self.root), b'bad-\xff.txt')
+        try:
+            with open(path, 'wb') as f:
+                f.write(b'data')
+        except OSError:
+            self.skipTest("file system does not accept non-UTF-8 names")
+        results, summary = self.sign(self.files + [os.fsdecode(path)])
+        self.assertFalse(summary["signed"])
+        self.assertEqual([r["error"].split(':')[0] for r in results if not r["ok"]], ["File name is not valid UTF-8"])
+        self.assertFalse(os.path.exists(self.manifest_path))
+
+    # ctime cannot be set back, so the racy window is shortened instead of waiting seconds
+    @mock.patch('modules.digest_cache.RACY_WINDOW_NS', 50 * 1000 * 1000)
+    def test_incremental_reuses_unchanged_files(self):
+        time.sleep(0.06)
+        _, summary = self.sign(incremental=True)
+        self.assertEqual((summary["hashed"], summary["reused"]), (3, 0))
+        _, summary = self.sign(incremental=True)
+        self.assertEqual((summary["hashed"], summary["reused"]), (0, 3))
+
+        # Same size and restored mtime: only ctime shows the edit
+        time.sleep(0.06)
+        st = os.stat(self.files[0])
+        with open(self.files[0], 'r+b') as f:
+            f.write(b'changed')
+        os.utime(self.files[0], ns=(st.st_atime_ns, st.st_mtime_ns))
+        _, summary = self.sign(incremental=True)
+        self.assertEqual((summary["hashed"], summary["reused"]), (1, 2))
+        _, summary = self.verify()
+        self.assertEqual(summary["valid"], 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,191 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import unittest
+from modules import merkle
+from modules.envelope import EnvelopeError, EnvelopeMismatch
+from modules.key_generator import KeyGenerator
+from modules.merkle import MerkleSignature
+from modules.signature import DigitalSignature
+
+CHUNK_SIZE = 4096
+
+
+def leaf(data):
+    return hashlib.sha256(b'\x00' + data).digest()
+
+
+def node(left, right):
+    return hashlib.sha256(b'\x01' + left + right).digest()
+
+
+class MerkleTreeTest(unittest.TestCase):
+    def test_single_leaf_is_the_root(self):
+        self.assertEqual(merkle.merkle_root([leaf(b'a')]), leaf(b'a'))
+
+    def test_odd_leaf_is_carried_up(self):
+        a, b, c = leaf(b'a'), leaf(b'b'), leaf(b'c')
+        self.assertEqual(merkle.merkle_root([a, b, c]), node(node(a, b), c))
+
+    def test_five_leaves(self):
+        leaves = [leaf(bytes([i])) for i in range(5)]
+        expected = node(node(node(leaves[0], leaves[1]), node(leaves[2], leaves[3])), leaves[4])
+        self.assertEqual(merkle.merkle_root(leaves), expected)
+
+    def test_leaf_order_matters(self):
+        a, b = leaf(b'a'), leaf(b'b')
+        self.assertNotEqual(merkle.merkle_root([a, b]), merkle.merkle_root([b, a]))
+
+    def test_chunk_count(self):
+        self.assertEqual(merkle.chunk_count(0, CHUNK_SIZE), 1)
+        self.assertEqual(merkle.chunk_count(CHUNK_SIZE, CHUNK_SIZE), 1)
+        self.assertEqual(merkle.chunk_count(CHUNK_SIZE + 1, CHUNK_SIZE), 2)
+
+    def test_chunks_for_range(self):
+        self.assertEqual(list(merkle.chunks_for_range(0, 0, CHUNK_SIZE)), [])
+        self.assertEqual(list(merkle.chunks_for_range(0, 1, CHUNK_SIZE)), [0])
+        self.assertEqual(list(merkle.chunks_for_range(CHUNK_SIZE - 1, 2, CHUNK_SIZE)), [0, 1])
+        self.assertEqual(list(merkle.chunks_for_range(CHUNK_SIZE, CHUNK_SIZE, CHUNK_SIZE)), [1])
+
+
+class MerkleSignatureTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.private_key, cls.public_key = KeyGenerator().generate_keys('Ed25519')
+        cls.other_public_key = KeyGenerator().generate_keys('Ed25519')[1]
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.tool = DigitalSignature()
+        # Five chunks, the last one partial: an odd leaf at two levels of the tree
+        self.file_path = self.write_file(os.urandom(4 * CHUNK_SIZE + 100))
+
+    def write_file(self, data, name='data.bin'):
+        path = os.path.join(self.directory, name)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+
+    def sign(self, path=None):
+        return self.tool.sign_file_chunked(path or self.file_path, self.private_key, chunk_size=CHUNK_SIZE, workers=2)
+
+    def flip_byte(self, offset):
+        with open(self.file_path, 'r+b') as f:
+            f.seek(offset)
+            byte = f.read(1)
+            f.seek(offset)
+            f.write(bytes([byte[0] ^ 1]))
+
+    def test_round_trip(self):
+        signed = self.sign()
+        self.assertEqual(len(signed.leaves), 5)
+        signature_path = self.file_path + '.sig'
+        self.tool.save_signature(signed, signature_path)
+        loaded = self.tool.load_merkle_signature(signature_path)
+        self.assertEqual(loaded.leaves, signed.leaves)
+        self.assertEqual(loaded.chunk_size, CHUNK_SIZE)
+        self.assertTrue(loaded.check_leaves())
+        self.assertTrue(self.tool.verify_file_chunked(self.file_path, loaded, self.public_key))
+
+    def test_empty_file(self):
+        path = self.write_file(b'', 'empty.bin')
+        signed = MerkleSignature.from_bytes(self.sign(path).to_bytes())
+        self.assertEqual(len(signed.leaves), 1)
+        self.assertTrue(self.tool.verify_file_chunked(path, signed, self.public_key))
+
+    def test_tampered_chunk_fails(self):
+        signed = self.sign()
+        self.flip_byte(2 * CHUNK_SIZE + 7)
+        self.assertFalse(self.tool.verify_file_chunked(self.file_path, signed, self.public_key))
+
+    def test_range_proof_only_covers_its_chunks(self):
+        signed = self.sign()
+        self.flip_byte(4 * CHUNK_SIZE + 50)  # inside the odd last chunk
+        self.assertTrue(self.tool.verify_file_chunked(
+            self.file_path, signed, self.public_key, offset=CHUNK_SIZE, length=2 * CHUNK_SIZE
+        ))
+        self.assertFalse(self.tool.verify_file_chunked(
+            self.file_path, signed, self.public_key, offset=4 * CHUNK_SIZE, length=100
+        ))
+        self.assertFalse(self.tool.verify_file_chunked(
+            self.file_path, signed, self.public_key, offset=CHUNK_SIZE - 1, length=3 * CHUNK_SIZE + 2
+        ))
+
+    def test_range_outside_the_file_is_rejected(self):
+        signed = self.sign()
+        with self.assertRaises(ValueError):
+            self.tool.verify_file_chunked(
+                self.file_path, signed, self.public_key, offset=4 * CHUNK_SIZE, length=101
+            )
+
+    def test_tampered_leaf_fails_before_hashing(self):
+        signed = self.sign()
+        signed.leaves[4] = leaf(b'forged')
+        self.assertFalse(signed.check_leaves())
+        self.assertFalse(self.tool.verify_file_chunked(self.file_path, signed, self.public_key))
+
+    def test_dropped_leaf_fails(self):
+        signed = self.sign()
+        signed.leaves.pop()
+        self.assertFalse(signed.check_leaves())
+
+    def test_wrong_key_is_rejected(self):
+        with self.assertRaises(EnvelopeMismatch):
+            self.tool.verify_file_chunked(self.file_path, self.sign(), self.other_public_key)
+
+    def test_resign_rehashes_changed_chunks(self):
+        previous = self.sign()
+        self.flip_byte(CHUNK_SIZE + 1)
+        with open(self.file_path, 'ab') as f:
+            f.write(os.urandom(CHUNK_SIZE))
+        resigned = self.tool.resign_file_chunked(
+            self.file_path, self.private_key, previous, changed_ranges=[(CHUNK_SIZE + 1, 1)]
+        )
+        self.assertEqual(resigned.leaves, self.sign().leaves)
+        self.assertTrue(self.tool.verify_file_chunked(self.file_path, resigned, self.public_key))
+
+    def test_resign_rejects_an_untrusted_previous_signature(self):
+        previous = self.sign()
+        forged = MerkleSignature(previous.envelope, CHUNK_SIZE, list(previous.leaves))
+        forged.leaves[0] = leaf(b'never read')
+        other = MerkleSignature.from_bytes(previous.to_bytes())
+        other.envelope.signature = bytes(len(other.envelope.signature))
+        for name, candidate, private_key in (
+            ("forged leaf", forged, self.private_key),
+            ("bad root signature", other, self.private_key),
+            ("other signer", previous, KeyGenerator().generate_keys('Ed25519')[0]),
+            ("chunk size", MerkleSignature(previous.envelope, CHUNK_SIZE * 2, previous.leaves), self.private_key),
+        ):
+            with self.subTest(name):
+                with self.assertRaises(EnvelopeMismatch):
+                    self.tool.resign_file_chunked(self.file_path, private_key, candidate, changed_ranges=[])
+
+    def test_truncated_signature_is_rejected(self):
+        data = self.sign().to_bytes()
+        for end in (0, 3, merkle._HEADER.size, merkle._HEADER.size + 31, len(data) - 1):
+            with self.subTest(end=end):
+                with self.assertRaises(EnvelopeError):
+                    MerkleSignature.from_bytes(data[:end])
+
+    def test_bad_header_is_rejected(self):
+        data = self.sign().to_bytes()
+        for patched in (
+            b'XSMT' + data[4:],
+            data[:4] + bytes([merkle.VERSION + 1]) + data[5:],
+            data[:5] + bytes(4) + data[9:],  # zero chunk size
+        ):
+            with self.subTest(patched=patched[:9]):
+                with self.assertRaises(EnvelopeError):
+                    MerkleSignature.from_bytes(patched)
+
+    def test_not_an_envelope(self):
+        data = self.sign().to_bytes()
+        self.assertTrue(merkle.is_merkle_signature(data))
+        signature_path = self.write_file(data, 'data.bin.sig')
+        self.assertIsNone(self.tool.load_envelope(signature_path))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from modules.envelope import EnvelopeMismatch
+from modules.key_generator import KeyGenerator
+from modules.signature import DigitalSignature
+from modules.streaming import StreamSigner, StreamVerifier
+
+
+def chunks_of(data, size=1000):
+    return (data[i:i + size] for i in range(0, len(data), size))
+
+
+class StreamSignatureTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.private_key, cls.public_key = KeyGenerator().generate_keys('ECDSA P-256')
+        cls.other_public_key = KeyGenerator().generate_keys('ECDSA P-256')[1]
+
+    def setUp(self):
+        self.data = os.urandom(50000)
+        self.tool = DigitalSignature()
+
+    def sign(self, envelope=False, hash_algorithm='SHA256'):
+        signer = StreamSigner(self.private_key, hash_algorithm, self.tool)
+        self.assertEqual(signer.update_from(chunks_of(self.data)), len(self.data))
+        return signer.finalize(envelope=envelope)
+
+    def verify(self, signature, data=None, public_key=None, hash_algorithm='SHA256'):
+        verifier = StreamVerifier(public_key or self.public_key, signature, hash_algorithm, self.tool)
+        verifier.update_from(io.BytesIO(self.data if data is None else data), buffer_size=4096)
+        return verifier.finalize()
+
+    def test_raw_round_trip(self):
+        for hash_algorithm in ('SHA256', 'SHA3-256', 'BLAKE2b'):
+            with self.subTest(hash_algorithm=hash_algorithm):
+                signature = self.sign(hash_algorithm=hash_algorithm)
+                self.assertTrue(self.verify(signature, hash_algorithm=hash_algorithm))
+
+    def test_envelope_round_trip(self):
+        signed = self.sign(envelope=True, hash_algorithm='SHA512')
+        self.assertEqual(signed.file_size, len(self.data))
+        self.assertTrue(self.verify(signed))
+
+    def test_stream_signature_verifies_as_a_file(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        file_path = os.path.join(directory, 'data.bin')
+        with open(file_path, 'wb') as f:
+            f.write(self.data)
+        self.assertTrue(self.tool.verify_file_signature(file_path, self.sign(), self.public_key))
+        self.assertTrue(self.verify(self.tool.sign_file(file_path, self.private_key)))
+
+    def test_tampered_data_fails(self):
+        tampered = bytes([self.data[0] ^ 1]) + self.data[1:]
+        self.assertFalse(self.verify(self.sign(), tampered))
+        self.assertFalse(self.verify(self.sign(envelope=True), tampered))
+        self.assertFalse(self.verify(self.sign(envelope=True), self.data[:-1]))
+
+    def test_wrong_key(self):
+        self.assertFalse(self.verify(self.sign(), public_key=self.other_public_key))
+        # An envelope names its signer, so the wrong key is reported like check_envelope does
+        with self.assertRaises(EnvelopeMismatch):
+            self.verify(self.sign(envelope=True), public_key=self.other_public_key)
+
+    def test_finalize_only_once(self):
+        signer = StreamSigner(self.private_key)
+        signer.update(b'data')
+        signer.finalize()
+        with self.assertRaises(ValueError):
+            signer.update(b'more')
+        with self.assertRaises(ValueError):
+            signer.finalize()
+
+    def test_unknown_hash_algorithm(self):
+        with self.assertRaises(ValueError):
+            StreamSigner(self.private_key, 'MD5')
+
+
+if __name__ == '__main__':
+    unittest.main()